@@ -1,16 +1,20 @@
-import pandas as pd
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import argparse
 
-from finrl.meta.preprocessor.preprocessors import data_split
 from finrl.config import INDICATORS
-from finrl.meta.env_stock_trading.env_stocktrading import StockTradingEnv
 from finrl.agents.stablebaselines3.models import DRLAgent
 from stable_baselines3 import PPO
 from finrl.main import check_and_make_directories
 from finrl.config import INDICATORS, TRAINED_MODEL_DIR
 from finrl.config import INDICATORS
 from finrl.plot import backtest_stats
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import DatePanel, load_data
+from array_trading_env import ArrayStockTradingEnv
 
 # Contestants are welcome to split the data in their own way for model tuning
 TRADE_START_DATE = '2013-01-01'
@@ -32,14 +36,16 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Description of program')
     parser.add_argument('--start_date', default=TRADE_START_DATE, help='Trade start date (default: {})'.format(TRADE_START_DATE))
     parser.add_argument('--end_date', default=TRADE_END_DATE, help='Trade end date (default: {})'.format(TRADE_END_DATE))
-    parser.add_argument('--data_file', default=FILE_PATH, help='Trade data file')
+    parser.add_argument('--data_file', default=FILE_PATH, help='Trade data file, a csv or a columnar_data store')
 
     args = parser.parse_args()
     TRADE_START_DATE = args.start_date
     TRADE_END_DATE = args.end_date
 
-    processed_full = pd.read_csv(args.data_file)
-    trade = data_split(processed_full, TRADE_START_DATE, TRADE_END_DATE)
+    # Only the partitions of a store that hold trade dates are read
+    processed_full = load_data(args.data_file, TRADE_START_DATE, TRADE_END_DATE)
+    # A view of the sorted panel, indexed by day like data_split returns
+    trade = DatePanel(processed_full).split(TRADE_START_DATE, TRADE_END_DATE)
 
     stock_dimension = len(trade.tic.unique())
     state_space = 1 + 2*stock_dimension + len(INDICATORS)*stock_dimension
@@ -65,7 +71,7 @@ if __name__ == '__main__':
     check_and_make_directories([TRAINED_MODEL_DIR])
 
     # Environment
-    e_trade_gym = StockTradingEnv(df = trade, **env_kwargs)
+    e_trade_gym = ArrayStockTradingEnv(df = trade, **env_kwargs)
 
     # PPO agent
     agent = DRLAgent(env = e_trade_gym)
@@ -8,76 +8,86 @@
 
 import numpy as np
 
+from trajectory_cache import record_member
+
 
 class PPO_Switch:
-    def __init__(self, stocksDimension, switchWindows, hmax=100, alpha=0.5):
+    def __init__(self, stocksDimension, switchWindows, hmax=100, alpha=0.5, warmup=10, horizon=5):
+        """
+        :param stocksDimension: (int) Number of stocks
+        :param switchWindows: (list<int>) Candidate days between two switches
+        :param hmax: (int) hmax of the switch environment
+        :param alpha: (float) Weight of the short-term rewards against the long-term ones
+        :param warmup: (int) Days the first model trades alone before the first switch
+        :param horizon: (int) Days of the short-term rewards
+        """
+        if warmup < max(list(switchWindows) + [horizon]):
+            raise ValueError('warmup %d is shorter than a switch window or the horizon' % warmup)
         self.switchWindows = switchWindows
         self.stocksDim = stocksDimension
         self.alpha = alpha
         self.hamx =hmax
+        self.warmup = warmup
+        self.horizon = horizon
         pass
 
-    def DRL_prediction(self, model, environment, deterministic=True):
+    def DRL_prediction(self, model, environment, deterministic=True, cache=None):
         """
             make a prediction and get results
             :param model: (list<object>) multiple different model
             :param environment: (list<object>) a final test environment and multiple models corresponding environment
             :param deterministic: (bool) Whether or not to return deterministic actions.
+            :param cache: (TrajectoryCache) where the actions and cumulative wealth of the models are kept,
+                so that they are only run once per model and data; the models are run every time if None.
             :return: (df) cumulative wealth and actions record in different periods
         """
+        # The models trade in their own environments, whatever the switch does, so their
+        # actions and cumulative wealth are recorded first and only the switch env is stepped below
+        trajectories = [cache.get(model[k], environment[k + 1], deterministic) if cache is not None
+                        else record_member(model[k], environment[k + 1], deterministic) for k in range(len(model))]
+        return self.replay(trajectories, environment[0])
 
-        ppo_switch_env, ppo_switch_obs = environment[0].get_sb_env()
-        ppo_real_env, ppo_real_obs = environment[1].get_sb_env()
-        ppo_max_env, ppo_max_obs = environment[2].get_sb_env()
-        ppo_min_env, ppo_min_obs = environment[3].get_sb_env()
-        ppo_mean_env, ppo_mean_obs = environment[4].get_sb_env()
-        ppo_ema_env, ppo_ema_obs = environment[5].get_sb_env()
+    def replay(self, trajectories, environment):
+        """
+            run the switch over recorded model trajectories
+            :param trajectories: (list<dict>) the actions and asset_memory of every model, as record_member returns them
+            :param environment: (object) the final test environment
+            :return: (df) cumulative wealth and actions record in different periods
+        """
+        modelActions = [trajectory['actions'] for trajectory in trajectories]
+        assetMemories = [trajectory['asset_memory'] for trajectory in trajectories]
+
+        ppo_switch_env, ppo_switch_obs = environment.get_sb_env()
 
         account_memory = None  # This help avoid unnecessary list creation
         actions_memory = None  # optimize memory consumption
 
         ppo_switch_env.reset()
-        ppo_real_env.reset()
-        ppo_max_env.reset()
-        ppo_min_env.reset()
-        ppo_mean_env.reset()
-        ppo_ema_env.reset()
 
-        max_steps = len(environment[0].df.index.unique()) - 1
+        max_steps = len(environment.df.index.unique()) - 1
         switchWindow = self.switchWindows[0]
-        lastSwitchCW = [0 for _ in range(len(model))]
+        lastSwitchCW = [0 for _ in range(len(trajectories))]
         lastSwitchModelIndex = 0
-        switchFactor = [0 for _ in range(len(model))]
-
-        for i in range(len(environment[0].df.index.unique())):
-            ppo_real_action, _realStates = model[0].predict(ppo_real_obs, deterministic=deterministic)
-            ppo_max_action, _maxStates = model[1].predict(ppo_max_obs, deterministic=deterministic)
-            ppo_min_action, _minStates = model[2].predict(ppo_min_obs, deterministic=deterministic)
-            ppo_mean_action, _meanStates = model[3].predict(ppo_mean_obs, deterministic=deterministic)
-            ppo_ema_action, _emaStates = model[4].predict(ppo_ema_obs, deterministic=deterministic)
-
-            all_actions = [
-                ppo_real_action,
-                ppo_max_action,
-                ppo_min_action,
-                ppo_mean_action,
-                ppo_ema_action,
-            ]
+        switchFactor = [0 for _ in range(len(trajectories))]
+
+        for i in range(len(environment.df.index.unique())):
+            # ppo_real, ppo_max, ppo_min, ppo_mean and ppo_ema actions
+            all_actions = [actions[i] for actions in modelActions]
 
             # Init final action
             finalAction = all_actions[lastSwitchModelIndex]
 
-            # When the number of days is greater than or equal to 10 days, execute the sparsification and switching rules
-            if i >= 10:
-                # Obtain the rewards for different models from day (i-5) to day i.
-                rewards = self.get_modelReward(environment, i, 5)
+            # When the number of days is greater than or equal to the warm-up, execute the sparsification and switching rules
+            if i >= self.warmup:
+                # Obtain the rewards for different models from day (i-horizon) to day i.
+                rewards = self.get_modelReward(assetMemories, i, self.horizon)
 
                 # Obtain the cumulative wealth of different models on day i.
-                newCW = self.get_modelNowCW(environment, i)
+                newCW = self.get_modelNowCW(assetMemories, i)
 
                 # Calculate the switchFactor of different models by the short-term average rewards and long-term rewards
                 for j in range(len(switchFactor)):
-                    switchFactor[j] = self.alpha * rewards[j] / 5 + (1 - self.alpha) * (newCW[j] - lastSwitchCW[j])
+                    switchFactor[j] = self.alpha * rewards[j] / self.horizon + (1 - self.alpha) * (newCW[j] - lastSwitchCW[j])
 
                 # Find the index of the maximum value in the switchFactor list
                 nowSwitchModelIndex = switchFactor.index(max(switchFactor))
@@ -89,13 +99,13 @@ class PPO_Switch:
                     chooseAction = all_actions[nowSwitchModelIndex]
 
                     # Sparse the chooseAction (invest in only one stock)
-                    finalAction = self.sparse_action(environment[0], chooseAction, self.stocksDim)
+                    finalAction = self.sparse_action(environment, chooseAction, self.stocksDim)
 
                     # According to the reward size within the window time, select the maximum reward window time
                     # in the self.switchWindows as the next switching window
                     cwList = [0 for _ in range(len(self.switchWindows))]
                     for j in range(len(self.switchWindows)):
-                        preCW = self.get_modelReward(environment, i, self.switchWindows[j])
+                        preCW = self.get_modelReward(assetMemories, i, self.switchWindows[j])
                         for k in range(len(newCW)):
                             cwList[j] += preCW[k]
                     switchWindow = self.switchWindows[np.argmax(cwList)]
@@ -103,12 +113,6 @@ class PPO_Switch:
                     # hold action
                     finalAction = [np.array([0 for _ in range(self.stocksDim)])]
 
-            ppo_max_obs, _, _, _ = ppo_max_env.step(ppo_max_action)
-            ppo_min_obs, _, _, _ = ppo_min_env.step(ppo_min_action)
-            ppo_mean_obs, _, _, _ = ppo_mean_env.step(ppo_mean_action)
-            ppo_ema_obs, _, _, _ = ppo_ema_env.step(ppo_ema_action)
-            ppo_real_obs, _, _, _ = ppo_real_env.step(ppo_real_action)
-
             _, _, dones, _ = ppo_switch_env.step(finalAction)
 
             if i == max_steps - 1:  # more descriptive condition for early termination to clarify the logic
@@ -140,30 +144,29 @@ class PPO_Switch:
             newAction[int(maxActionIndex)] = 1000000.0
         return [newAction]
 
-    def get_modelNowCW(self, environments, day):
+    def get_modelNowCW(self, assetMemories, day):
         """
-        Retrieves the current cumulative wealth from the given environments for a specific day.
+        Retrieves the current cumulative wealth of the models for a specific day.
 
-        :param environments: (list<object>) List of environment objects
+        :param assetMemories: (list<array>) The asset_memory of every model
         :param day: (int) Day index
         :return: (list<int>) List of cumulative wealth for the given day
         """
-        res = [0 for _ in range(len(environments) - 1)]
-        # Iterate over the environments (except the first one)
-        for i in range(len(environments) - 1):
-            res[i] = environments[i + 1].asset_memory[day]
+        res = [0 for _ in range(len(assetMemories))]
+        for i in range(len(assetMemories)):
+            res[i] = assetMemories[i][day]
         return res
 
-    def get_modelReward(self, environments, day, interval):
+    def get_modelReward(self, assetMemories, day, interval):
         """
         Calculates the reward based on the change in cumulative wealth between the current day and a specified interval.
 
-        :param environments: (list) List of environment objects
+        :param assetMemories: (list<array>) The asset_memory of every model
         :param day: Current day index
         :param interval: Time interval
         :return: List of rewards for the given interval
         """
-        res = [0 for _ in range(len(environments) - 1)]
-        for i in range(len(environments) - 1):
-            res[i] = environments[i + 1].asset_memory[day] - environments[i + 1].asset_memory[day - interval]
+        res = [0 for _ in range(len(assetMemories))]
+        for i in range(len(assetMemories)):
+            res[i] = assetMemories[i][day] - assetMemories[i][day - interval]
         return res
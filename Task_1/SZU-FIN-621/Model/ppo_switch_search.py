@@ -0,0 +1,195 @@
+"""
+Parallel search over the PPO_Switch hyperparameters.
+
+The five models are run over the validation dates once, through a
+TrajectoryCache. These fall between the training period of train.py and the
+backtest period of test.py, so the search never sees the dates it is
+evaluated on. After that a candidate setting of alpha, the switch windows, the warm-up and
+the reward horizon only replays the switch env over the recorded trajectories.
+The candidates, the full grid or a random sample of it, are spread over a
+process pool; every worker gets the trade rows and the trajectories once,
+when it starts. The return, Sharpe ratio and maximum drawdown of every
+candidate are written to one csv table:
+
+    python ppo_switch_search.py --data_file train_data.csv --samples 200
+
+A validation range overlapping the backtest dates is rejected.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import multiprocessing as mp
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from stable_baselines3 import PPO
+from finrl.config import TRAINED_MODEL_DIR
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import DatePanel, load_data
+from array_trading_env import ArrayStockTradingEnv
+
+from ppo_switch import PPO_Switch
+from trajectory_cache import TrajectoryCache
+from train import MEMBERS, TRAIN_END_DATE, get_env_kwargs
+
+# From the end of the training period to the start of the backtest
+VALIDATION_START_DATE = TRAIN_END_DATE
+VALIDATION_END_DATE = '2021-01-01'
+# The backtest period of test.py
+TEST_START_DATE = '2021-01-01'
+TEST_END_DATE = '2023-06-30'
+FILE_PATH = 'train_data.csv'
+
+# The default grid: 11 alphas times every set of one to three switch windows of 2 to 7 days
+ALPHAS = tuple(np.round(np.linspace(0, 1, 11), 2))
+SWITCH_WINDOWS = tuple(windows for size in (1, 2, 3) for windows in itertools.combinations(range(2, 8), size))
+WARMUPS = (10,)
+HORIZONS = (5,)
+
+# Per-process state set up by _init_worker.
+_worker = {}
+
+
+def candidates(alphas=ALPHAS, switch_windows=SWITCH_WINDOWS, warmups=WARMUPS, horizons=HORIZONS,
+               samples=None, seed=0):
+    """
+    The grid of PPO_Switch settings, or a random sample of it.
+    Settings whose warm-up is shorter than a switch window or the horizon are left out.
+    :param alphas: the alpha values.
+    :param switch_windows: the switchWindows lists.
+    :param warmups: the warm-up lengths, in days.
+    :param horizons: the short-term reward horizons, in days.
+    :param samples: the number of settings drawn without replacement, all of them if None.
+    :param seed: the random seed of the sample.
+    :return: a list of dicts of PPO_Switch keyword arguments.
+    """
+    grid = [dict(alpha=float(alpha), switchWindows=list(windows), warmup=warmup, horizon=horizon)
+            for alpha, windows, warmup, horizon in itertools.product(alphas, switch_windows, warmups, horizons)
+            if warmup >= max(list(windows) + [horizon])]
+    if samples is not None and samples < len(grid):
+        chosen = np.random.default_rng(seed).choice(len(grid), samples, replace=False)
+        grid = [grid[i] for i in sorted(chosen)]
+    return grid
+
+
+def check_validation_range(start_date, end_date, test_start_date=TEST_START_DATE, test_end_date=TEST_END_DATE):
+    """
+    Reject a search range sharing dates with the backtest, which would select
+    the hyperparameters on the dates they are evaluated on.
+    Both ranges hold the dates start <= date < end, as data_split does.
+    :raise ValueError: if the ranges overlap.
+    """
+    if start_date < test_end_date and test_start_date < end_date:
+        raise ValueError('the search range %s to %s overlaps the test range %s to %s'
+                         % (start_date, end_date, test_start_date, test_end_date))
+
+
+def performance(account_value):
+    """
+    :param account_value: the frame of save_asset_memory, with an account_value column.
+    :return: a dict with the cumulative return, the annualised Sharpe ratio of
+        the daily returns and the maximum drawdown, a negative fraction.
+    """
+    values = account_value['account_value'].to_numpy(dtype=np.float64)
+    returns = values[1:] / values[:-1] - 1
+    std = returns.std(ddof=1) if len(returns) > 1 else 0
+    return {'return': values[-1] / values[0] - 1,
+            'sharpe': (252 ** 0.5) * returns.mean() / std if std > 0 else np.nan,
+            'max_drawdown': (values / np.maximum.accumulate(values) - 1).min()}
+
+
+def _init_worker(trade, env_kwargs, trajectories):
+    # One switch env per worker, reset by every replay
+    _worker['env'] = ArrayStockTradingEnv(df=trade, **env_kwargs)
+    _worker['trajectories'] = trajectories
+
+
+def _evaluate(candidate):
+    env = _worker['env']
+    switch = PPO_Switch(stocksDimension=env.stock_dim, hmax=env.hmax, **candidate)
+    # replay prints when it hits the end of the dates
+    with contextlib.redirect_stdout(io.StringIO()):
+        account_value, _ = switch.replay(_worker['trajectories'], env)
+    return dict(candidate, switchWindows=','.join(str(w) for w in candidate['switchWindows']),
+                **performance(account_value))
+
+
+def search(trade, env_kwargs, trajectories, settings, n_jobs=None):
+    """
+    Replay the switch under every setting.
+    :param trade: the validation rows, indexed by day as data_split returns them.
+    :param env_kwargs: the arguments of the switch env.
+    :param trajectories: the member trajectories, as TrajectoryCache.get returns them, in MEMBERS order.
+    :param settings: a list of PPO_Switch keyword arguments, as candidates returns them.
+    :param n_jobs: number of worker processes, os.cpu_count() by default; 1 runs in this process.
+    :return: a DataFrame with the setting and performance of every candidate, in the order of settings.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        _init_worker(trade, env_kwargs, trajectories)
+        rows = [_evaluate(setting) for setting in settings]
+    else:
+        chunksize = max(1, len(settings) // (4 * n_jobs))
+        with mp.Pool(n_jobs, _init_worker, (trade, env_kwargs, trajectories)) as pool:
+            rows = pool.map(_evaluate, settings, chunksize)
+    return pd.DataFrame(rows, columns=['alpha', 'switchWindows', 'warmup', 'horizon',
+                                       'return', 'sharpe', 'max_drawdown'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search the PPO_Switch hyperparameters')
+    parser.add_argument('--start_date', default=VALIDATION_START_DATE,
+                        help='Validation start date (default: {})'.format(VALIDATION_START_DATE))
+    parser.add_argument('--end_date', default=VALIDATION_END_DATE,
+                        help='Validation end date (default: {})'.format(VALIDATION_END_DATE))
+    parser.add_argument('--test_start_date', default=TEST_START_DATE,
+                        help='Start date of the backtest of test.py, which the validation must not reach '
+                             '(default: {})'.format(TEST_START_DATE))
+    parser.add_argument('--test_end_date', default=TEST_END_DATE,
+                        help='End date of the backtest of test.py (default: {})'.format(TEST_END_DATE))
+    parser.add_argument('--data_file', default=FILE_PATH,
+                        help='Validation data file, a csv or a columnar_data store')
+    parser.add_argument('--trajectory_cache', default='./trajectory_cache',
+                        help='Directory keeping the trajectories of the five models')
+    parser.add_argument('--alphas', nargs='+', type=float, default=list(ALPHAS), help='alpha values')
+    parser.add_argument('--switch_windows', nargs='+', default=None,
+                        help='switchWindows lists, comma separated, such as 2,5,7 '
+                             '(default: every set of one to three windows of 2 to 7 days)')
+    parser.add_argument('--warmups', nargs='+', type=int, default=list(WARMUPS), help='warm-up lengths in days')
+    parser.add_argument('--horizons', nargs='+', type=int, default=list(HORIZONS),
+                        help='short-term reward horizons in days')
+    parser.add_argument('--samples', type=int, default=None, help='random sample of the grid to evaluate')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the sample')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: the cores)')
+    parser.add_argument('--output', default='ppo_switch_search.csv', help='where to write the table')
+    parser.add_argument('--sort_by', default='sharpe', choices=['return', 'sharpe', 'max_drawdown'],
+                        help='column the table is sorted by, best first')
+    args = parser.parse_args()
+    try:
+        check_validation_range(args.start_date, args.end_date, args.test_start_date, args.test_end_date)
+    except ValueError as e:
+        parser.error(str(e))
+
+    switch_windows = SWITCH_WINDOWS
+    if args.switch_windows is not None:
+        switch_windows = [tuple(int(w) for w in windows.split(',')) for windows in args.switch_windows]
+    settings = candidates(args.alphas, switch_windows, args.warmups, args.horizons, args.samples, args.seed)
+
+    processed_full = load_data(args.data_file, args.start_date, args.end_date)
+    trade = DatePanel(processed_full).split(args.start_date, args.end_date)
+    env_kwargs = get_env_kwargs(trade)
+
+    # The models run once per data range; later searches read their trajectories from the cache
+    cache = TrajectoryCache(args.trajectory_cache)
+    trajectories = [cache.get(PPO.load(TRAINED_MODEL_DIR + '/' + model_name),
+                              ArrayStockTradingEnv(df=trade, **env_kwargs)) for model_name, _ in MEMBERS]
+
+    table = search(trade, env_kwargs, trajectories, settings, args.jobs)
+    table = table.sort_values(args.sort_by, ascending=False, ignore_index=True)
+    table.to_csv(args.output, index=False)
+    print(table.head(20).to_string(index=False, float_format='%.4f'))
+    print('%d candidates written to %s' % (len(table), args.output))
@@ -0,0 +1,219 @@
+"""
+Generator of the PPO_Switch training datasets.
+
+ppo_max, ppo_min, ppo_mean and ppo_ema are trained on price features of the
+real data, each built from the last WINDOW prices p(t - k), 0 <= k < WINDOW,
+of a ticker (Eq. 1 of the PPO-Switch paper):
+- max: the largest of them;
+- min: the smallest;
+- mean: their mean;
+- ema: their average weighted by BETA * (1 - BETA)^k. The weights are
+  normalised to sum to 1, so the feature stays a price (the bare sum would be
+  1 - (1 - BETA)^WINDOW, about 0.87, times one).
+The first WINDOW - 1 dates use the prices they have.
+
+Every price column is replaced by its feature and the technical indicators
+are recomputed from the new prices, as FeatureEngineer computes them with
+stockstats 0.5.4. The other columns, volume included, are those of the real
+data. The features and indicators of all the variants are computed together
+on a [T, variants * tickers] panel, and each variant is written as a
+columnar_data store, or a csv:
+
+    python synthetic_data.py train_data.csv ./train_data
+"""
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import load_data, write_store
+
+WINDOW = 6
+BETA = 2 / 7
+VARIANTS = ('max', 'min', 'mean', 'ema')
+PRICES = ('open', 'high', 'low', 'close')
+# finrl.config.INDICATORS, which train.py and test.py observe
+INDICATORS = ['macd', 'boll_ub', 'boll_lb', 'rsi_30', 'cci_30', 'dx_30', 'close_30_sma', 'close_60_sma']
+
+
+def window_features(prices, variants=VARIANTS, window=WINDOW, beta=BETA):
+    """
+    :param prices: a [T, ...] array, time first.
+    :param variants: names from VARIANTS.
+    :param window: the number of prices each feature is built from.
+    :param beta: the decay factor of the ema.
+    :return: a dict mapping each variant to an array shaped like prices.
+    """
+    padded = np.concatenate([np.full((window - 1,) + prices.shape[1:], np.nan), prices])
+    # [T, ..., window], the oldest price first
+    windows = sliding_window_view(padded, window, axis=0)
+    features = {}
+    with np.errstate(invalid='ignore'):
+        for variant in variants:
+            if variant == 'max':
+                features[variant] = np.nanmax(windows, axis=-1)
+            elif variant == 'min':
+                features[variant] = np.nanmin(windows, axis=-1)
+            elif variant == 'mean':
+                features[variant] = np.nanmean(windows, axis=-1)
+            elif variant == 'ema':
+                weights = beta * (1 - beta) ** np.arange(window - 1, -1, -1)
+                present = ~np.isnan(windows)
+                features[variant] = np.nansum(windows * weights, axis=-1) / (present * weights).sum(axis=-1)
+            else:
+                raise ValueError('unknown variant: %s' % variant)
+    return features
+
+
+def _ema(x, span):
+    return x.ewm(span=span, min_periods=0, adjust=True, ignore_na=False).mean()
+
+
+def _smma(x, window):
+    return x.ewm(alpha=1.0 / window, min_periods=0, adjust=True, ignore_na=False).mean()
+
+
+def _sma(x, window):
+    return x.rolling(window, min_periods=1).mean()
+
+
+def _mean_deviation(x, window):
+    # Rolling mean absolute deviation with min_periods=1, over every column at once
+    values = x.to_numpy()
+    padded = np.concatenate([np.full((window - 1, values.shape[1]), np.nan), values])
+    windows = sliding_window_view(padded, window, axis=0)
+    with np.errstate(invalid='ignore'):
+        deviation = np.abs(windows - np.nanmean(windows, axis=-1, keepdims=True))
+        return pd.DataFrame(np.nanmean(deviation, axis=-1), index=x.index, columns=x.columns)
+
+
+def indicators(high, low, close, names=INDICATORS):
+    """
+    The stockstats 0.5.4 indicators FeatureEngineer adds, on every column at once.
+    :param high: a [T, M] DataFrame of high prices, one column per series.
+    :param low: the low prices.
+    :param close: the close prices.
+    :param names: indicator names: macd, boll_ub, boll_lb, rsi_<n>, cci_<n>, dx_<n> or close_<n>_sma.
+    :return: a dict mapping each name to a [T, M] DataFrame.
+    """
+    out = {}
+    for name in names:
+        window = int((re.findall(r'_(\d+)', name) or [0])[0])
+        if name == 'macd':
+            out[name] = _ema(close, 12) - _ema(close, 26)
+        elif name in ('boll_ub', 'boll_lb'):
+            width = 2 * close.rolling(20, min_periods=1).std()
+            out[name] = _sma(close, 20) + width if name == 'boll_ub' else _sma(close, 20) - width
+        elif re.fullmatch(r'rsi_\d+', name):
+            change = close.diff().fillna(0.0)
+            rs = _smma((change + change.abs()) / 2, window) / _smma((-change + change.abs()) / 2, window)
+            out[name] = 100 - 100 / (1.0 + rs)
+        elif re.fullmatch(r'cci_\d+', name):
+            tp = (close + high + low).divide(3.0)
+            out[name] = (tp - _sma(tp, window)) / (.015 * _mean_deviation(tp, window))
+        elif re.fullmatch(r'dx_\d+', name):
+            up = high.diff()
+            up = (up + up.abs()) / 2
+            down = -low.diff()
+            down = (down + down.abs()) / 2
+            prev_close = close.shift(1)
+            prev_close.iloc[:1] = close.iloc[:1].to_numpy()
+            tr = np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+            atr = _smma(tr, window)
+            pdi = _ema(up.where(up > down, 0), window) / atr * 100
+            mdi = _ema(down.where(down > up, 0), window) / atr * 100
+            out[name] = abs(pdi - mdi) / (pdi + mdi) * 100
+        elif re.fullmatch(r'close_\d+_sma', name):
+            out[name] = _sma(close, window)
+        else:
+            raise ValueError('unknown indicator: %s' % name)
+    return out
+
+
+def make_variants(df, variants=VARIANTS, window=WINDOW, beta=BETA, tech_indicator_list=INDICATORS):
+    """
+    Build the training datasets of the variants from the real data.
+    :param df: a long-format frame with date, tic, the PRICES and the indicator
+        columns, every ticker having a row on every date, as FeatureEngineer returns.
+    :param variants: names from VARIANTS.
+    :param window: the number of prices each feature is built from.
+    :param beta: the decay factor of the ema.
+    :param tech_indicator_list: the indicators recomputed from the new prices.
+    :return: a dict mapping each variant to a frame with the rows and columns of df.
+    """
+    df = df.sort_values(['date', 'tic'], ignore_index=True)
+    dates = df['date'].unique()
+    tickers = np.asarray(df['tic'].unique())
+    shape = (len(dates), len(tickers))
+    if len(df) != shape[0] * shape[1] or (df['tic'].to_numpy().reshape(shape) != tickers).any():
+        raise ValueError('every ticker needs one row per date: %d rows for %d dates x %d tickers'
+                         % (len(df), shape[0], shape[1]))
+    # [T, price, N]; rows are already in (date, tic) order
+    prices = np.stack([df[name].to_numpy(dtype=np.float64).reshape(shape) for name in PRICES], axis=1)
+    features = window_features(prices, variants, window, beta)
+    # Variant-major columns, every variant's indicators in one pass
+    panel = np.concatenate([features[variant] for variant in variants], axis=2)
+    frames = dict((name, pd.DataFrame(panel[:, i])) for i, name in enumerate(PRICES))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tech = indicators(frames['high'], frames['low'], frames['close'], tech_indicator_list)
+    columns = dict((name, frames[name].to_numpy()) for name in PRICES)
+    columns.update((name, values.to_numpy()) for name, values in tech.items())
+
+    out = {}
+    for i, variant in enumerate(variants):
+        block = slice(i * shape[1], (i + 1) * shape[1])
+        data = df.copy()
+        for name, values in columns.items():
+            data[name] = values[:, block].ravel()
+        # FeatureEngineer fills the warm-up gaps the same way, down the (date, tic) rows
+        data[list(tech)] = data[list(tech)].ffill().bfill()
+        out[variant] = data
+    return out
+
+
+def write_variants(df, root, variants=VARIANTS, csv=False, real=True, **kwargs):
+    """
+    Write the datasets of the variants under root as <variant>_train_data.cols
+    stores, or <variant>_train_data.csv files if csv.
+    :param df: the real data, see make_variants.
+    :param root: the output directory.
+    :param variants: names from VARIANTS.
+    :param csv: write csv files instead of columnar stores.
+    :param real: also write df itself as real_train_data.
+    :param kwargs: the other arguments of make_variants.
+    :return: a dict mapping each dataset name to its path.
+    """
+    os.makedirs(root, exist_ok=True)
+    datasets = make_variants(df, variants, **kwargs)
+    if real:
+        datasets = dict([('real', df)] + list(datasets.items()))
+    paths = {}
+    for name, data in datasets.items():
+        paths[name] = os.path.join(root, '%s_train_data.%s' % (name, 'csv' if csv else 'cols'))
+        if csv:
+            data.to_csv(paths[name], index=False)
+        else:
+            write_store(data, paths[name])
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the PPO_Switch training datasets')
+    parser.add_argument('source', help='the real data, a csv or a columnar_data store')
+    parser.add_argument('root', help='directory the datasets are written to')
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS), choices=VARIANTS, help='datasets to generate')
+    parser.add_argument('--window', type=int, default=WINDOW, help='prices each feature is built from')
+    parser.add_argument('--beta', type=float, default=BETA, help='decay factor of the ema')
+    parser.add_argument('--csv', action='store_true', help='write csv files instead of columnar stores')
+    args = parser.parse_args()
+
+    source = load_data(args.source)
+    paths = write_variants(source, args.root, args.variants, args.csv, window=args.window, beta=args.beta)
+    for name, path in paths.items():
+        print('%s: %s' % (name, path))
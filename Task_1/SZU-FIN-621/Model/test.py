@@ -4,20 +4,25 @@
 @describe: This software serves as our submission for the 4th ACM ICAIF 2023 FinRL Contest.
 @date: 2023-11-12
 """
-import pandas as pd
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import argparse
 
-from finrl.meta.preprocessor.preprocessors import data_split
-from finrl.meta.env_stock_trading.env_stocktrading import StockTradingEnv
 from finrl.agents.stablebaselines3.models import DRLAgent
 from stable_baselines3 import PPO
 from finrl.main import check_and_make_directories
 from finrl.config import INDICATORS, TRAINED_MODEL_DIR
 from finrl.plot import backtest_stats
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import DatePanel, load_data
+from array_trading_env import ArrayStockTradingEnv
 
 # Multiple agents switching model designed by us
 from ppo_switch import PPO_Switch
+from trajectory_cache import TrajectoryCache
 
 # Contestants are welcome to split the data in their own way for model tuning
 
@@ -40,14 +45,19 @@ if __name__ == '__main__':
                         help='Trade start date (default: {})'.format(TRADE_START_DATE))
     parser.add_argument('--end_date', default=TRADE_END_DATE,
                         help='Trade end date (default: {})'.format(TRADE_END_DATE))
-    parser.add_argument('--data_file', default=FILE_PATH, help='Trade data file')
+    parser.add_argument('--data_file', default=FILE_PATH, help='Trade data file, a csv or a columnar_data store')
+    parser.add_argument('--trajectory_cache', default=None,
+                        help='Directory keeping the trajectories of the five models, so that a re-run only '
+                             'steps the switch env (default: the models are run every time)')
 
     args = parser.parse_args()
     TRADE_START_DATE = args.start_date
     TRADE_END_DATE = args.end_date
 
-    processed_full = pd.read_csv(args.data_file)
-    trade = data_split(processed_full, TRADE_START_DATE, TRADE_END_DATE)
+    # Only the partitions of a store that hold trade dates are read
+    processed_full = load_data(args.data_file, TRADE_START_DATE, TRADE_END_DATE)
+    # A view of the sorted panel, indexed by day like data_split returns
+    trade = DatePanel(processed_full).split(TRADE_START_DATE, TRADE_END_DATE)
 
     stock_dimension = len(trade.tic.unique())
     state_space = 1 + 2 * stock_dimension + len(INDICATORS) * stock_dimension
@@ -73,12 +83,12 @@ if __name__ == '__main__':
     check_and_make_directories([TRAINED_MODEL_DIR])
 
     # Environment
-    e_trade_gym_switch = StockTradingEnv(df=trade, **env_kwargs)
-    e_trade_gym_real = StockTradingEnv(df=trade, **env_kwargs)
-    e_trade_gym_max = StockTradingEnv(df=trade, **env_kwargs)
-    e_trade_gym_min = StockTradingEnv(df=trade, **env_kwargs)
-    e_trade_gym_mean = StockTradingEnv(df=trade, **env_kwargs)
-    e_trade_gym_ema = StockTradingEnv(df=trade, **env_kwargs)
+    e_trade_gym_switch = ArrayStockTradingEnv(df=trade, **env_kwargs)
+    e_trade_gym_real = ArrayStockTradingEnv(df=trade, **env_kwargs)
+    e_trade_gym_max = ArrayStockTradingEnv(df=trade, **env_kwargs)
+    e_trade_gym_min = ArrayStockTradingEnv(df=trade, **env_kwargs)
+    e_trade_gym_mean = ArrayStockTradingEnv(df=trade, **env_kwargs)
+    e_trade_gym_ema = ArrayStockTradingEnv(df=trade, **env_kwargs)
 
     # PPO agent
     # ppo_real model is trained with the real train datas
@@ -109,7 +119,8 @@ if __name__ == '__main__':
     df_result_ppo, df_actions_ppo = ppo_switch.DRL_prediction(
         model=[ppo_real, ppo_max, ppo_min, ppo_mean, ppo_ema],
         environment=[e_trade_gym_switch, e_trade_gym_real, e_trade_gym_max,
-                     e_trade_gym_min, e_trade_gym_mean, e_trade_gym_ema])
+                     e_trade_gym_min, e_trade_gym_mean, e_trade_gym_ema],
+        cache=TrajectoryCache(args.trajectory_cache) if args.trajectory_cache else None)
 
     print("==============Get Backtest Results===========")
     perf_stats_all = backtest_stats(account_value=df_result_ppo)
@@ -0,0 +1,38 @@
+"""
+Shared fixtures: a small real-like dataset with every ticker on every date
+and the indicator columns FeatureEngineer adds.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules of the Model directory and of Task_1, imported as the scripts import them
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+sys.path.insert(0, os.path.join(HERE, '..', '..', '..'))
+from synthetic_data import INDICATORS, indicators
+
+
+@pytest.fixture(scope='session')
+def real():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2020-01-01', '2020-06-30').strftime('%Y-%m-%d')
+    tickers = ['AAPL', 'IBM', 'MSFT', 'WMT']
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), len(tickers))), axis=0))
+    spread = rng.uniform(0, 0.02, close.shape)
+    prices = dict(close=close, open=close * (1 + rng.normal(0, 0.005, close.shape)),
+                  high=close * (1 + spread), low=close * (1 - spread))
+    tech = indicators(pd.DataFrame(prices['high']), pd.DataFrame(prices['low']), pd.DataFrame(prices['close']))
+    df = pd.DataFrame({'date': np.repeat(dates, len(tickers)), 'tic': np.tile(tickers, len(dates))})
+    for name in ('open', 'high', 'low', 'close'):
+        df[name] = prices[name].ravel()
+    df['volume'] = rng.integers(10 ** 6, 10 ** 8, len(df)).astype(np.float64)
+    df['day'] = pd.to_datetime(df['date']).dt.dayofweek
+    for name in INDICATORS:
+        df[name] = tech[name].to_numpy().ravel()
+    df[INDICATORS] = df[INDICATORS].ffill().bfill()
+    df.index = df['date'].factorize()[0]
+    return df
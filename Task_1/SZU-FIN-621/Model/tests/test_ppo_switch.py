@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('stable_baselines3')
+from stable_baselines3 import PPO
+
+from array_trading_env import ArrayStockTradingEnv
+from ppo_switch import PPO_Switch
+from synthetic_data import INDICATORS
+from trajectory_cache import TrajectoryCache, record_member
+
+
+def _env(df, **kwargs):
+    stock_dim = df['tic'].nunique()
+    return ArrayStockTradingEnv(df=df, **dict(dict(
+        stock_dim=stock_dim, hmax=100, initial_amount=1000000, num_stock_shares=[0] * stock_dim,
+        buy_cost_pct=[0.001] * stock_dim, sell_cost_pct=[0.001] * stock_dim, reward_scaling=1e-4,
+        state_space=1 + (2 + len(INDICATORS)) * stock_dim, action_space=stock_dim,
+        tech_indicator_list=INDICATORS, print_verbosity=1000), **kwargs))
+
+
+@pytest.fixture(scope='module')
+def models(real):
+    # Untrained policies, which still act differently from one another
+    return [PPO('MlpPolicy', _env(real), n_steps=64, batch_size=32, seed=seed) for seed in range(3)]
+
+
+def _step_together(switch, models, environment, deterministic=True):
+    # The switch as it ran before replay: every model stepped in its env alongside the switch env
+    vec_envs = [env.get_sb_env() for env in environment]
+    obs = [o for _, o in vec_envs]
+    n_days = len(environment[0].df.index.unique())
+    trajectories = [{'actions': [], 'asset_memory': None} for _ in models]
+    for i in range(n_days):
+        for k, model in enumerate(models):
+            action, _ = model.predict(obs[k + 1], deterministic=deterministic)
+            trajectories[k]['actions'].append(action)
+            trajectories[k]['asset_memory'] = environment[k + 1].asset_memory
+            obs[k + 1], _, dones, _ = vec_envs[k + 1][0].step(action)
+        if dones[0]:
+            break
+    trajectories = [{'actions': np.array(t['actions']), 'asset_memory': np.array(t['asset_memory'])}
+                    for t in trajectories]
+    return switch.replay(trajectories, environment[0])
+
+
+def test_replay_matches_stepping_the_models(real, models):
+    switch = PPO_Switch(stocksDimension=4, switchWindows=[2, 5, 7], alpha=0.3)
+    account, actions = switch.DRL_prediction(models, [_env(real) for _ in range(len(models) + 1)])
+    expected_account, expected_actions = _step_together(switch, models, [_env(real) for _ in range(len(models) + 1)])
+    pd.testing.assert_frame_equal(account, expected_account)
+    pd.testing.assert_frame_equal(actions, expected_actions)
+    # The members trade, so the switch has something to choose from
+    assert account['account_value'].nunique() > 1
+
+
+def test_cached_prediction(real, models, tmp_path, monkeypatch):
+    switch = PPO_Switch(stocksDimension=4, switchWindows=[2, 5, 7], alpha=0.3)
+    environment = lambda: [_env(real) for _ in range(len(models) + 1)]
+    cache = TrajectoryCache(str(tmp_path))
+    expected = switch.DRL_prediction(models, environment())
+    cold = switch.DRL_prediction(models, environment(), cache=cache)
+    assert len(os.listdir(str(tmp_path))) == len(models)
+    # A warm cache does not run the models at all
+    for model in models:
+        monkeypatch.setattr(model, 'predict', None)
+    warm = switch.DRL_prediction(models, environment(), cache=cache)
+    for result in (cold, warm):
+        pd.testing.assert_frame_equal(result[0], expected[0])
+        pd.testing.assert_frame_equal(result[1], expected[1])
+
+
+def test_trajectory_cache_keys(real, models, tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    entries = lambda: len(os.listdir(str(tmp_path)))
+    first = cache.get(models[0], _env(real))
+    np.testing.assert_array_equal(first['asset_memory'], record_member(models[0], _env(real))['asset_memory'])
+    hit = cache.get(models[0], _env(real))
+    assert entries() == 1
+    for name in first:
+        np.testing.assert_array_equal(hit[name], first[name])
+    # Other policy parameters, env configuration, rows or sampling each make a new entry
+    cache.get(models[1], _env(real))
+    assert entries() == 2
+    cache.get(models[0], _env(real, hmax=50))
+    assert entries() == 3
+    changed = real.copy()
+    changed.iloc[-1, changed.columns.get_loc('close')] += 1
+    cache.get(models[0], _env(changed))
+    assert entries() == 4
+    cache.get(models[0], _env(real), deterministic=False)
+    assert entries() == 5
+    later = real[real['date'] >= '2020-02-01']
+    later.index = later['date'].factorize()[0]
+    assert len(cache.get(models[0], _env(later))['asset_memory']) == later.index.nunique()
+    assert entries() == 6
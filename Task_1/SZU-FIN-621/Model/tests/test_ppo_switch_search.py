@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip('finrl')
+pytest.importorskip('stable_baselines3')
+import ppo_switch_search
+from ppo_switch_search import check_validation_range
+
+
+def test_default_range_ends_before_the_test_dates():
+    assert ppo_switch_search.VALIDATION_END_DATE <= ppo_switch_search.TEST_START_DATE
+    check_validation_range(ppo_switch_search.VALIDATION_START_DATE, ppo_switch_search.VALIDATION_END_DATE)
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2021-01-01', '2023-06-30'),
+    ('2019-01-01', '2021-01-02'),
+    ('2023-06-29', '2024-01-01'),
+    ('2018-01-01', '2024-01-01'),
+])
+def test_overlapping_range_is_rejected(start, end):
+    with pytest.raises(ValueError):
+        check_validation_range(start, end, '2021-01-01', '2023-06-30')
+
+
+@pytest.mark.parametrize('start, end', [('2015-07-01', '2021-01-01'), ('2023-06-30', '2024-01-01')])
+def test_disjoint_range_is_accepted(start, end):
+    check_validation_range(start, end, '2021-01-01', '2023-06-30')
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_data import load_data
+from synthetic_data import INDICATORS, PRICES, VARIANTS, WINDOW, indicators, make_variants, window_features, write_variants
+
+
+def test_window_features_match_rolling():
+    rng = np.random.default_rng(1)
+    prices = rng.uniform(10, 20, (40, 3))
+    features = window_features(prices)
+    # The first WINDOW - 1 dates use the prices they have
+    rolling = pd.DataFrame(prices).rolling(WINDOW, min_periods=1)
+    np.testing.assert_allclose(features['max'], rolling.max().to_numpy(), rtol=0)
+    np.testing.assert_allclose(features['min'], rolling.min().to_numpy(), rtol=0)
+    np.testing.assert_allclose(features['mean'], rolling.mean().to_numpy(), rtol=1e-12)
+    beta = 2 / 7
+    for t in (0, 3, WINDOW - 1, 20):
+        window = prices[max(0, t - WINDOW + 1):t + 1][::-1]
+        weights = beta * (1 - beta) ** np.arange(len(window))
+        np.testing.assert_allclose(features['ema'][t], weights @ window / weights.sum(), rtol=1e-12)
+    with pytest.raises(ValueError):
+        window_features(prices, ['median'])
+
+
+def test_indicators_on_columns_match_one_column():
+    rng = np.random.default_rng(2)
+    close = pd.DataFrame(100 + np.cumsum(rng.normal(0, 1, (90, 3)), axis=0))
+    high, low = close + rng.uniform(0, 1, close.shape), close - rng.uniform(0, 1, close.shape)
+    together = indicators(high, low, close)
+    assert set(together) == set(INDICATORS)
+    for j in range(close.shape[1]):
+        alone = indicators(high[[j]], low[[j]], close[[j]])
+        for name in INDICATORS:
+            np.testing.assert_allclose(together[name][j].to_numpy(), alone[name][j].to_numpy(), rtol=1e-12,
+                                       err_msg=name)
+    np.testing.assert_allclose(together['close_30_sma'].to_numpy(), close.rolling(30, min_periods=1).mean().to_numpy())
+
+
+def test_indicators_match_stockstats():
+    stockstats = pytest.importorskip('stockstats')
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, 120))
+    frame = pd.DataFrame({'open': close, 'close': close, 'high': close + rng.uniform(0, 1, 120),
+                          'low': close - rng.uniform(0, 1, 120), 'volume': 1.0})
+    ours = indicators(frame[['high']], frame[['low']], frame[['close']])
+    stock = stockstats.StockDataFrame.retype(frame.copy())
+    for name in INDICATORS:
+        np.testing.assert_allclose(ours[name][0].to_numpy()[60:], stock[name].to_numpy()[60:], rtol=1e-9,
+                                   err_msg=name)
+
+
+def test_make_variants(real):
+    variants = make_variants(real)
+    assert list(variants) == list(VARIANTS)
+    dates = real['date'].unique()
+    tickers = list(real['tic'].unique())
+    shape = (len(dates), len(tickers))
+    for variant, data in variants.items():
+        assert list(data.columns) == list(real.columns) and len(data) == len(real)
+        assert list(data['date']) == list(real['date']) and list(data['tic']) == list(real['tic'])
+        # The prices are replaced by their feature, the volume kept
+        for name in PRICES:
+            expected = window_features(real[name].to_numpy().reshape(shape), [variant])[variant]
+            np.testing.assert_allclose(data[name].to_numpy().reshape(shape), expected, rtol=1e-12)
+        np.testing.assert_array_equal(data['volume'].to_numpy(), real['volume'].to_numpy())
+        # And the indicators recomputed from them
+        frames = dict((name, pd.DataFrame(data[name].to_numpy().reshape(shape))) for name in PRICES)
+        tech = indicators(frames['high'], frames['low'], frames['close'])
+        for name in INDICATORS:
+            expected = pd.Series(tech[name].to_numpy().ravel()).ffill().bfill().to_numpy()
+            np.testing.assert_allclose(data[name].to_numpy(), expected, rtol=1e-9, err_msg=name)
+    with pytest.raises(ValueError):
+        make_variants(real.iloc[1:])
+
+
+def test_write_variants(real, tmp_path):
+    paths = write_variants(real, str(tmp_path), variants=['max', 'ema'])
+    assert sorted(paths) == ['ema', 'max', 'real']
+    assert paths['max'] == str(tmp_path / 'max_train_data.cols')
+    ema = make_variants(real, ['ema'])['ema']
+    stored = load_data(paths['ema'])
+    for name in PRICES + ('volume',):
+        np.testing.assert_array_equal(stored[name].to_numpy(), ema[name].to_numpy())
+    np.testing.assert_allclose(stored['macd'].to_numpy(), ema['macd'].to_numpy(), rtol=1e-6)
+    csv = write_variants(real, str(tmp_path / 'csv'), variants=['min'], csv=True, real=False)
+    assert list(csv) == ['min'] and csv['min'].endswith('min_train_data.csv')
+    assert len(pd.read_csv(csv['min'])) == len(real)
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+pytest.importorskip('finrl')
+pytest.importorskip('stable_baselines3')
+from stable_baselines3 import PPO
+
+import train
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_train_members(real, tmp_path, monkeypatch, jobs):
+    # Members in sequence and in worker processes, each saved under its own name
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(train, 'TRAINED_MODEL_DIR', str(tmp_path / 'trained_models'))
+    monkeypatch.setattr(train, 'RESULTS_DIR', str(tmp_path / 'results'))
+    monkeypatch.setattr(train, 'PPO_PARAMS', dict(train.PPO_PARAMS, n_steps=64, batch_size=32))
+    members = [('ppo_a', None), ('ppo_b', None)]
+    later = real[real['date'] >= '2020-02-01']
+    later.index = later['date'].factorize()[0]
+    trains = [real, later]
+    paths = train.train_members(members, trains, jobs=jobs, num_envs=2, threads=1, total_timesteps=128)
+    assert paths == [str(tmp_path / 'trained_models' / name) for name, _ in members]
+    for (name, _), path in zip(members, paths):
+        model = PPO.load(path)
+        assert model.observation_space.shape == (1 + (2 + len(train.INDICATORS)) * 4,)
+        assert os.path.isdir(str(tmp_path / 'results' / name))
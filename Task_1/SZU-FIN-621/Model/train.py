@@ -4,42 +4,35 @@
 @describe: This software serves as our submission for the 4th ACM ICAIF 2023 FinRL Contest.
 @date: 2023-11-12
 """
-import pandas as pd
+import argparse
+import multiprocessing as mp
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
 from finrl.meta.preprocessor.preprocessors import data_split
-from finrl.meta.env_stock_trading.env_stocktrading import StockTradingEnv
 from finrl.agents.stablebaselines3.models import DRLAgent
 from stable_baselines3.common.logger import configure
 from finrl.main import check_and_make_directories
 from finrl.config import INDICATORS, TRAINED_MODEL_DIR, RESULTS_DIR
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import load_data
+from array_trading_env import ArrayStockTradingEnv, shard_ppo_params
 
 # Contestants are welcome to split the data in their own way for model tuning
 TRAIN_START_DATE = '2010-07-01'
 TRAIN_END_DATE = '2015-07-01'
-model_name = 'ppo_ema'
-processed_full = pd.read_csv('./train_data/ema_train_data.csv')
-
-train = data_split(processed_full, TRAIN_START_DATE, TRAIN_END_DATE)
-
-# Environment configs
-stock_dimension = len(train.tic.unique())
-state_space = 1 + 2 * stock_dimension + len(INDICATORS) * stock_dimension
-print(f"Stock Dimension: {stock_dimension}, State Space: {state_space}")
-
-buy_cost_list = sell_cost_list = [0.001] * stock_dimension
-num_stock_shares = [0] * stock_dimension
-
-env_kwargs = {
-    "hmax": 100,
-    "initial_amount": 1000000,
-    "num_stock_shares": num_stock_shares,
-    "buy_cost_pct": buy_cost_list,
-    "sell_cost_pct": sell_cost_list,
-    "state_space": state_space,
-    "stock_dim": stock_dimension,
-    "tech_indicator_list": INDICATORS,
-    "action_space": stock_dimension,
-    "reward_scaling": 1e-4
-}
+# (model name, train data file) of the PPO_Switch members, in the order test.py passes them,
+# as synthetic_data.py writes them: python synthetic_data.py train_data.csv ./train_data
+MEMBERS = [
+    ('ppo_real', './train_data/real_train_data.cols'),
+    ('ppo_max', './train_data/max_train_data.cols'),
+    ('ppo_min', './train_data/min_train_data.cols'),
+    ('ppo_mean', './train_data/mean_train_data.cols'),
+    ('ppo_ema', './train_data/ema_train_data.cols'),
+]
 
 # PPO configs
 PPO_PARAMS = {
@@ -49,25 +42,114 @@ PPO_PARAMS = {
     "batch_size": 128,
 }
 
-if __name__ == '__main__':
-    check_and_make_directories([TRAINED_MODEL_DIR])
+
+def get_env_kwargs(train):
+    # Environment configs
+    stock_dimension = len(train.tic.unique())
+    state_space = 1 + 2 * stock_dimension + len(INDICATORS) * stock_dimension
+    print(f"Stock Dimension: {stock_dimension}, State Space: {state_space}")
+
+    buy_cost_list = sell_cost_list = [0.001] * stock_dimension
+    num_stock_shares = [0] * stock_dimension
+
+    return {
+        "hmax": 100,
+        "initial_amount": 1000000,
+        "num_stock_shares": num_stock_shares,
+        "buy_cost_pct": buy_cost_list,
+        "sell_cost_pct": sell_cost_list,
+        "state_space": state_space,
+        "stock_dim": stock_dimension,
+        "tech_indicator_list": INDICATORS,
+        "action_space": stock_dimension,
+        "reward_scaling": 1e-4
+    }
+
+
+def train_member(train, model_name, num_envs=1, subprocess=False, threads=None, stdout=True,
+                 total_timesteps=80000):
+    """
+    Train and save one PPO_Switch member.
+    :param train: the training rows, as data_split returns them.
+    :param model_name: the name the model is saved and logged under.
+    :param num_envs: date shards whose rollouts are collected together.
+    :param subprocess: step each shard in a worker process.
+    :param threads: the torch threads of the training, torch's default if None.
+    :param stdout: whether the logger also prints to stdout.
+    :param total_timesteps: the environment steps of the training.
+    :return: the path the model is saved to.
+    """
+    if threads is not None:
+        torch.set_num_threads(threads)
+    env_kwargs = get_env_kwargs(train)
 
     # Environment
-    e_train_gym = StockTradingEnv(df=train, **env_kwargs)
-    env_train, _ = e_train_gym.get_sb_env()
+    e_train_gym = ArrayStockTradingEnv(df=train, **env_kwargs)
+    env_train, _ = e_train_gym.get_vec_env(num_envs, subprocess)
     print(type(env_train))
 
-    # PPO agent
+    # PPO agent, with about the same number of steps per update spread over the shards
     agent = DRLAgent(env=env_train)
-    model_ppo = agent.get_model("ppo", model_kwargs=PPO_PARAMS)
+    model_ppo = agent.get_model("ppo", model_kwargs=shard_ppo_params(PPO_PARAMS, num_envs))
 
-    # set up logger
-    tmp_path = RESULTS_DIR + '/'+model_name
-    new_logger_ppo = configure(tmp_path, ["stdout", "csv", "tensorboard"])
+    # set up logger, one directory per member
+    tmp_path = RESULTS_DIR + '/' + model_name
+    new_logger_ppo = configure(tmp_path, (["stdout"] if stdout else []) + ["csv", "tensorboard"])
     model_ppo.set_logger(new_logger_ppo)
 
     trained_ppo = agent.train_model(model=model_ppo,
                                     tb_log_name='ppo',
-                                    total_timesteps=80000)
+                                    total_timesteps=total_timesteps)
 
     trained_ppo.save(TRAINED_MODEL_DIR + '/' + model_name)
+    env_train.close()
+    return TRAINED_MODEL_DIR + '/' + model_name
+
+
+def train_members(members, trains, jobs=None, num_envs=1, subprocess=False, threads=None, total_timesteps=80000):
+    """
+    Train the members, each in a worker process of its own unless jobs is 1.
+    :param members: (model name, data file) pairs, see MEMBERS.
+    :param trains: the training rows of each member, in the order of members.
+    :param jobs: the members trained at once, all of them by default.
+    :param num_envs: date shards whose rollouts are collected together.
+    :param subprocess: step each shard in a worker process.
+    :param threads: the torch threads of each member, the cores divided among the jobs by default.
+    :param total_timesteps: the environment steps of each training.
+    :return: the paths the models are saved to, in the order of members.
+    """
+    jobs = min(jobs or len(members), len(members))
+    threads = threads or max(1, (os.cpu_count() or 1) // jobs)
+    if jobs == 1:
+        return [train_member(train, model_name, num_envs, subprocess, threads, total_timesteps=total_timesteps)
+                for (model_name, _), train in zip(members, trains)]
+    # The workers are not daemonic, so each may still start the workers of --subprocess
+    context = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else None)
+    with ProcessPoolExecutor(jobs, mp_context=context) as pool:
+        futures = [pool.submit(train_member, train, model_name, num_envs, subprocess, threads, False,
+                               total_timesteps)
+                   for (model_name, _), train in zip(members, trains)]
+        return [future.result() for future in futures]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the PPO_Switch members')
+    parser.add_argument('--member', nargs=2, action='append', metavar=('MODEL_NAME', 'DATA_FILE'),
+                        help='a model to train and its train data, a csv or a columnar_data store; '
+                             'may be repeated (default: the five members of MEMBERS)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='members trained at once, each in a worker process (default: all of them)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='torch threads per member (default: the cores divided among the jobs)')
+    parser.add_argument('--num_envs', type=int, default=1,
+                        help='date shards of the training period whose rollouts are collected together')
+    parser.add_argument('--subprocess', action='store_true', help='step each shard in a worker process')
+    args = parser.parse_args()
+    members = args.member or MEMBERS
+    check_and_make_directories([TRAINED_MODEL_DIR])
+
+    # The training dates are split out once, here, and every worker gets only its rows
+    trains = [data_split(load_data(data_file, TRAIN_START_DATE, TRAIN_END_DATE), TRAIN_START_DATE, TRAIN_END_DATE)
+              for _, data_file in members]
+    for path in train_members(members, trains, args.jobs, args.num_envs, args.subprocess, args.threads):
+        print(path)
@@ -0,0 +1,101 @@
+"""
+On-disk cache of the PPO_Switch member trajectories.
+
+Each member model trades in an env of its own, which the switching decisions
+never touch, so its actions and asset_memory over a date range depend only on
+the model, the env and the env's rows. record_member runs a member through its
+env once. TrajectoryCache keeps what it recorded in a .npz file, named after a
+hash of the model parameters, the env configuration and code, and the rows, so
+a re-run of the backtest only steps the switch env.
+"""
+import hashlib
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+
+# Env attributes that change the trajectory of a member.
+ENV_CONFIG = ('stock_dim', 'hmax', 'initial_amount', 'num_stock_shares', 'buy_cost_pct', 'sell_cost_pct',
+              'reward_scaling', 'state_space', 'tech_indicator_list', 'turbulence_threshold',
+              'risk_indicator_col', 'initial', 'previous_state')
+
+
+def _digest(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update(part if isinstance(part, bytes) else repr(part).encode())
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def model_digest(model):
+    """
+    :param model: a stable-baselines3 model.
+    :return: a hex digest of its class and policy parameters.
+    """
+    state = model.policy.state_dict()
+    return _digest(type(model).__name__, *[part for name, tensor in sorted(state.items())
+                                           for part in (name, tensor.detach().cpu().numpy().tobytes())])
+
+
+def env_digest(env):
+    """
+    :param env: a StockTradingEnv or ArrayStockTradingEnv.
+    :return: a hex digest of its configuration, its class source and its rows.
+    """
+    config = [(name, np.asarray(getattr(env, name, None)).tolist()) for name in ENV_CONFIG]
+    rows = pd.util.hash_pandas_object(env.df, index=True).to_numpy().tobytes()
+    return _digest(inspect.getsource(type(env)), config, list(env.df.columns), rows)
+
+
+def record_member(model, env, deterministic=True):
+    """
+    Run a member model through its env, as PPO_Switch.DRL_prediction steps it.
+    :param model: a stable-baselines3 model.
+    :param env: the member's env, reset by get_sb_env.
+    :param deterministic: whether the model predicts deterministic actions.
+    :return: a dict with the [T, 1, N] actions predicted on every day in
+        'actions' and the [T] asset_memory of the env in 'asset_memory'.
+    """
+    vec_env, obs = env.get_sb_env()
+    n_days = len(env.df.index.unique())
+    actions = []
+    asset_memory = None
+    for i in range(n_days):
+        action, _ = model.predict(obs, deterministic=deterministic)
+        actions.append(action)
+        # The vector env resets the env on the terminal step, which gives it a new asset_memory list
+        asset_memory = env.asset_memory
+        obs, _, dones, _ = vec_env.step(action)
+        if dones[0]:
+            break
+    return {'actions': np.array(actions), 'asset_memory': np.array(asset_memory, dtype=np.float64)}
+
+
+class TrajectoryCache(object):
+    """
+    Member trajectories under one directory.
+    :param root: the cache directory, created if missing.
+    """
+    def __init__(self, root='./trajectory_cache'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, model, env, deterministic=True):
+        """
+        Cached record_member(model, env, deterministic).
+        :return: a dict with 'actions' and 'asset_memory', see record_member.
+        """
+        key = _digest('member', model_digest(model), env_digest(env), deterministic)
+        path = os.path.join(self.root, key + '.npz')
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as stored:
+                return dict(stored)
+        trajectory = record_member(model, env, deterministic)
+        # Written under a temporary name first, so readers never see a partial file
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as f:
+            np.savez(f, **trajectory)
+        os.replace(tmp, path)
+        return trajectory
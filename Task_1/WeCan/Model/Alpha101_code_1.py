@@ -4,6 +4,9 @@ from numpy import abs
 from numpy import log
 from numpy import sign
 from scipy.stats import rankdata
+from alpha101_panel import decay_linear as panel_decay_linear
+from alpha101_panel import product as panel_product
+from alpha101_panel import RollingMoments, rolling_extremum
 
 # region Auxiliary functions
 def ts_sum(df, window=10):
@@ -34,23 +37,55 @@ def stddev(df, window=10):
     """
     return df.rolling(window).std()
 
-def correlation(x, y, window=10):
+def _values(df):
+    """
+    Auxiliary function returning a pandas object as a [T, N] float64 numpy array.
+    """
+    return df.to_numpy(dtype=np.float64).reshape(len(df), -1)
+
+def _like(df, values):
+    """
+    Auxiliary function wrapping a [T, N] numpy array with the labels of df.
+    :param df: a pandas Series or DataFrame.
+    :param values: a numpy array with one column per column of df.
+    :return: a pandas object of the same type, index and columns as df.
+    """
+    if isinstance(df, pd.Series):
+        return pd.Series(values[:, 0], index=df.index, name=df.name)
+    return pd.DataFrame(values, index=df.index, columns=df.columns)
+
+def _pair_values(x, y):
+    """
+    Auxiliary function returning two pandas objects as [T, N] float64 numpy arrays.
+    The rolling kernels pair rows by position, where pandas rolling corr/cov
+    aligned them by label, so the indexes must be equal.
+    """
+    if not x.index.equals(y.index):
+        raise ValueError('x and y must have the same index')
+    return _values(x), _values(y)
+
+def correlation(x, y, window=10, zero_variance=np.nan):
     """
     Wrapper function to estimate rolling corelations.
+    Where x or y is constant over the window the result is zero_variance, NaN
+    by default. The pandas rolling corr used before gave +-inf or NaN there,
+    depending on the rounding noise left in its running moments, and alphas
+    that are not cleaned afterwards, such as alpha040, passed the +-inf on.
     :param df: a pandas DataFrame.
     :param window: the rolling window.
-    :return: a pandas DataFrame with the time-series min over the past 'window' days.
+    :param zero_variance: the value where x or y is constant over the window.
+    :return: a pandas DataFrame with the time-series correlation over the past 'window' days.
     """
-    return x.rolling(window).corr(y)
+    return _like(x, RollingMoments(*_pair_values(x, y), [window]).correlation(window, zero_variance))
 
 def covariance(x, y, window=10):
     """
     Wrapper function to estimate rolling covariance.
     :param df: a pandas DataFrame.
     :param window: the rolling window.
-    :return: a pandas DataFrame with the time-series min over the past 'window' days.
+    :return: a pandas DataFrame with the time-series covariance over the past 'window' days.
     """
-    return x.rolling(window).cov(y)
+    return _like(x, RollingMoments(*_pair_values(x, y), [window]).covariance(window))
 
 def rolling_rank(na):
     """
@@ -67,7 +102,9 @@ def ts_rank(df, window=10):
     :param window: the rolling window.
     :return: a pandas DataFrame with the time-series rank over the past window days.
     """
-    return df.rolling(window).apply(rolling_rank)
+    # Sorted-window (skiplist) rolling rank, O(log window) per step; ties are
+    # averaged exactly like rolling_rank/rankdata.
+    return df.rolling(window).rank(method='average')
 
 def rolling_prod(na):
     """
@@ -84,7 +121,19 @@ def product(df, window=10):
     :param window: the rolling window.
     :return: a pandas DataFrame with the time-series product over the past 'window' days.
     """
-    return df.rolling(window).apply(rolling_prod)
+    # Log-space product over all columns at once instead of a rolling_prod callback per window
+    return _like(df, panel_product(_values(df), window))
+
+def _extremum(df, window, largest):
+    """
+    Auxiliary function running the one-pass rolling_extremum kernel on a pandas object.
+    :param df: a pandas Series or DataFrame.
+    :param window: the rolling window.
+    :param largest: True for the max, False for the min.
+    :return: a tuple (extremum, 0-based position) of pandas objects shaped like df.
+    """
+    best, best_at = rolling_extremum(_values(df), window, largest)
+    return _like(df, best), _like(df, best_at)
 
 def ts_min(df, window=10):
     """
@@ -93,7 +142,7 @@ def ts_min(df, window=10):
     :param window: the rolling window.
     :return: a pandas DataFrame with the time-series min over the past 'window' days.
     """
-    return df.rolling(window).min()
+    return _extremum(df, window, largest=False)[0]
 
 def ts_max(df, window=10):
     """
@@ -102,7 +151,7 @@ def ts_max(df, window=10):
     :param window: the rolling window.
     :return: a pandas DataFrame with the time-series max over the past 'window' days.
     """
-    return df.rolling(window).max()
+    return _extremum(df, window, largest=True)[0]
 
 def delta(df, period=1):
     """
@@ -147,7 +196,7 @@ def ts_argmax(df, window=10):
     :param window: the rolling window.
     :return: well.. that :)
     """
-    return df.rolling(window).apply(np.argmax) + 1 
+    return _extremum(df, window, largest=True)[1] + 1
 
 def ts_argmin(df, window=10):
     """
@@ -156,33 +205,16 @@ def ts_argmin(df, window=10):
     :param window: the rolling window.
     :return: well.. that :)
     """
-    return df.rolling(window).apply(np.argmin) + 1
+    return _extremum(df, window, largest=False)[1] + 1
 
 def decay_linear(df, period=10):
     """
     Linear weighted moving average implementation.
-    :param df: a pandas DataFrame.
+    :param df: a pandas Series or DataFrame, left unchanged.
     :param period: the LWMA period
-    :return: a pandas DataFrame with the LWMA.
-    """
-    # Clean data
-    if df.isnull().values.any():
-        df.fillna(method='ffill', inplace=True)
-        df.fillna(method='bfill', inplace=True)
-        df.fillna(value=0, inplace=True)
-    na_lwma = np.zeros_like(df)
-    na_lwma[:period, :] = df.iloc[:period, :] 
-    na_series = df.to_numpy()
-    # na_series = df.values  # 使用.values属性获取numpy数组
-
-    divisor = period * (period + 1) / 2
-    y = (np.arange(period) + 1) * 1.0 / divisor
-    # Estimate the actual lwma with the actual close.
-    # The backtest engine should assure to be snooping bias free.
-    for row in range(period - 1, df.shape[0]):
-        x = na_series[row - period + 1: row + 1, :]
-        na_lwma[row, :] = (np.dot(x.T, y))
-    return pd.DataFrame(na_lwma, index=df.index, columns=['CLOSE'])  
+    :return: a pandas object shaped and labelled like df with the LWMA.
+    """
+    return _like(df, panel_decay_linear(_values(df), period))
 # endregion
 
 def get_alpha(df):
@@ -296,13 +328,13 @@ class Alphas(object):
     
     # Alpha#2	 (-1 * correlation(rank(delta(log(volume), 2)), rank(((close - open) / open)), 6))
     def alpha002(self):
-        df = -1 * correlation(rank(delta(log(self.volume), 2)), rank((self.close - self.open) / self.open), 6)
-        return df.replace([-np.inf, np.inf], 0).fillna(value=0)
+        df = -1 * correlation(rank(delta(log(self.volume), 2)), rank((self.close - self.open) / self.open), 6, zero_variance=0)
+        return df.fillna(value=0)
     
     # Alpha#3	 (-1 * correlation(rank(open), rank(volume), 10))
     def alpha003(self):
-        df = -1 * correlation(rank(self.open), rank(self.volume), 10)
-        return df.replace([-np.inf, np.inf], 0).fillna(value=0)
+        df = -1 * correlation(rank(self.open), rank(self.volume), 10, zero_variance=0)
+        return df.fillna(value=0)
     
     # Alpha#4	 (-1 * Ts_Rank(rank(low), 9))
     def alpha004(self):
@@ -314,8 +346,8 @@ class Alphas(object):
     
     # Alpha#6	 (-1 * correlation(open, volume, 10))
     def alpha006(self):
-        df = -1 * correlation(self.open, self.volume, 10)
-        return df.replace([-np.inf, np.inf], 0).fillna(value=0)
+        df = -1 * correlation(self.open, self.volume, 10, zero_variance=0)
+        return df.fillna(value=0)
     
     # Alpha#7	 ((adv20 < volume) ? ((-1 * ts_rank(abs(delta(close, 7)), 60)) * sign(delta(close, 7))) : (-1* 1))
     def alpha007(self):
@@ -473,11 +505,11 @@ class Alphas(object):
     def alpha031(self):
         adv20 = sma(self.volume, 20)
         df = correlation(adv20, self.low, 12).replace([-np.inf, np.inf], 0).fillna(value=0)         
-        p1=rank(rank(rank(decay_linear((-1 * rank(rank(delta(self.close, 10)))).to_frame(), 10)))) 
+        p1=rank(rank(rank(decay_linear((-1 * rank(rank(delta(self.close, 10)))), 10)))) 
         p2=rank((-1 * delta(self.close, 3)))
         p3=sign(scale(df))
         
-        return p1.CLOSE+p2+p3
+        return p1+p2+p3
 
     # Alpha#32	 (scale(((sum(close, 7) / 7) - close)) + (20 * scale(correlation(vwap, delay(close, 5),230))))
     def alpha032(self):
@@ -517,7 +549,7 @@ class Alphas(object):
     # Alpha#39	 ((-1 * rank((delta(close, 7) * (1 - rank(decay_linear((volume / adv20), 9)))))) * (1 +rank(sum(returns, 250))))
     def alpha039(self):
         adv20 = sma(self.volume, 20)
-        return ((-1 * rank(delta(self.close, 7) * (1 - rank(decay_linear((self.volume / adv20).to_frame(), 9).CLOSE)))) *
+        return ((-1 * rank(delta(self.close, 7) * (1 - rank(decay_linear((self.volume / adv20), 9))))) *
                 (1 + rank(sma(self.returns, 250))))
     
     # Alpha#40	 ((-1 * rank(stddev(high, 10))) * correlation(high, volume, 10))
@@ -613,7 +645,7 @@ class Alphas(object):
     
     # Alpha#57	 (0 - (1 * ((close - vwap) / decay_linear(rank(ts_argmax(close, 30)), 2))))
     def alpha057(self):
-        return (0 - (1 * ((self.close - self.vwap) / decay_linear(rank(ts_argmax(self.close, 30)).to_frame(), 2).CLOSE)))
+        return (0 - (1 * ((self.close - self.vwap) / decay_linear(rank(ts_argmax(self.close, 30)), 2))))
     
     # Alpha#58	 (-1 * Ts_Rank(decay_linear(correlation(IndNeutralize(vwap, IndClass.sector), volume,3.92795), 7.89291), 5.50322))
      
@@ -651,7 +683,7 @@ class Alphas(object):
       
     # Alpha#66	 ((rank(decay_linear(delta(vwap, 3.51013), 7.23052)) + Ts_Rank(decay_linear(((((low* 0.96633) + (low * (1 - 0.96633))) - vwap) / (open - ((high + low) / 2))), 11.4157), 6.72611)) * -1)
     def alpha066(self):
-        return ((rank(decay_linear(delta(self.vwap, 4).to_frame(), 7).CLOSE) + ts_rank(decay_linear(((((self.low* 0.96633) + (self.low * (1 - 0.96633))) - self.vwap) / (self.open - ((self.high + self.low) / 2))).to_frame(), 11).CLOSE, 7)) * -1)
+        return ((rank(decay_linear(delta(self.vwap, 4), 7)) + ts_rank(decay_linear(((((self.low* 0.96633) + (self.low * (1 - 0.96633))) - self.vwap) / (self.open - ((self.high + self.low) / 2))), 11), 7)) * -1)
     
     # Alpha#67	 ((rank((high - ts_min(high, 2.14593)))^rank(correlation(IndNeutralize(vwap,IndClass.sector), IndNeutralize(adv20, IndClass.subindustry), 6.02936))) * -1)
      
@@ -669,8 +701,8 @@ class Alphas(object):
     # Alpha#71	 max(Ts_Rank(decay_linear(correlation(Ts_Rank(close, 3.43976), Ts_Rank(adv180,12.0647), 18.0175), 4.20501), 15.6948), Ts_Rank(decay_linear((rank(((low + open) - (vwap +vwap)))^2), 16.4662), 4.4388))
     def alpha071(self):
         adv180 = sma(self.volume, 180)
-        p1=ts_rank(decay_linear(correlation(ts_rank(self.close, 3), ts_rank(adv180,12), 18).to_frame(), 4).CLOSE, 16)
-        p2=ts_rank(decay_linear((rank(((self.low + self.open) - (self.vwap +self.vwap))).pow(2)).to_frame(), 16).CLOSE, 4)
+        p1=ts_rank(decay_linear(correlation(ts_rank(self.close, 3), ts_rank(adv180,12), 18), 4), 16)
+        p2=ts_rank(decay_linear((rank(((self.low + self.open) - (self.vwap +self.vwap))).pow(2)), 16), 4)
         df=pd.DataFrame({'p1':p1,'p2':p2})
         df.loc[df['p1']>=df['p2'],'max']=df['p1']
         df.loc[df['p2']>=df['p1'],'max']=df['p2']
@@ -680,12 +712,12 @@ class Alphas(object):
     # Alpha#72	 (rank(decay_linear(correlation(((high + low) / 2), adv40, 8.93345), 10.1519)) /rank(decay_linear(correlation(Ts_Rank(vwap, 3.72469), Ts_Rank(volume, 18.5188), 6.86671),2.95011)))
     def alpha072(self):
         adv40 = sma(self.volume, 40)
-        return (rank(decay_linear(correlation(((self.high + self.low) / 2), adv40, 9).to_frame(), 10).CLOSE) /rank(decay_linear(correlation(ts_rank(self.vwap, 4), ts_rank(self.volume, 19), 7).to_frame(),3).CLOSE))
+        return (rank(decay_linear(correlation(((self.high + self.low) / 2), adv40, 9), 10)) /rank(decay_linear(correlation(ts_rank(self.vwap, 4), ts_rank(self.volume, 19), 7),3)))
     
     # Alpha#73	 (max(rank(decay_linear(delta(vwap, 4.72775), 2.91864)),Ts_Rank(decay_linear(((delta(((open * 0.147155) + (low * (1 - 0.147155))), 2.03608) / ((open *0.147155) + (low * (1 - 0.147155)))) * -1), 3.33829), 16.7411)) * -1)
     def alpha073(self):
-        p1=rank(decay_linear(delta(self.vwap, 5).to_frame(), 3).CLOSE)
-        p2=ts_rank(decay_linear(((delta(((self.open * 0.147155) + (self.low * (1 - 0.147155))), 2) / ((self.open *0.147155) + (self.low * (1 - 0.147155)))) * -1).to_frame(), 3).CLOSE, 17)
+        p1=rank(decay_linear(delta(self.vwap, 5), 3))
+        p2=ts_rank(decay_linear(((delta(((self.open * 0.147155) + (self.low * (1 - 0.147155))), 2) / ((self.open *0.147155) + (self.low * (1 - 0.147155)))) * -1), 3), 17)
         df=pd.DataFrame({'p1':p1,'p2':p2})
         df.loc[df['p1']>=df['p2'],'max']=df['p1']
         df.loc[df['p2']>=df['p1'],'max']=df['p2']
@@ -708,8 +740,8 @@ class Alphas(object):
     # Alpha#77	 min(rank(decay_linear(((((high + low) / 2) + high) - (vwap + high)), 20.0451)),rank(decay_linear(correlation(((high + low) / 2), adv40, 3.1614), 5.64125)))
     def alpha077(self):
         adv40 = sma(self.volume, 40)
-        p1=rank(decay_linear(((((self.high + self.low) / 2) + self.high) - (self.vwap + self.high)).to_frame(), 20).CLOSE)
-        p2=rank(decay_linear(correlation(((self.high + self.low) / 2), adv40, 3).to_frame(), 6).CLOSE)
+        p1=rank(decay_linear(((((self.high + self.low) / 2) + self.high) - (self.vwap + self.high)), 20))
+        p2=rank(decay_linear(correlation(((self.high + self.low) / 2), adv40, 3), 6))
         df=pd.DataFrame({'p1':p1,'p2':p2})
         df.loc[df['p1']>=df['p2'],'min']=df['p2']
         df.loc[df['p2']>=df['p1'],'min']=df['p1']
@@ -759,8 +791,8 @@ class Alphas(object):
     # Alpha#88	 min(rank(decay_linear(((rank(open) + rank(low)) - (rank(high) + rank(close))),8.06882)), Ts_Rank(decay_linear(correlation(Ts_Rank(close, 8.44728), Ts_Rank(adv60,20.6966), 8.01266), 6.65053), 2.61957))
     def alpha088(self):
         adv60 = sma(self.volume, 60)
-        p1=rank(decay_linear(((rank(self.open) + rank(self.low)) - (rank(self.high) + rank(self.close))).to_frame(),8).CLOSE)
-        p2=ts_rank(decay_linear(correlation(ts_rank(self.close, 8), ts_rank(adv60,21), 8).to_frame(), 7).CLOSE, 3)
+        p1=rank(decay_linear(((rank(self.open) + rank(self.low)) - (rank(self.high) + rank(self.close))),8))
+        p2=ts_rank(decay_linear(correlation(ts_rank(self.close, 8), ts_rank(adv60,21), 8), 7), 3)
         df=pd.DataFrame({'p1':p1,'p2':p2})
         df.loc[df['p1']>=df['p2'],'min']=df['p2']
         df.loc[df['p2']>=df['p1'],'min']=df['p1']
@@ -777,8 +809,8 @@ class Alphas(object):
     # Alpha#92	 min(Ts_Rank(decay_linear(((((high + low) / 2) + close) < (low + open)), 14.7221),18.8683), Ts_Rank(decay_linear(correlation(rank(low), rank(adv30), 7.58555), 6.94024),6.80584))
     def alpha092(self):
         adv30 = sma(self.volume, 30)
-        p1=ts_rank(decay_linear(((((self.high + self.low) / 2) + self.close) < (self.low + self.open)).to_frame(), 15).CLOSE,19)
-        p2=ts_rank(decay_linear(correlation(rank(self.low), rank(adv30), 8).to_frame(), 7).CLOSE,7)
+        p1=ts_rank(decay_linear(((((self.high + self.low) / 2) + self.close) < (self.low + self.open)), 15),19)
+        p2=ts_rank(decay_linear(correlation(rank(self.low), rank(adv30), 8), 7),7)
         df=pd.DataFrame({'p1':p1,'p2':p2})
         df.loc[df['p1']>=df['p2'],'min']=df['p2']
         df.loc[df['p2']>=df['p1'],'min']=df['p1']
@@ -801,8 +833,8 @@ class Alphas(object):
     # Alpha#96	 (max(Ts_Rank(decay_linear(correlation(rank(vwap), rank(volume), 3.83878),4.16783), 8.38151), Ts_Rank(decay_linear(Ts_ArgMax(correlation(Ts_Rank(close, 7.45404),Ts_Rank(adv60, 4.13242), 3.65459), 12.6556), 14.0365), 13.4143)) * -1)
     def alpha096(self):
         adv60 = sma(self.volume, 60)
-        p1=ts_rank(decay_linear(correlation(rank(self.vwap), rank(self.volume).to_frame(), 4),4).CLOSE, 8)
-        p2=ts_rank(decay_linear(ts_argmax(correlation(ts_rank(self.close, 7),ts_rank(adv60, 4), 4), 13).to_frame(), 14).CLOSE, 13)
+        p1=ts_rank(decay_linear(correlation(rank(self.vwap), rank(self.volume), 4),4), 8)
+        p2=ts_rank(decay_linear(ts_argmax(correlation(ts_rank(self.close, 7),ts_rank(adv60, 4), 4), 13), 14), 13)
         df=pd.DataFrame({'p1':p1,'p2':p2})
         df.loc[df['p1']>=df['p2'],'max']=df['p1']
         df.loc[df['p2']>=df['p1'],'max']=df['p2']
@@ -816,7 +848,7 @@ class Alphas(object):
     def alpha098(self):
         adv5 = sma(self.volume, 5)
         adv15 = sma(self.volume, 15)
-        return (rank(decay_linear(correlation(self.vwap, sma(adv5, 26), 5).to_frame(), 7).CLOSE) -rank(decay_linear(ts_rank(ts_argmin(correlation(rank(self.open), rank(adv15), 21), 9),7).to_frame(), 8).CLOSE))
+        return (rank(decay_linear(correlation(self.vwap, sma(adv5, 26), 5), 7)) -rank(decay_linear(ts_rank(ts_argmin(correlation(rank(self.open), rank(adv15), 21), 9),7), 8)))
     
     # Alpha#99	 ((rank(correlation(sum(((high + low) / 2), 19.8975), sum(adv60, 19.8975), 8.8136)) <rank(correlation(low, volume, 6.28259))) * -1)
     def alpha099(self):
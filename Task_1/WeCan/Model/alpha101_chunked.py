@@ -0,0 +1,250 @@
+"""
+Out-of-core Alpha101 computation in blocks of dates.
+
+The INPUTS arrays are written once to a memory-mapped [len(INPUTS), T, N] file
+under a store directory. The compiled alphas are then evaluated one block of
+dates at a time, one alpha at a time, and each block's rows are written straight
+into a memory-mapped [T, N] .npy file per alpha. Only a block of rows of every
+ticker is ever in memory, so the memory used is fixed by chunk_days and the
+number of tickers, not by the length of the history.
+
+The blocks run across all tickers, because rank, scale and IndNeutralize need
+every ticker of a date. In time, a block is preceded by the rows its alpha
+reaches back through windows and delays (its warm-up, read off the compiled DAG).
+Every operator computes a row from its own window only, so with the warm-up the
+block's rows equal alpha101_panel.get_alpha on the whole history, whose
+PanelAlphas methods the compiled formulas transcribe. The exceptions are
+carried across blocks, as in alpha101_stream:
+- the cumulative sums behind VWAP, while the inputs are written;
+- the forward fill in front of decay_linear, per decay node and column;
+- the back fill in front of decay_linear, which reaches forward to the first
+  value of each column. A scan ahead of the main pass finds those values, and
+  it stops as soon as every column has had one.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from alpha101_compiler import ALPHA_FORMULAS, apply, compile_alphas, lookback
+from alpha101_panel import GROUP_LEVELS, INPUTS, Groups, _fillna, decay_linear, known_alphas, select_alphas
+
+# Raw columns of the source, in the order of their INPUTS slots.
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _inputs_path(root):
+    return os.path.join(root, 'inputs.npy')
+
+
+def write_inputs(data, root, chunk_days=256, chunk_rows=1000000):
+    """
+    Pivot a long-format source into a store directory, without holding it in memory.
+    Writes dates.npy, tickers.npy and inputs.npy, the [len(INPUTS), T, N]
+    arrays of PanelAlphas.__init__.
+    :param data: a long-format FinRL DataFrame, or the path of such a csv, with
+        date, tic and OHLCV columns.
+    :param root: the store directory, created if missing.
+    :param chunk_days: dates per block when deriving returns and vwap.
+    :param chunk_rows: csv rows read at a time.
+    :return: root.
+    """
+    os.makedirs(root, exist_ok=True)
+
+    def frames(columns):
+        if isinstance(data, pd.DataFrame):
+            return [data[columns]]
+        return pd.read_csv(data, usecols=columns, chunksize=chunk_rows)
+
+    dates, tickers = set(), set()
+    for frame in frames(['date', 'tic']):
+        dates.update(frame['date'].unique())
+        tickers.update(frame['tic'].unique())
+    dates = pd.Index(sorted(dates))
+    tickers = pd.Index(sorted(tickers))
+    np.save(os.path.join(root, 'dates.npy'), np.asarray(dates, dtype=str))
+    np.save(os.path.join(root, 'tickers.npy'), np.asarray(tickers, dtype=str))
+    shape = (len(dates), len(tickers))
+    inputs = np.lib.format.open_memmap(_inputs_path(root), mode='w+', shape=(len(INPUTS),) + shape)
+    inputs[:] = np.nan
+    for frame in frames(['date', 'tic'] + list(OHLCV)):
+        rows = dates.get_indexer(frame['date'])
+        columns = tickers.get_indexer(frame['tic'])
+        for name in OHLCV:
+            inputs[INPUTS.index(name), rows, columns] = frame[name].to_numpy(dtype=np.float64)
+
+    # returns and vwap, carrying the previous close and the cumulative sums across blocks
+    prev_close = np.full(shape[1], np.nan)
+    cum_pv = np.zeros(shape[1])
+    cum_v = np.zeros(shape[1])
+    high, low, close, volume, returns, vwap = [inputs[INPUTS.index(name)] for name in
+                                               ('high', 'low', 'close', 'volume', 'returns', 'vwap')]
+    for start in range(0, shape[0], chunk_days):
+        block = slice(start, start + chunk_days)
+        c = np.asarray(close[block])
+        v = np.asarray(volume[block])
+        returns[block] = c / np.vstack([prev_close, c[:-1]]) - 1
+        prev_close = c[-1].copy()
+        # Added row by row like np.nancumsum over the whole history
+        pv = _fillna((high[block] + low[block] + c) / 3 * v, 0)
+        pv[0] += cum_pv
+        np.cumsum(pv, axis=0, out=pv)
+        filled_v = _fillna(v, 0)
+        filled_v[0] += cum_v
+        np.cumsum(filled_v, axis=0, out=filled_v)
+        cum_pv, cum_v = pv[-1].copy(), filled_v[-1].copy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap[block] = (pv / filled_v * 1000) / (v * 100 + 1)
+        volume[block] = v * 100
+    inputs.flush()
+    return root
+
+
+class _Alpha(object):
+    """
+    The nodes of one compiled alpha, with the rows each needs below it.
+    :param program: the compiled Program.
+    :param name: the alpha name.
+    """
+    def __init__(self, program, name):
+        self.name = name
+        self.order = program.required([name])
+        self.depth = {}
+        self.consumers = {}
+        # decay_linear node -> 1 + the most decay_linear nodes stacked below it
+        self.levels = {}
+        below = {}
+        for node_id in self.order:
+            op, args, params = program.nodes[node_id]
+            self.depth[node_id] = max([self.depth[a] + lookback(op, params) - 1 for a in args] or [0])
+            for a in args:
+                self.consumers[a] = self.consumers.get(a, 0) + 1
+            below[node_id] = max([below[a] for a in args] or [0])
+            if op == 'decay_linear':
+                self.levels[node_id] = below[node_id] = below[node_id] + 1
+        self.warmup = self.depth[program.roots[name]]
+        # decay_linear node -> the first non-NaN value of each column of its
+        # argument over the whole history, what the back fill puts in front of it
+        self.first_valid = {}
+
+
+def _blocks(stored, warmup, chunk_days):
+    # (offset, start, end, inputs) of each block of dates, inputs holding rows [offset, end)
+    n_dates = stored.shape[1]
+    for start in range(0, n_dates, chunk_days):
+        end = min(start + chunk_days, n_dates)
+        offset = max(start - warmup, 0)
+        block = np.array(stored[:, offset:end])
+        yield offset, start, end, dict(zip(INPUTS, block))
+
+
+def _evaluate(program, alpha, inputs, offset, start, end, groups, seeds, observe=None):
+    # Rows [start, end) of alpha, from inputs holding rows [offset, end). A
+    # node's rows are exact from offset + its depth on, or all of them if offset is 0.
+    # seeds carries, per decay_linear node, the forward-filled value of its
+    # argument just before the exact rows of the next block.
+    pending = dict(alpha.consumers)
+    values = {}
+    for node_id in alpha.order:
+        op, args, params = program.nodes[node_id]
+        if op == 'const':
+            values[node_id] = params[0]
+        elif op == 'input':
+            values[node_id] = groups[params[0]] if params[0] in GROUP_LEVELS else inputs[params[0]]
+        elif op == 'decay_linear':
+            x = values[args[0]]
+            depth = alpha.depth[args[0]] if offset > 0 else 0
+            if observe is not None:
+                observe(node_id, x[depth:])
+            first_valid = alpha.first_valid.get(node_id, np.nan)
+            if offset > 0:
+                # The fill from before the exact rows goes in front of them, in an extra first row
+                seed = np.where(np.isnan(seeds[node_id]), first_valid, seeds[node_id])
+                x = np.vstack([seed, np.full((depth, x.shape[1]), np.nan), x[depth:]])
+            else:
+                x = x.copy()
+                x[0] = np.where(np.isnan(x[0]), first_valid, x[0])
+            ahead = 1 if offset > 0 else 0
+            # The next block's exact rows start inside this one
+            next_offset = max(end - alpha.warmup, 0)
+            if next_offset > 0:
+                row = next_offset + alpha.depth[args[0]] - 1 - offset + ahead
+                seeds[node_id] = pd.DataFrame(x[:row + 1]).ffill().to_numpy()[row].copy()
+            values[node_id] = decay_linear(x, dict(params)['period'])[ahead:]
+        else:
+            values[node_id] = apply(op, [values[a] for a in args], params)
+        for child in args:
+            pending[child] -= 1
+            if pending[child] == 0:
+                del values[child]
+    shape = (end - offset,) + inputs['close'].shape[1:]
+    return np.broadcast_to(values[program.roots[alpha.name]], shape)[start - offset:]
+
+
+def _find_first_valid(program, alpha, stored, chunk_days, groups):
+    # Scan the blocks until the argument of every decay_linear node has had a
+    # value in every column. Stacked decay_linear nodes are scanned one level
+    # at a time, so the level below is already filled exactly.
+    n_tickers = stored.shape[2]
+    for level in sorted(set(alpha.levels.values())):
+        targets = [node_id for node_id, l in alpha.levels.items() if l == level]
+        found = dict((node_id, np.full(n_tickers, np.nan)) for node_id in targets)
+
+        def observe(node_id, rows):
+            if node_id in found:
+                valid = ~np.isnan(rows)
+                first = rows[valid.argmax(axis=0), np.arange(n_tickers)]
+                np.copyto(found[node_id], first, where=np.isnan(found[node_id]) & valid.any(axis=0))
+
+        seeds = {}
+        for offset, start, end, inputs in _blocks(stored, alpha.warmup, chunk_days):
+            _evaluate(program, alpha, inputs, offset, start, end, groups, seeds, observe)
+            if not any(np.isnan(values).any() for values in found.values()):
+                break
+        alpha.first_valid.update(found)
+
+
+def get_alpha(root, alphas=None, chunk_days=256, industries=None, dtype=np.float64):
+    """
+    Out-of-core counterpart of alpha101_panel.get_alpha over a store written by write_inputs.
+    Each alpha is written to root/<name>.npy as a [T, N] array, rows in the
+    order of root/dates.npy and columns in the order of root/tickers.npy.
+    Peak memory is about (chunk_days + warm-up) * N * 8 bytes for each of the
+    INPUTS arrays and each live intermediate of one alpha. The largest warm-up
+    is 249 rows for ALPHA_NAMES, 251 with the industry alphas.
+    :param root: the store directory.
+    :param alphas: names of the alphas to compute, all of known_alphas(industries) by default.
+    :param chunk_days: dates per block.
+    :param industries: an industry classification as returned by
+        alpha101_panel.load_industries, needed for the alphas in INDUSTRY_ALPHA_NAMES.
+    :param dtype: the dtype of the output files.
+    :return: a dict mapping each alpha name to its read-only memory-mapped [T, N] array.
+    """
+    alphas = select_alphas(alphas, known_alphas(industries))
+    stored = np.load(_inputs_path(root), mmap_mode='r')
+    tickers = np.load(os.path.join(root, 'tickers.npy'))
+    program = compile_alphas(dict((name, ALPHA_FORMULAS[name]) for name in alphas))
+    compiled = [_Alpha(program, name) for name in alphas]
+    groups = {}
+    if industries is not None:
+        groups = dict((level, Groups(industries[level].reindex(tickers))) for level in GROUP_LEVELS)
+    paths = dict((name, os.path.join(root, name + '.npy')) for name in alphas)
+    with np.errstate(all='ignore'):
+        for alpha in compiled:
+            if alpha.levels:
+                _find_first_valid(program, alpha, stored, chunk_days, groups)
+        outputs = dict((name, np.lib.format.open_memmap(paths[name], mode='w+', dtype=dtype,
+                                                        shape=stored.shape[1:])) for name in alphas)
+        seeds = dict((alpha.name, {}) for alpha in compiled)
+        # One read of each block, with the longest warm-up, shared by every alpha
+        warmup = max([alpha.warmup for alpha in compiled] or [0])
+        for first, start, end, block in _blocks(stored, warmup, chunk_days):
+            for alpha in compiled:
+                offset = max(start - alpha.warmup, 0)
+                inputs = dict((name, values[offset - first:]) for name, values in block.items())
+                outputs[alpha.name][start:end] = _evaluate(program, alpha, inputs, offset, start, end, groups,
+                                                           seeds[alpha.name])
+    for name in alphas:
+        outputs[name].flush()
+    del outputs
+    return dict((name, np.load(paths[name], mmap_mode='r')) for name in alphas)
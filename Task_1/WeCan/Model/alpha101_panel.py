@@ -0,0 +1,1282 @@
+"""
+Wide-panel (date x ticker) engine for the Alpha101 factors.
+
+The long-format FinRL frame is pivoted once into contiguous [T, N] float arrays.
+Time-series operators (ts_*, delta, delay, ...) run down each ticker column, so
+rolling windows never cross ticker boundaries, and cross-sectional operators
+(rank, scale) run across each date row. Results are melted back onto the rows
+of the input frame, giving the same layout as Alpha101_code_1.get_alpha.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+# Alphas implemented by both Alphas and PanelAlphas, in get_alpha column order.
+ALPHA_NAMES = (
+    'alpha001', 'alpha002', 'alpha003', 'alpha004', 'alpha005', 'alpha006', 'alpha007', 'alpha008',
+    'alpha009', 'alpha010', 'alpha011', 'alpha012', 'alpha013', 'alpha014', 'alpha015', 'alpha016',
+    'alpha017', 'alpha018', 'alpha019', 'alpha020', 'alpha021', 'alpha022', 'alpha023', 'alpha024',
+    'alpha025', 'alpha026', 'alpha027', 'alpha028', 'alpha029', 'alpha030', 'alpha031', 'alpha032',
+    'alpha033', 'alpha034', 'alpha035', 'alpha036', 'alpha037', 'alpha038', 'alpha039', 'alpha040',
+    'alpha041', 'alpha042', 'alpha043', 'alpha044', 'alpha045', 'alpha046', 'alpha047', 'alpha049',
+    'alpha050', 'alpha051', 'alpha052', 'alpha053', 'alpha054', 'alpha055', 'alpha057', 'alpha060',
+    'alpha061', 'alpha062', 'alpha064', 'alpha065', 'alpha066', 'alpha068', 'alpha071', 'alpha072',
+    'alpha073', 'alpha074', 'alpha075', 'alpha077', 'alpha078', 'alpha081', 'alpha083', 'alpha084',
+    'alpha085', 'alpha086', 'alpha088', 'alpha092', 'alpha094', 'alpha095', 'alpha096', 'alpha098',
+    'alpha099', 'alpha101',
+)
+
+# Alphas that also need an industry classification of the tickers, in get_alpha
+# column order. alpha056 is left out: it needs the market capitalisation, which
+# the FinRL frame does not carry.
+INDUSTRY_ALPHA_NAMES = (
+    'alpha048', 'alpha058', 'alpha059', 'alpha063', 'alpha067', 'alpha069', 'alpha070', 'alpha076',
+    'alpha079', 'alpha080', 'alpha082', 'alpha087', 'alpha089', 'alpha090', 'alpha091', 'alpha093',
+    'alpha097', 'alpha100',
+)
+
+# [T, N] arrays every alpha is computed from.
+INPUTS = ('open', 'high', 'low', 'close', 'volume', 'returns', 'vwap')
+
+# Levels of an industry classification (the paper's IndClass), coarsest first.
+GROUP_LEVELS = ('sector', 'industry', 'subindustry')
+
+
+# region Panel layout
+class Panel(object):
+    """
+    Date x ticker layout of a long-format FinRL frame.
+    :param df_data: a pandas DataFrame with 'date' and 'tic' columns.
+    """
+    def __init__(self, df_data):
+        self.date_codes, self.dates = pd.factorize(df_data['date'], sort=True)
+        self.tic_codes, self.tickers = pd.factorize(df_data['tic'], sort=True)
+        self.shape = (len(self.dates), len(self.tickers))
+
+    def pivot(self, values):
+        """
+        Scatter a long column into a [T, N] array, NaN where a ticker has no row.
+        :param values: a column aligned with the rows of the source frame.
+        :return: a C-contiguous float64 numpy array of shape [T, N].
+        """
+        out = np.full(self.shape, np.nan)
+        out[self.date_codes, self.tic_codes] = np.asarray(values, dtype=np.float64)
+        return out
+
+    def melt(self, values):
+        """
+        Gather a [T, N] array back onto the rows of the source frame.
+        :param values: a numpy array of shape [T, N].
+        :return: a 1-d numpy array aligned with the rows of the source frame.
+        """
+        return np.asarray(values)[self.date_codes, self.tic_codes]
+
+
+def align_panel(df, fill_value=0):
+    """
+    Give every ticker a row on every date of a long-format frame.
+    Row (date i, ticker j) of the result is row i * N + j of the sorted
+    date x ticker grid, so each column is scattered into place with one
+    assignment, with no merge against a list of (date, ticker) tuples. The
+    numeric columns share one preallocated block.
+    :param df: a long-format FinRL DataFrame with 'date' and 'tic' columns.
+    :param fill_value: the value put into missing cells.
+    :return: a tuple (aligned, missing): the frame with T * N rows sorted by
+        date then tic and missing cells filled, and a boolean DataFrame with the
+        same index and the other columns marking the cells that were filled,
+        whether their row was absent or their value NaN, or +-inf in a numeric
+        column.
+    """
+    panel = Panel(df)
+    n_dates, n_tickers = panel.shape
+    rows = panel.date_codes * n_tickers + panel.tic_codes
+    names = list(df.columns.drop(['date', 'tic']))
+    numeric = [name for name in names if df[name].dtype.kind in 'biuf']
+    # Column-major, so each column is a contiguous write and pandas keeps the block as it is
+    block = np.full((n_dates * n_tickers, len(numeric)), np.nan, order='F')
+    for j, name in enumerate(numeric):
+        block[rows, j] = df[name].to_numpy()
+    # inf from the alpha ratios is no more an observation than NaN
+    mask = ~np.isfinite(block)
+    block[mask] = fill_value
+    aligned = pd.DataFrame(block, columns=numeric, copy=False)
+    missing = pd.DataFrame(mask, columns=numeric, copy=False)
+    aligned.insert(0, 'date', np.repeat(np.asarray(panel.dates), n_tickers))
+    aligned.insert(1, 'tic', np.tile(np.asarray(panel.tickers), n_dates))
+    for name in names:
+        if name not in numeric:
+            out = np.full(n_dates * n_tickers, None, dtype=object)
+            out[rows] = df[name].to_numpy()
+            missing[name] = pd.isna(out)
+            out[missing[name].to_numpy()] = fill_value
+            aligned[name] = out
+    if len(numeric) < len(names):
+        # Back to the column order of df, a copy only when it has non-numeric columns
+        aligned, missing = aligned[['date', 'tic'] + names], missing[names]
+    return aligned, missing
+
+
+class Groups(object):
+    """
+    Ticker columns sorted into one contiguous segment per group.
+    :param labels: the group label of each ticker column. A ticker without a
+        label (NaN) is a group of its own.
+    """
+    def __init__(self, labels):
+        codes, uniques = pd.factorize(np.asarray(labels, dtype=object))
+        unlabelled = codes < 0
+        codes[unlabelled] = len(uniques) + np.arange(unlabelled.sum())
+        self.order = np.argsort(codes, kind='stable')
+        ordered = codes[self.order]
+        self.starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        self.sizes = np.diff(np.r_[self.starts, len(codes)])
+        self.inverse = np.argsort(self.order)
+
+
+def load_industries(path):
+    """
+    Read a ticker -> industry classification file, such as
+    industry_classification.csv (the GICS levels of the Dow 30).
+    :param path: a csv file with a 'tic' column and one column per name in GROUP_LEVELS.
+    :return: a DataFrame indexed by ticker with the GROUP_LEVELS columns.
+    """
+    industries = pd.read_csv(path, dtype=str).set_index('tic')
+    missing = [level for level in GROUP_LEVELS if level not in industries.columns]
+    if missing:
+        raise KeyError('%s lacks the columns: %s' % (path, ', '.join(missing)))
+    return industries[list(GROUP_LEVELS)]
+# endregion
+
+
+# region Auxiliary functions
+# Every operator takes and returns [T, N] float arrays (rows are dates, columns
+# are tickers). As with pandas rolling(window), +-inf counts as missing and a
+# window that is not full or contains a missing value yields NaN.
+def _shift(x, period):
+    out = np.full_like(x, np.nan)
+    if period == 0:
+        out[:] = x
+    elif period < len(x):
+        out[period:] = x[:len(x) - period]
+    return out
+
+def _fillna(x, value):
+    return np.where(np.isnan(x), value, x)
+
+def _clean(x, value=0):
+    """
+    Replace +-inf and NaN, the array version of .replace([-np.inf, np.inf], value).fillna(value).
+    """
+    return np.where(np.isfinite(x), x, value)
+
+def _missing_as_nan(x):
+    return np.where(np.isinf(x), np.nan, x)
+
+def _lagged(x, window):
+    """
+    Yield x shifted by 0, 1, ..., window - 1 rows, cut to the rows that close a full window.
+    """
+    n = len(x)
+    for k in range(window):
+        yield x[window - 1 - k:n - k]
+
+def ts_sum(x, window=10):
+    """
+    Wrapper function to estimate rolling sum.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series sum over the past 'window' days.
+    """
+    out = np.full_like(x, np.nan)
+    if window > len(x):
+        return out
+    lags = _lagged(_missing_as_nan(x), window)
+    acc = next(lags).copy()
+    for lag in lags:
+        acc += lag
+    out[window - 1:] = acc
+    return out
+
+def sma(x, window=10):
+    """
+    Wrapper function to estimate SMA.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series mean over the past 'window' days.
+    """
+    return ts_sum(x, window) / window
+
+class RollingMoments(object):
+    """
+    Rolling sums of a pair of [T, N] arrays for several windows at once.
+    Both arrays are shifted by their value on the window's last day, which keeps
+    the sums small, so constant windows give exactly zero variance. One pass
+    over the lags serves every window, and the sums of each window are
+    snapshotted after its last lag. A window's result therefore does not
+    depend on which other windows were requested.
+    :param x: a [T, N] numpy array.
+    :param y: a [T, N] numpy array, possibly x itself.
+    :param windows: the rolling windows.
+    """
+    def __init__(self, x, y, windows):
+        self.shape = x.shape
+        self.sums = {}
+        n = len(x)
+        windows = sorted(set(w for w in windows if 2 <= w <= n))
+        if not windows:
+            return
+        same = y is x
+        x = _missing_as_nan(x)
+        y = x if same else _missing_as_nan(y)
+        # Rows from start on close a full window of the shortest length
+        start = windows[0] - 1
+        x0 = x[start:]
+        y0 = y[start:]
+        sx, sy, sxx, syy, sxy = [np.zeros_like(x0) for _ in range(5)]
+        for k in range(windows[-1]):
+            # Rows before k only close windows shorter than k, already snapshotted
+            lo = max(k - start, 0)
+            dx = x[start + lo - k:n - k] - x0[lo:]
+            dy = dx if same else y[start + lo - k:n - k] - y0[lo:]
+            sx[lo:] += dx
+            sxx[lo:] += dx * dx
+            if not same:
+                sy[lo:] += dy
+                syy[lo:] += dy * dy
+                sxy[lo:] += dx * dy
+            if k + 1 in windows:
+                first = k - start
+                if same:
+                    self.sums[k + 1] = (sx[first:].copy(),) * 2 + (sxx[first:].copy(),) * 3
+                else:
+                    self.sums[k + 1] = tuple(m[first:].copy() for m in (sx, sy, sxx, syy, sxy))
+
+    def _full(self, window, values):
+        out = np.full(self.shape, np.nan)
+        if window in self.sums:
+            out[window - 1:] = values
+        return out
+
+    def stddev(self, window):
+        """
+        :return: a [T, N] numpy array with the rolling standard deviation of x.
+        """
+        if window not in self.sums:
+            return self._full(window, None)
+        sx, _, sxx, _, _ = self.sums[window]
+        var = (sxx - sx * sx / window) / (window - 1)
+        return self._full(window, np.sqrt(np.maximum(var, 0)))
+
+    def covariance(self, window):
+        """
+        :return: a [T, N] numpy array with the rolling covariance of x and y.
+        """
+        if window not in self.sums:
+            return self._full(window, None)
+        sx, sy, _, _, sxy = self.sums[window]
+        return self._full(window, (sxy - sx * sy / window) / (window - 1))
+
+    def correlation(self, window, zero_variance=np.nan):
+        """
+        :param zero_variance: the value where x or y is constant over the window.
+        :return: a [T, N] numpy array with the rolling correlation of x and y.
+        """
+        if window not in self.sums:
+            return self._full(window, None)
+        sx, sy, sxx, syy, sxy = self.sums[window]
+        var_x = sxx - sx * sx / window
+        var_y = syy - sy * sy / window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = (sxy - sx * sy / window) / np.sqrt(var_x * var_y)
+        return self._full(window, np.where((var_x == 0) | (var_y == 0), zero_variance, corr))
+
+def stddev(x, window=10):
+    """
+    Wrapper function to estimate rolling standard deviation.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series standard deviation over the past 'window' days.
+    """
+    return RollingMoments(x, x, [window]).stddev(window)
+
+def covariance(x, y, window=10):
+    """
+    Wrapper function to estimate rolling covariance.
+    :param x: a [T, N] numpy array.
+    :param y: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series covariance over the past 'window' days.
+    """
+    return RollingMoments(x, y, [window]).covariance(window)
+
+def correlation(x, y, window=10, zero_variance=np.nan):
+    """
+    Wrapper function to estimate rolling correlations.
+    :param x: a [T, N] numpy array.
+    :param y: a [T, N] numpy array.
+    :param window: the rolling window.
+    :param zero_variance: the value where either input is constant over the window.
+    :return: a [T, N] numpy array with the time-series correlation over the past 'window' days.
+    """
+    return RollingMoments(x, y, [window]).correlation(window, zero_variance)
+
+def _rolling(x, window):
+    return pd.DataFrame(x).rolling(window)
+
+def ts_rank(x, window=10):
+    """
+    Wrapper function to estimate rolling rank.
+    The window is kept as a sorted skiplist that is updated as it slides, so each
+    step costs O(log window) for all ticker columns at once. Ties get their
+    average rank, as with scipy.stats.rankdata.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series rank over the past window days.
+    """
+    return _rolling(x, window).rank(method='average').to_numpy()
+
+def product(x, window=10):
+    """
+    Wrapper function to estimate rolling product.
+    The product is taken in log space: log|x| is summed over the window, the
+    number of negative factors gives the sign and any zero factor gives 0.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series product over the past 'window' days.
+    """
+    out = np.full_like(x, np.nan)
+    if window > len(x):
+        return out
+    x = _missing_as_nan(x)
+    magnitude = np.abs(x)
+    # Zeros are counted apart, so their log never enters the sum
+    log_magnitude = np.log(np.where(magnitude == 0, 1, magnitude))
+    log_sum = np.zeros_like(x[window - 1:])
+    negatives = np.zeros_like(log_sum)
+    zeros = np.zeros_like(log_sum)
+    for lag, log_lag in zip(_lagged(x, window), _lagged(log_magnitude, window)):
+        log_sum += log_lag
+        negatives += lag < 0
+        zeros += lag == 0
+    prod = np.where(negatives % 2 == 1, -1.0, 1.0) * np.exp(log_sum)
+    out[window - 1:] = np.where(np.isnan(log_sum), np.nan, np.where(zeros > 0, 0.0, prod))
+    return out
+
+def _running_extremum(blocks, keep_first=True):
+    # Running max down axis 1 of [B, w, N] blocks, with the block-relative index
+    # of the first (or, with keep_first=False, the last) row that reached it.
+    values = np.maximum.accumulate(blocks, axis=1)
+    is_new = np.ones(blocks.shape, dtype=bool)
+    if keep_first:
+        is_new[:, 1:] = blocks[:, 1:] > values[:, :-1]
+    else:
+        is_new[:, 1:] = blocks[:, 1:] >= values[:, :-1]
+    index = np.arange(blocks.shape[1]).reshape(1, -1, 1)
+    return values, np.maximum.accumulate(np.where(is_new, index, 0), axis=1)
+
+def rolling_extremum(x, window=10, largest=True):
+    """
+    Rolling max (or min) of every column together with the position where it occurred.
+    The van Herk/Gil-Werman form of the monotonic-deque algorithm: the time axis is
+    cut into blocks of 'window' rows, and any window is the suffix of one block plus
+    the prefix of the next. Running extrema forward and backward inside each block
+    give every window in O(1), so a pass is O(T * N) whatever the window length.
+    Ties resolve to the oldest day, like np.argmax.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :param largest: True for the max, False for the min.
+    :return: a tuple of [T, N] numpy arrays (extremum, 0-based position from the oldest day).
+    """
+    n_rows, n_cols = x.shape
+    values = np.full(x.shape, np.nan)
+    positions = np.full(x.shape, np.nan)
+    if window > n_rows:
+        return values, positions
+    missing = ~np.isfinite(x)
+    key = np.where(missing, -np.inf, x if largest else -x)
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), -np.inf)
+    padded[:n_rows] = key
+    blocks = padded.reshape(n_blocks, window, n_cols)
+    offset = (np.arange(n_blocks) * window).reshape(-1, 1, 1)
+
+    prefix, prefix_at = _running_extremum(blocks)
+    prefix = prefix.reshape(-1, n_cols)
+    prefix_at = (prefix_at + offset).reshape(-1, n_cols)
+    # Backward within each block, keeping the leftmost row on ties
+    suffix, suffix_at = _running_extremum(blocks[:, ::-1], keep_first=False)
+    suffix = suffix[:, ::-1].reshape(-1, n_cols)
+    suffix_at = (offset + window - 1 - suffix_at[:, ::-1]).reshape(-1, n_cols)
+
+    start = np.arange(n_rows - window + 1)
+    end = start + window - 1
+    from_suffix = suffix[start] >= prefix[end]
+    best = np.where(from_suffix, suffix[start], prefix[end])
+    best_at = np.where(from_suffix, suffix_at[start], prefix_at[end]) - start[:, None]
+
+    nan_count = np.zeros((n_rows + 1, n_cols), dtype=np.int64)
+    np.cumsum(missing, axis=0, out=nan_count[1:])
+    complete = nan_count[window:] == nan_count[:n_rows - window + 1]
+    values[window - 1:] = np.where(complete, best if largest else -best, np.nan)
+    positions[window - 1:] = np.where(complete, best_at, np.nan)
+    return values, positions
+
+def ts_min(x, window=10):
+    """
+    Wrapper function to estimate rolling min.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series min over the past 'window' days.
+    """
+    return rolling_extremum(x, window, largest=False)[0]
+
+def ts_max(x, window=10):
+    """
+    Wrapper function to estimate rolling max.
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the time-series max over the past 'window' days.
+    """
+    return rolling_extremum(x, window, largest=True)[0]
+
+def ts_argmax(x, window=10):
+    """
+    Wrapper function to estimate which day ts_max(x, window) occurred on
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the 1-based position of the max, 1 being the oldest day.
+    """
+    return rolling_extremum(x, window, largest=True)[1] + 1
+
+def ts_argmin(x, window=10):
+    """
+    Wrapper function to estimate which day ts_min(x, window) occurred on
+    :param x: a [T, N] numpy array.
+    :param window: the rolling window.
+    :return: a [T, N] numpy array with the 1-based position of the min, 1 being the oldest day.
+    """
+    return rolling_extremum(x, window, largest=False)[1] + 1
+
+def delta(x, period=1):
+    """
+    Wrapper function to estimate difference.
+    :param x: a [T, N] numpy array.
+    :param period: the difference grade.
+    :return: a [T, N] numpy array with today's value minus the value 'period' days ago.
+    """
+    return x - _shift(x, period)
+
+def delay(x, period=1):
+    """
+    Wrapper function to estimate lag.
+    :param x: a [T, N] numpy array.
+    :param period: the lag grade.
+    :return: a [T, N] numpy array with lagged time series
+    """
+    return _shift(x, period)
+
+def rank(x):
+    """
+    Cross sectional rank
+    :param x: a [T, N] numpy array.
+    :return: a [T, N] numpy array with the percentile rank of each ticker on each date.
+    """
+    return pd.DataFrame(x).rank(axis=1, pct=True).to_numpy()
+
+def scale(x, k=1):
+    """
+    Cross sectional scaling.
+    :param x: a [T, N] numpy array.
+    :param k: scaling factor.
+    :return: a [T, N] numpy array rescaled such that sum(abs(x)) = k on each date
+    """
+    # Reduced along the contiguous ticker axis, so a date row sums the same way for any number of dates
+    total = np.add.reduce(np.ascontiguousarray(_fillna(np.abs(x), 0)), axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return x * k / total
+
+def ind_neutralize(x, groups):
+    """
+    Cross sectional demeaning within groups (the paper's IndNeutralize).
+    The columns are permuted so that every group is a contiguous segment, and
+    the sums and counts of all segments of all dates come from one
+    np.add.reduceat each, which keeps the cost per date O(N) like rank.
+    :param x: a [T, N] numpy array.
+    :param groups: the Groups of the ticker columns.
+    :return: a [T, N] numpy array with x minus the mean of its group on each date, missing values left out.
+    """
+    x = _missing_as_nan(x)[:, groups.order]
+    valid = ~np.isnan(x)
+    sums = np.add.reduceat(np.where(valid, x, 0), groups.starts, axis=1)
+    counts = np.add.reduceat(valid, groups.starts, axis=1, dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+    return (x - np.repeat(means, groups.sizes, axis=1))[:, groups.inverse]
+
+def decay_linear(x, period=10):
+    """
+    Linear weighted moving average implementation.
+    Missing values are forward filled, then back filled, then set to 0 on a copy;
+    the first period - 1 rows keep the filled input. The weights are applied as
+    one vectorized pass per lag over the whole [T, N] matrix.
+    :param x: a [T, N] numpy array, left unchanged.
+    :param period: the LWMA period
+    :return: a [T, N] numpy array with the LWMA.
+    """
+    filled = pd.DataFrame(x).ffill().bfill().fillna(0).to_numpy()
+    na_lwma = filled.copy()
+    if period > len(filled):
+        return na_lwma
+    divisor = period * (period + 1) / 2
+    acc = np.zeros_like(filled[period - 1:])
+    for k, lag in enumerate(_lagged(filled, period)):
+        acc += lag * ((period - k) / divisor)
+    na_lwma[period - 1:] = acc
+    return na_lwma
+# endregion
+
+
+def select_alphas(alphas, known=ALPHA_NAMES):
+    """
+    Validate a requested list of alpha names.
+    :param alphas: alpha names, or None for all of known.
+    :param known: the alpha names that can be computed.
+    :return: a tuple of alpha names.
+    """
+    alphas = known if alphas is None else tuple(alphas)
+    unknown = [name for name in alphas if name not in known]
+    if unknown:
+        raise KeyError('unknown alphas: %s' % ', '.join(unknown))
+    return alphas
+
+
+def known_alphas(industries=None):
+    """
+    :param industries: an industry classification as returned by load_industries, or None.
+    :return: the names of the alphas that can be computed with it, in get_alpha column order.
+    """
+    return ALPHA_NAMES if industries is None else ALPHA_NAMES + INDUSTRY_ALPHA_NAMES
+
+
+def get_alpha(df, alphas=None, lazy=False, industries=None):
+    """
+    Panel counterpart of Alpha101_code_1.get_alpha.
+    :param df: a long-format FinRL DataFrame with date, tic and OHLCV columns.
+    :param alphas: names of the alphas to compute, all of known_alphas(industries) by default.
+    :param lazy: if True, leave df untouched and return a LazyAlphas mapping instead.
+    :param industries: an industry classification as returned by load_industries,
+        needed for the alphas in INDUSTRY_ALPHA_NAMES.
+    :return: df with one column per requested alpha, or a LazyAlphas mapping.
+    """
+    alphas = select_alphas(alphas, known_alphas(industries))
+    if not alphas and not lazy:
+        return df
+    stock = PanelAlphas(df, industries)
+    if lazy:
+        return LazyAlphas(df.index, stock.panel, alphas, lambda name: getattr(stock, name)())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in alphas:
+            df[name] = stock.panel.melt(getattr(stock, name)())
+    return df
+
+
+def get_alpha_matrix(df, alphas=None, dtype=np.float32, industries=None):
+    """
+    Compact counterpart of get_alpha: the alphas are written into one
+    preallocated [rows, n_alphas] array instead of one float64 column each.
+    :param df: a long-format FinRL DataFrame with date, tic and OHLCV columns, left unchanged.
+    :param alphas: names of the alphas to compute, all of known_alphas(industries) by default.
+    :param dtype: the dtype of the array. float32 halves the memory of float64;
+        values beyond its range become +-inf.
+    :param industries: an industry classification as returned by load_industries.
+    :return: a DataFrame with the index, date and tic of df and one column per
+        alpha, all alpha columns backed by the single array.
+    """
+    alphas = select_alphas(alphas, known_alphas(industries))
+    # Column-major, so each alpha is a contiguous write and pandas keeps the array as one block
+    values = np.empty((len(df), len(alphas)), dtype=dtype, order='F')
+    if alphas:
+        stock = PanelAlphas(df, industries)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for j, name in enumerate(alphas):
+                values[:, j] = stock.panel.melt(getattr(stock, name)())
+    matrix = pd.DataFrame(values, index=df.index, columns=list(alphas), copy=False)
+    return pd.concat([df[['date', 'tic']], matrix], axis=1, copy=False)
+
+
+class LazyAlphas(Mapping):
+    """
+    Read-only mapping of alpha name -> long-format Series, computing each alpha
+    the first time it is read.
+    :param index: the index of the source frame.
+    :param panel: the Panel of the source frame.
+    :param names: the alpha names the mapping holds.
+    :param evaluate: a callable returning the [T, N] array of an alpha name.
+    """
+    def __init__(self, index, panel, names, evaluate):
+        self.index = index
+        self.panel = panel
+        self.names = tuple(names)
+        self._evaluate = evaluate
+        self._columns = {}
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(name)
+        if name not in self._columns:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = self._evaluate(name)
+            self._columns[name] = pd.Series(self.panel.melt(values), index=self.index, name=name)
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_frame(self, df):
+        """
+        Assign every alpha in the mapping as a column of df.
+        :param df: the source frame.
+        :return: df.
+        """
+        for name in self.names:
+            df[name] = self[name]
+        return df
+
+
+class PanelAlphas(object):
+    """
+    Port of Alpha101_code_1.Alphas to [T, N] panels: each method computes what
+    the Alphas method of the same name computes, per ticker and per date. Where
+    Alphas departs from the formula in its comment the port keeps the Alphas
+    definition, so both engines give the same alpha under the same name:
+    - alpha001: no -0.5 shift after the rank;
+    - alpha010: no outer rank;
+    - alpha021: -1 where the 8-day band test or adv20 / volume < 1 holds, 1
+      elsewhere, instead of the paper's three nested branches;
+    - alpha029: sum(x, 2) where the paper has sum(ts_min(x, 2), 1);
+    - alpha032, alpha036, alpha047: sum(x, n) / n is written sma(x, n) / n,
+      dividing by n twice;
+    - alpha038: Ts_Rank(open, 10) where the paper ranks close.
+    Zero denominators in alpha053, alpha054, alpha055 and alpha060 are replaced
+    by +-0.0001, and inf and NaN correlations are cleaned where Alphas cleans them.
+    The port departs from Alphas in two places:
+    - alpha001 leaves close unchanged, where Alphas overwrites it in place and
+      the methods called after it read the overwritten values;
+    - the delta period 3.69741 of alpha064 is rounded to 4 like every other
+      window, where Alphas passes it to pandas diff unrounded.
+    :param df_data: a long-format FinRL DataFrame with date, tic and OHLCV columns.
+    :param industries: an industry classification as returned by load_industries,
+        needed for the alphas in INDUSTRY_ALPHA_NAMES.
+    """
+    def __init__(self, df_data, industries=None):
+        self.panel = Panel(df_data)
+        pivot = self.panel.pivot
+        self.open = pivot(df_data['open'])
+        self.high = pivot(df_data['high'])
+        self.low = pivot(df_data['low'])
+        self.close = pivot(df_data['close'])
+        volume = pivot(df_data['volume'])
+        self.volume = volume * 100
+        # Per-ticker simple returns and cumulative typical-price VWAP
+        self.returns = self.close / delay(self.close, 1) - 1
+        typical_price = (self.high + self.low + self.close) / 3
+        vwap = np.nancumsum(typical_price * volume, axis=0) / np.nancumsum(volume, axis=0)
+        self.vwap = (vwap * 1000) / (volume * 100 + 1)
+        # Group segments of each classification level, for the industry alphas
+        for level in GROUP_LEVELS:
+            setattr(self, level, None if industries is None else Groups(industries[level].reindex(self.panel.tickers)))
+
+    @classmethod
+    def from_inputs(cls, inputs, panel=None):
+        """
+        Build a PanelAlphas from already prepared INPUTS arrays.
+        :param inputs: a dict mapping each name in INPUTS to a [T, N] numpy array,
+            and optionally names in GROUP_LEVELS to Groups.
+        :param panel: the Panel the arrays were pivoted with, if any.
+        """
+        stock = cls.__new__(cls)
+        stock.panel = panel
+        for name in INPUTS:
+            setattr(stock, name, inputs[name])
+        for level in GROUP_LEVELS:
+            setattr(stock, level, inputs.get(level))
+        return stock
+
+    def inputs(self):
+        """
+        :return: a dict mapping each name in INPUTS to its [T, N] numpy array,
+            and each name in GROUP_LEVELS to its Groups when a classification was given.
+        """
+        inputs = {name: getattr(self, name) for name in INPUTS}
+        inputs.update((level, getattr(self, level)) for level in GROUP_LEVELS if getattr(self, level) is not None)
+        return inputs
+
+    # Alpha#1	 (rank(Ts_ArgMax(SignedPower(((returns < 0) ? stddev(returns, 20) : close), 2.), 5)) -0.5)
+    def alpha001(self):
+        inner = np.where(self.returns < 0, stddev(self.returns, 20), self.close)
+        return rank(ts_argmax(inner ** 2, 5))
+
+    # Alpha#2	 (-1 * correlation(rank(delta(log(volume), 2)), rank(((close - open) / open)), 6))
+    def alpha002(self):
+        return _clean(-1 * correlation(rank(delta(np.log(self.volume), 2)), rank((self.close - self.open) / self.open), 6))
+
+    # Alpha#3	 (-1 * correlation(rank(open), rank(volume), 10))
+    def alpha003(self):
+        return _clean(-1 * correlation(rank(self.open), rank(self.volume), 10))
+
+    # Alpha#4	 (-1 * Ts_Rank(rank(low), 9))
+    def alpha004(self):
+        return -1 * ts_rank(rank(self.low), 9)
+
+    # Alpha#5	 (rank((open - (sum(vwap, 10) / 10))) * (-1 * abs(rank((close - vwap)))))
+    def alpha005(self):
+        return rank(self.open - ts_sum(self.vwap, 10) / 10) * (-1 * np.abs(rank(self.close - self.vwap)))
+
+    # Alpha#6	 (-1 * correlation(open, volume, 10))
+    def alpha006(self):
+        return _clean(-1 * correlation(self.open, self.volume, 10))
+
+    # Alpha#7	 ((adv20 < volume) ? ((-1 * ts_rank(abs(delta(close, 7)), 60)) * sign(delta(close, 7))) : (-1* 1))
+    def alpha007(self):
+        adv20 = sma(self.volume, 20)
+        alpha = -1 * ts_rank(np.abs(delta(self.close, 7)), 60) * np.sign(delta(self.close, 7))
+        return np.where(adv20 >= self.volume, -1, alpha)
+
+    # Alpha#8	 (-1 * rank(((sum(open, 5) * sum(returns, 5)) - delay((sum(open, 5) * sum(returns, 5)),10))))
+    def alpha008(self):
+        inner = ts_sum(self.open, 5) * ts_sum(self.returns, 5)
+        return -1 * rank(inner - delay(inner, 10))
+
+    # Alpha#9	 ((0 < ts_min(delta(close, 1), 5)) ? delta(close, 1) : ((ts_max(delta(close, 1), 5) < 0) ?delta(close, 1) : (-1 * delta(close, 1))))
+    def alpha009(self):
+        delta_close = delta(self.close, 1)
+        cond = (ts_min(delta_close, 5) > 0) | (ts_max(delta_close, 5) < 0)
+        return np.where(cond, delta_close, -1 * delta_close)
+
+    # Alpha#10	 rank(((0 < ts_min(delta(close, 1), 4)) ? delta(close, 1) : ((ts_max(delta(close, 1), 4) < 0)? delta(close, 1) : (-1 * delta(close, 1)))))
+    def alpha010(self):
+        delta_close = delta(self.close, 1)
+        cond = (ts_min(delta_close, 4) > 0) | (ts_max(delta_close, 4) < 0)
+        return np.where(cond, delta_close, -1 * delta_close)
+
+    # Alpha#11	 ((rank(ts_max((vwap - close), 3)) + rank(ts_min((vwap - close), 3))) *rank(delta(volume, 3)))
+    def alpha011(self):
+        return (rank(ts_max(self.vwap - self.close, 3)) + rank(ts_min(self.vwap - self.close, 3))) * rank(delta(self.volume, 3))
+
+    # Alpha#12	 (sign(delta(volume, 1)) * (-1 * delta(close, 1)))
+    def alpha012(self):
+        return np.sign(delta(self.volume, 1)) * (-1 * delta(self.close, 1))
+
+    # Alpha#13	 (-1 * rank(covariance(rank(close), rank(volume), 5)))
+    def alpha013(self):
+        return -1 * rank(covariance(rank(self.close), rank(self.volume), 5))
+
+    # Alpha#14	 ((-1 * rank(delta(returns, 3))) * correlation(open, volume, 10))
+    def alpha014(self):
+        df = _clean(correlation(self.open, self.volume, 10))
+        return -1 * rank(delta(self.returns, 3)) * df
+
+    # Alpha#15	 (-1 * sum(rank(correlation(rank(high), rank(volume), 3)), 3))
+    def alpha015(self):
+        df = _clean(correlation(rank(self.high), rank(self.volume), 3))
+        return -1 * ts_sum(rank(df), 3)
+
+    # Alpha#16	 (-1 * rank(covariance(rank(high), rank(volume), 5)))
+    def alpha016(self):
+        return -1 * rank(covariance(rank(self.high), rank(self.volume), 5))
+
+    # Alpha#17	 (((-1 * rank(ts_rank(close, 10))) * rank(delta(delta(close, 1), 1))) *rank(ts_rank((volume / adv20), 5)))
+    def alpha017(self):
+        adv20 = sma(self.volume, 20)
+        return -1 * (rank(ts_rank(self.close, 10)) *
+                     rank(delta(delta(self.close, 1), 1)) *
+                     rank(ts_rank(self.volume / adv20, 5)))
+
+    # Alpha#18	 (-1 * rank(((stddev(abs((close - open)), 5) + (close - open)) + correlation(close, open,10))))
+    def alpha018(self):
+        df = _clean(correlation(self.close, self.open, 10))
+        return -1 * rank(stddev(np.abs(self.close - self.open), 5) + (self.close - self.open) + df)
+
+    # Alpha#19	 ((-1 * sign(((close - delay(close, 7)) + delta(close, 7)))) * (1 + rank((1 + sum(returns,250)))))
+    def alpha019(self):
+        return ((-1 * np.sign((self.close - delay(self.close, 7)) + delta(self.close, 7))) *
+                (1 + rank(1 + ts_sum(self.returns, 250))))
+
+    # Alpha#20	 (((-1 * rank((open - delay(high, 1)))) * rank((open - delay(close, 1)))) * rank((open -delay(low, 1))))
+    def alpha020(self):
+        return -1 * (rank(self.open - delay(self.high, 1)) *
+                     rank(self.open - delay(self.close, 1)) *
+                     rank(self.open - delay(self.low, 1)))
+
+    # Alpha#21	 ((((sum(close, 8) / 8) + stddev(close, 8)) < (sum(close, 2) / 2)) ? (-1 * 1) : (((sum(close,2) / 2) < ((sum(close, 8) / 8) - stddev(close, 8))) ? 1 : (((1 < (volume / adv20)) || ((volume /adv20) == 1)) ? 1 : (-1 * 1))))
+    def alpha021(self):
+        cond_1 = sma(self.close, 8) + stddev(self.close, 8) < sma(self.close, 2)
+        cond_2 = sma(self.volume, 20) / self.volume < 1
+        return np.where(cond_1 | cond_2, -1.0, 1.0)
+
+    # Alpha#22	 (-1 * (delta(correlation(high, volume, 5), 5) * rank(stddev(close, 20))))
+    def alpha022(self):
+        df = _clean(correlation(self.high, self.volume, 5))
+        return -1 * delta(df, 5) * rank(stddev(self.close, 20))
+
+    # Alpha#23	 (((sum(high, 20) / 20) < high) ? (-1 * delta(high, 2)) : 0)
+    def alpha023(self):
+        cond = sma(self.high, 20) < self.high
+        return np.where(cond, -1 * _fillna(delta(self.high, 2), 0), 0.0)
+
+    # Alpha#24	 ((((delta((sum(close, 100) / 100), 100) / delay(close, 100)) < 0.05) ||((delta((sum(close, 100) / 100), 100) / delay(close, 100)) == 0.05)) ? (-1 * (close - ts_min(close,100))) : (-1 * delta(close, 3)))
+    def alpha024(self):
+        cond = delta(sma(self.close, 100), 100) / delay(self.close, 100) <= 0.05
+        return np.where(cond, -1 * (self.close - ts_min(self.close, 100)), -1 * delta(self.close, 3))
+
+    # Alpha#25	 rank(((((-1 * returns) * adv20) * vwap) * (high - close)))
+    def alpha025(self):
+        adv20 = sma(self.volume, 20)
+        return rank(((-1 * self.returns) * adv20) * self.vwap * (self.high - self.close))
+
+    # Alpha#26	 (-1 * ts_max(correlation(ts_rank(volume, 5), ts_rank(high, 5), 5), 3))
+    def alpha026(self):
+        df = _clean(correlation(ts_rank(self.volume, 5), ts_rank(self.high, 5), 5))
+        return -1 * ts_max(df, 3)
+
+    # Alpha#27	 ((0.5 < rank((sum(correlation(rank(volume), rank(vwap), 6), 2) / 2.0))) ? (-1 * 1) : 1)
+    def alpha027(self):
+        alpha = rank(sma(correlation(rank(self.volume), rank(self.vwap), 6), 2) / 2.0)
+        return np.where(np.isnan(alpha), np.nan, np.where(alpha > 0.5, -1.0, 1.0))
+
+    # Alpha#28	 scale(((correlation(adv20, low, 5) + ((high + low) / 2)) - close))
+    def alpha028(self):
+        adv20 = sma(self.volume, 20)
+        df = _clean(correlation(adv20, self.low, 5))
+        return scale((df + (self.high + self.low) / 2) - self.close)
+
+    # Alpha#29	 (min(product(rank(rank(scale(log(sum(ts_min(rank(rank((-1 * rank(delta((close - 1),5))))), 2), 1))))), 1), 5) + ts_rank(delay((-1 * returns), 6), 5))
+    def alpha029(self):
+        inner = np.log(ts_sum(rank(rank(-1 * rank(delta(self.close - 1, 5)))), 2))
+        return ts_min(rank(rank(scale(inner))), 5) + ts_rank(delay(-1 * self.returns, 6), 5)
+
+    # Alpha#30	 (((1.0 - rank(((sign((close - delay(close, 1))) + sign((delay(close, 1) - delay(close, 2)))) +sign((delay(close, 2) - delay(close, 3)))))) * sum(volume, 5)) / sum(volume, 20))
+    def alpha030(self):
+        delta_close = delta(self.close, 1)
+        inner = np.sign(delta_close) + np.sign(delay(delta_close, 1)) + np.sign(delay(delta_close, 2))
+        return ((1.0 - rank(inner)) * ts_sum(self.volume, 5)) / ts_sum(self.volume, 20)
+
+    # Alpha#31	 ((rank(rank(rank(decay_linear((-1 * rank(rank(delta(close, 10)))), 10)))) + rank((-1 *delta(close, 3)))) + sign(scale(correlation(adv20, low, 12))))
+    def alpha031(self):
+        adv20 = sma(self.volume, 20)
+        df = _clean(correlation(adv20, self.low, 12))
+        p1 = rank(rank(rank(decay_linear(-1 * rank(rank(delta(self.close, 10))), 10))))
+        p2 = rank(-1 * delta(self.close, 3))
+        p3 = np.sign(scale(df))
+        return p1 + p2 + p3
+
+    # Alpha#32	 (scale(((sum(close, 7) / 7) - close)) + (20 * scale(correlation(vwap, delay(close, 5),230))))
+    def alpha032(self):
+        return scale((sma(self.close, 7) / 7) - self.close) + (20 * scale(correlation(self.vwap, delay(self.close, 5), 230)))
+
+    # Alpha#33	 rank((-1 * ((1 - (open / close))^1)))
+    def alpha033(self):
+        return rank(-1 + (self.open / self.close))
+
+    # Alpha#34	 rank(((1 - rank((stddev(returns, 2) / stddev(returns, 5)))) + (1 - rank(delta(close, 1)))))
+    def alpha034(self):
+        inner = _clean(stddev(self.returns, 2) / stddev(self.returns, 5), 1)
+        return rank(2 - rank(inner) - rank(delta(self.close, 1)))
+
+    # Alpha#35	 ((Ts_Rank(volume, 32) * (1 - Ts_Rank(((close + high) - low), 16))) * (1 -Ts_Rank(returns, 32)))
+    def alpha035(self):
+        return ((ts_rank(self.volume, 32) *
+                 (1 - ts_rank(self.close + self.high - self.low, 16))) *
+                (1 - ts_rank(self.returns, 32)))
+
+    # Alpha#36	 (((((2.21 * rank(correlation((close - open), delay(volume, 1), 15))) + (0.7 * rank((open- close)))) + (0.73 * rank(Ts_Rank(delay((-1 * returns), 6), 5)))) + rank(abs(correlation(vwap,adv20, 6)))) + (0.6 * rank((((sum(close, 200) / 200) - open) * (close - open)))))
+    def alpha036(self):
+        adv20 = sma(self.volume, 20)
+        return ((((2.21 * rank(correlation(self.close - self.open, delay(self.volume, 1), 15))) +
+                  (0.7 * rank(self.open - self.close))) +
+                 (0.73 * rank(ts_rank(delay(-1 * self.returns, 6), 5)))) +
+                rank(np.abs(correlation(self.vwap, adv20, 6))) +
+                (0.6 * rank(((sma(self.close, 200) / 200) - self.open) * (self.close - self.open))))
+
+    # Alpha#37	 (rank(correlation(delay((open - close), 1), close, 200)) + rank((open - close)))
+    def alpha037(self):
+        return rank(correlation(delay(self.open - self.close, 1), self.close, 200)) + rank(self.open - self.close)
+
+    # Alpha#38	 ((-1 * rank(Ts_Rank(close, 10))) * rank((close / open)))
+    def alpha038(self):
+        inner = _clean(self.close / self.open, 1)
+        return -1 * rank(ts_rank(self.open, 10)) * rank(inner)
+
+    # Alpha#39	 ((-1 * rank((delta(close, 7) * (1 - rank(decay_linear((volume / adv20), 9)))))) * (1 +rank(sum(returns, 250))))
+    def alpha039(self):
+        adv20 = sma(self.volume, 20)
+        return ((-1 * rank(delta(self.close, 7) * (1 - rank(decay_linear(self.volume / adv20, 9))))) *
+                (1 + rank(sma(self.returns, 250))))
+
+    # Alpha#40	 ((-1 * rank(stddev(high, 10))) * correlation(high, volume, 10))
+    def alpha040(self):
+        return -1 * rank(stddev(self.high, 10)) * correlation(self.high, self.volume, 10)
+
+    # Alpha#41	 (((high * low)^0.5) - vwap)
+    def alpha041(self):
+        return np.power(self.high * self.low, 0.5) - self.vwap
+
+    # Alpha#42	 (rank((vwap - close)) / rank((vwap + close)))
+    def alpha042(self):
+        return rank(self.vwap - self.close) / rank(self.vwap + self.close)
+
+    # Alpha#43	 (ts_rank((volume / adv20), 20) * ts_rank((-1 * delta(close, 7)), 8))
+    def alpha043(self):
+        adv20 = sma(self.volume, 20)
+        return ts_rank(self.volume / adv20, 20) * ts_rank(-1 * delta(self.close, 7), 8)
+
+    # Alpha#44	 (-1 * correlation(high, rank(volume), 5))
+    def alpha044(self):
+        return -1 * _clean(correlation(self.high, rank(self.volume), 5))
+
+    # Alpha#45	 (-1 * ((rank((sum(delay(close, 5), 20) / 20)) * correlation(close, volume, 2)) *rank(correlation(sum(close, 5), sum(close, 20), 2))))
+    def alpha045(self):
+        df = _clean(correlation(self.close, self.volume, 2))
+        return -1 * (rank(sma(delay(self.close, 5), 20)) * df *
+                     rank(correlation(ts_sum(self.close, 5), ts_sum(self.close, 20), 2)))
+
+    # Alpha#46	 ((0.25 < (((delay(close, 20) - delay(close, 10)) / 10) - ((delay(close, 10) - close) / 10))) ?(-1 * 1) : (((((delay(close, 20) - delay(close, 10)) / 10) - ((delay(close, 10) - close) / 10)) < 0) ? 1 :((-1 * 1) * (close - delay(close, 1)))))
+    def alpha046(self):
+        inner = ((delay(self.close, 20) - delay(self.close, 10)) / 10) - ((delay(self.close, 10) - self.close) / 10)
+        alpha = np.where(inner < 0, 1, -1 * delta(self.close))
+        return np.where(inner > 0.25, -1, alpha)
+
+    # Alpha#47	 ((((rank((1 / close)) * volume) / adv20) * ((high * rank((high - close))) / (sum(high, 5) /5))) - rank((vwap - delay(vwap, 5))))
+    def alpha047(self):
+        adv20 = sma(self.volume, 20)
+        return ((((rank(1 / self.close) * self.volume) / adv20) *
+                 ((self.high * rank(self.high - self.close)) / (sma(self.high, 5) / 5))) -
+                rank(self.vwap - delay(self.vwap, 5)))
+
+    # Alpha#48	 (indneutralize(((correlation(delta(close, 1), delta(delay(close, 1), 1), 250) *delta(close, 1)) / close), IndClass.subindustry) / sum(((delta(close, 1) / delay(close, 1))^2), 250))
+    def alpha048(self):
+        delta_close = delta(self.close, 1)
+        inner = correlation(delta_close, delta(delay(self.close, 1), 1), 250) * delta_close / self.close
+        return ind_neutralize(inner, self.subindustry) / ts_sum((delta_close / delay(self.close, 1)) ** 2, 250)
+
+    # Alpha#49	 (((((delay(close, 20) - delay(close, 10)) / 10) - ((delay(close, 10) - close) / 10)) < (-1 *0.1)) ? 1 : ((-1 * 1) * (close - delay(close, 1))))
+    def alpha049(self):
+        inner = ((delay(self.close, 20) - delay(self.close, 10)) / 10) - ((delay(self.close, 10) - self.close) / 10)
+        return np.where(inner < -0.1, 1, -1 * delta(self.close))
+
+    # Alpha#50	 (-1 * ts_max(rank(correlation(rank(volume), rank(vwap), 5)), 5))
+    def alpha050(self):
+        return -1 * ts_max(rank(correlation(rank(self.volume), rank(self.vwap), 5)), 5)
+
+    # Alpha#51	 (((((delay(close, 20) - delay(close, 10)) / 10) - ((delay(close, 10) - close) / 10)) < (-1 *0.05)) ? 1 : ((-1 * 1) * (close - delay(close, 1))))
+    def alpha051(self):
+        inner = ((delay(self.close, 20) - delay(self.close, 10)) / 10) - ((delay(self.close, 10) - self.close) / 10)
+        return np.where(inner < -0.05, 1, -1 * delta(self.close))
+
+    # Alpha#52	 ((((-1 * ts_min(low, 5)) + delay(ts_min(low, 5), 5)) * rank(((sum(returns, 240) -sum(returns, 20)) / 220))) * ts_rank(volume, 5))
+    def alpha052(self):
+        return (((-1 * delta(ts_min(self.low, 5), 5)) *
+                 rank((ts_sum(self.returns, 240) - ts_sum(self.returns, 20)) / 220)) * ts_rank(self.volume, 5))
+
+    # Alpha#53	 (-1 * delta((((close - low) - (high - close)) / (close - low)), 9))
+    def alpha053(self):
+        inner = self.close - self.low
+        inner = np.where(inner == 0, 0.0001, inner)
+        return -1 * delta(((self.close - self.low) - (self.high - self.close)) / inner, 9)
+
+    # Alpha#54	 ((-1 * ((low - close) * (open^5))) / ((low - high) * (close^5)))
+    def alpha054(self):
+        inner = self.low - self.high
+        inner = np.where(inner == 0, -0.0001, inner)
+        return -1 * (self.low - self.close) * (self.open ** 5) / (inner * (self.close ** 5))
+
+    # Alpha#55	 (-1 * correlation(rank(((close - ts_min(low, 12)) / (ts_max(high, 12) - ts_min(low,12)))), rank(volume), 6))
+    def alpha055(self):
+        divisor = ts_max(self.high, 12) - ts_min(self.low, 12)
+        divisor = np.where(divisor == 0, 0.0001, divisor)
+        inner = (self.close - ts_min(self.low, 12)) / divisor
+        return -1 * _clean(correlation(rank(inner), rank(self.volume), 6))
+
+    # Alpha#57	 (0 - (1 * ((close - vwap) / decay_linear(rank(ts_argmax(close, 30)), 2))))
+    def alpha057(self):
+        return 0 - (1 * ((self.close - self.vwap) / decay_linear(rank(ts_argmax(self.close, 30)), 2)))
+
+    # Alpha#58	 (-1 * Ts_Rank(decay_linear(correlation(IndNeutralize(vwap, IndClass.sector), volume,3.92795), 7.89291), 5.50322))
+    def alpha058(self):
+        return -1 * ts_rank(decay_linear(correlation(ind_neutralize(self.vwap, self.sector), self.volume, 4), 8), 6)
+
+    # Alpha#59	 (-1 * Ts_Rank(decay_linear(correlation(IndNeutralize(((vwap * 0.728317) + (vwap *(1 - 0.728317))), IndClass.industry), volume, 4.25197), 16.2289), 8.19648))
+    def alpha059(self):
+        inner = ind_neutralize(self.vwap * 0.728317 + self.vwap * (1 - 0.728317), self.industry)
+        return -1 * ts_rank(decay_linear(correlation(inner, self.volume, 4), 16), 8)
+
+    # Alpha#60	 (0 - (1 * ((2 * scale(rank(((((close - low) - (high - close)) / (high - low)) * volume)))) -scale(rank(ts_argmax(close, 10))))))
+    def alpha060(self):
+        divisor = self.high - self.low
+        divisor = np.where(divisor == 0, 0.0001, divisor)
+        inner = ((self.close - self.low) - (self.high - self.close)) * self.volume / divisor
+        return -((2 * scale(rank(inner))) - scale(rank(ts_argmax(self.close, 10))))
+
+    # Alpha#61	 (rank((vwap - ts_min(vwap, 16.1219))) < rank(correlation(vwap, adv180, 17.9282)))
+    def alpha061(self):
+        adv180 = sma(self.volume, 180)
+        return (rank(self.vwap - ts_min(self.vwap, 16)) < rank(correlation(self.vwap, adv180, 18))).astype(np.float64)
+
+    # Alpha#62	 ((rank(correlation(vwap, sum(adv20, 22.4101), 9.91009)) < rank(((rank(open) +rank(open)) < (rank(((high + low) / 2)) + rank(high))))) * -1)
+    def alpha062(self):
+        adv20 = sma(self.volume, 20)
+        inner = ((rank(self.open) + rank(self.open)) < (rank((self.high + self.low) / 2) + rank(self.high))).astype(np.float64)
+        return (rank(correlation(self.vwap, sma(adv20, 22), 10)) < rank(inner)) * -1.0
+
+    # Alpha#63	 ((rank(decay_linear(delta(IndNeutralize(close, IndClass.industry), 2.25164), 8.22237))- rank(decay_linear(correlation(((vwap * 0.318108) + (open * (1 - 0.318108))), sum(adv180,37.2467), 13.557), 12.2883))) * -1)
+    def alpha063(self):
+        adv180 = sma(self.volume, 180)
+        p1 = rank(decay_linear(delta(ind_neutralize(self.close, self.industry), 2), 8))
+        p2 = rank(decay_linear(correlation(self.vwap * 0.318108 + self.open * (1 - 0.318108), ts_sum(adv180, 37), 14), 12))
+        return (p1 - p2) * -1
+
+    # Alpha#64	 ((rank(correlation(sum(((open * 0.178404) + (low * (1 - 0.178404))), 12.7054),sum(adv120, 12.7054), 16.6208)) < rank(delta(((((high + low) / 2) * 0.178404) + (vwap * (1 -0.178404))), 3.69741))) * -1)
+    def alpha064(self):
+        adv120 = sma(self.volume, 120)
+        return ((rank(correlation(sma((self.open * 0.178404) + (self.low * (1 - 0.178404)), 13), sma(adv120, 13), 17)) <
+                 rank(delta((((self.high + self.low) / 2) * 0.178404) + (self.vwap * (1 - 0.178404)), 4))) * -1.0)
+
+    # Alpha#65	 ((rank(correlation(((open * 0.00817205) + (vwap * (1 - 0.00817205))), sum(adv60,8.6911), 6.40374)) < rank((open - ts_min(open, 13.635)))) * -1)
+    def alpha065(self):
+        adv60 = sma(self.volume, 60)
+        return ((rank(correlation((self.open * 0.00817205) + (self.vwap * (1 - 0.00817205)), sma(adv60, 9), 6)) <
+                 rank(self.open - ts_min(self.open, 14))) * -1.0)
+
+    # Alpha#66	 ((rank(decay_linear(delta(vwap, 3.51013), 7.23052)) + Ts_Rank(decay_linear(((((low* 0.96633) + (low * (1 - 0.96633))) - vwap) / (open - ((high + low) / 2))), 11.4157), 6.72611)) * -1)
+    def alpha066(self):
+        inner = (((self.low * 0.96633) + (self.low * (1 - 0.96633))) - self.vwap) / (self.open - ((self.high + self.low) / 2))
+        return (rank(decay_linear(delta(self.vwap, 4), 7)) + ts_rank(decay_linear(inner, 11), 7)) * -1
+
+    # Alpha#67	 ((rank((high - ts_min(high, 2.14593)))^rank(correlation(IndNeutralize(vwap,IndClass.sector), IndNeutralize(adv20, IndClass.subindustry), 6.02936))) * -1)
+    def alpha067(self):
+        adv20 = sma(self.volume, 20)
+        inner = correlation(ind_neutralize(self.vwap, self.sector), ind_neutralize(adv20, self.subindustry), 6)
+        return (rank(self.high - ts_min(self.high, 2)) ** rank(inner)) * -1
+
+    # Alpha#68	 ((Ts_Rank(correlation(rank(high), rank(adv15), 8.91644), 13.9333) <rank(delta(((close * 0.518371) + (low * (1 - 0.518371))), 1.06157))) * -1)
+    def alpha068(self):
+        adv15 = sma(self.volume, 15)
+        return ((ts_rank(correlation(rank(self.high), rank(adv15), 9), 14) <
+                 rank(delta((self.close * 0.518371) + (self.low * (1 - 0.518371)), 1))) * -1.0)
+
+    # Alpha#69	 ((rank(ts_max(delta(IndNeutralize(vwap, IndClass.industry), 2.72412),4.79344))^Ts_Rank(correlation(((close * 0.490655) + (vwap * (1 - 0.490655))), adv20, 4.92416),9.0615)) * -1)
+    def alpha069(self):
+        adv20 = sma(self.volume, 20)
+        p1 = rank(ts_max(delta(ind_neutralize(self.vwap, self.industry), 3), 5))
+        p2 = ts_rank(correlation(self.close * 0.490655 + self.vwap * (1 - 0.490655), adv20, 5), 9)
+        return (p1 ** p2) * -1
+
+    # Alpha#70	 ((rank(delta(vwap, 1.29456))^Ts_Rank(correlation(IndNeutralize(close,IndClass.industry), adv50, 17.8256), 17.9171)) * -1)
+    def alpha070(self):
+        adv50 = sma(self.volume, 50)
+        p2 = ts_rank(correlation(ind_neutralize(self.close, self.industry), adv50, 18), 18)
+        return (rank(delta(self.vwap, 1)) ** p2) * -1
+
+    # Alpha#71	 max(Ts_Rank(decay_linear(correlation(Ts_Rank(close, 3.43976), Ts_Rank(adv180,12.0647), 18.0175), 4.20501), 15.6948), Ts_Rank(decay_linear((rank(((low + open) - (vwap +vwap)))^2), 16.4662), 4.4388))
+    def alpha071(self):
+        adv180 = sma(self.volume, 180)
+        p1 = ts_rank(decay_linear(correlation(ts_rank(self.close, 3), ts_rank(adv180, 12), 18), 4), 16)
+        p2 = ts_rank(decay_linear(rank((self.low + self.open) - (self.vwap + self.vwap)) ** 2, 16), 4)
+        return np.maximum(p1, p2)
+
+    # Alpha#72	 (rank(decay_linear(correlation(((high + low) / 2), adv40, 8.93345), 10.1519)) /rank(decay_linear(correlation(Ts_Rank(vwap, 3.72469), Ts_Rank(volume, 18.5188), 6.86671),2.95011)))
+    def alpha072(self):
+        adv40 = sma(self.volume, 40)
+        return (rank(decay_linear(correlation((self.high + self.low) / 2, adv40, 9), 10)) /
+                rank(decay_linear(correlation(ts_rank(self.vwap, 4), ts_rank(self.volume, 19), 7), 3)))
+
+    # Alpha#73	 (max(rank(decay_linear(delta(vwap, 4.72775), 2.91864)),Ts_Rank(decay_linear(((delta(((open * 0.147155) + (low * (1 - 0.147155))), 2.03608) / ((open *0.147155) + (low * (1 - 0.147155)))) * -1), 3.33829), 16.7411)) * -1)
+    def alpha073(self):
+        blend = (self.open * 0.147155) + (self.low * (1 - 0.147155))
+        p1 = rank(decay_linear(delta(self.vwap, 5), 3))
+        p2 = ts_rank(decay_linear((delta(blend, 2) / blend) * -1, 3), 17)
+        return -1 * np.maximum(p1, p2)
+
+    # Alpha#74	 ((rank(correlation(close, sum(adv30, 37.4843), 15.1365)) <rank(correlation(rank(((high * 0.0261661) + (vwap * (1 - 0.0261661)))), rank(volume), 11.4791)))* -1)
+    def alpha074(self):
+        adv30 = sma(self.volume, 30)
+        return ((rank(correlation(self.close, sma(adv30, 37), 15)) <
+                 rank(correlation(rank((self.high * 0.0261661) + (self.vwap * (1 - 0.0261661))), rank(self.volume), 11))) * -1.0)
+
+    # Alpha#75	 (rank(correlation(vwap, volume, 4.24304)) < rank(correlation(rank(low), rank(adv50),12.4413)))
+    def alpha075(self):
+        adv50 = sma(self.volume, 50)
+        return (rank(correlation(self.vwap, self.volume, 4)) < rank(correlation(rank(self.low), rank(adv50), 12))).astype(np.float64)
+
+    # Alpha#76	 (max(rank(decay_linear(delta(vwap, 1.24383), 11.8259)),Ts_Rank(decay_linear(Ts_Rank(correlation(IndNeutralize(low, IndClass.sector), adv81,8.14941), 19.569), 17.1543), 19.383)) * -1)
+    def alpha076(self):
+        adv81 = sma(self.volume, 81)
+        p1 = rank(decay_linear(delta(self.vwap, 1), 12))
+        p2 = ts_rank(decay_linear(ts_rank(correlation(ind_neutralize(self.low, self.sector), adv81, 8), 20), 17), 19)
+        return np.maximum(p1, p2) * -1
+
+    # Alpha#77	 min(rank(decay_linear(((((high + low) / 2) + high) - (vwap + high)), 20.0451)),rank(decay_linear(correlation(((high + low) / 2), adv40, 3.1614), 5.64125)))
+    def alpha077(self):
+        adv40 = sma(self.volume, 40)
+        p1 = rank(decay_linear((((self.high + self.low) / 2) + self.high) - (self.vwap + self.high), 20))
+        p2 = rank(decay_linear(correlation((self.high + self.low) / 2, adv40, 3), 6))
+        return np.minimum(p1, p2)
+
+    # Alpha#78	 (rank(correlation(sum(((low * 0.352233) + (vwap * (1 - 0.352233))), 19.7428),sum(adv40, 19.7428), 6.83313))^rank(correlation(rank(vwap), rank(volume), 5.77492)))
+    def alpha078(self):
+        adv40 = sma(self.volume, 40)
+        return np.power(rank(correlation(ts_sum((self.low * 0.352233) + (self.vwap * (1 - 0.352233)), 20), ts_sum(adv40, 20), 7)),
+                        rank(correlation(rank(self.vwap), rank(self.volume), 6)))
+
+    # Alpha#79	 (rank(delta(IndNeutralize(((close * 0.60733) + (open * (1 - 0.60733))),IndClass.sector), 1.23438)) < rank(correlation(Ts_Rank(vwap, 3.60973), Ts_Rank(adv150,9.18637), 14.6644)))
+    def alpha079(self):
+        adv150 = sma(self.volume, 150)
+        p1 = rank(delta(ind_neutralize(self.close * 0.60733 + self.open * (1 - 0.60733), self.sector), 1))
+        p2 = rank(correlation(ts_rank(self.vwap, 4), ts_rank(adv150, 9), 15))
+        return (p1 < p2).astype(np.float64)
+
+    # Alpha#80	 ((rank(Sign(delta(IndNeutralize(((open * 0.868128) + (high * (1 - 0.868128))),IndClass.industry), 4.04545)))^Ts_Rank(correlation(high, adv10, 5.11456), 5.53756)) * -1)
+    def alpha080(self):
+        adv10 = sma(self.volume, 10)
+        p1 = rank(np.sign(delta(ind_neutralize(self.open * 0.868128 + self.high * (1 - 0.868128), self.industry), 4)))
+        p2 = ts_rank(correlation(self.high, adv10, 5), 6)
+        return (p1 ** p2) * -1
+
+    # Alpha#81	 ((rank(Log(product(rank((rank(correlation(vwap, sum(adv10, 49.6054),8.47743))^4)), 14.9655))) < rank(correlation(rank(vwap), rank(volume), 5.07914))) * -1)
+    def alpha081(self):
+        adv10 = sma(self.volume, 10)
+        inner = np.log(product(rank(rank(correlation(self.vwap, ts_sum(adv10, 50), 8)) ** 4), 15))
+        return (rank(inner) < rank(correlation(rank(self.vwap), rank(self.volume), 5))) * -1.0
+
+    # Alpha#82	 (min(rank(decay_linear(delta(open, 1.46063), 14.8717)),Ts_Rank(decay_linear(correlation(IndNeutralize(volume, IndClass.sector), ((open * 0.634196) +(open * (1 - 0.634196))), 17.4842), 6.92131), 13.4283)) * -1)
+    def alpha082(self):
+        p1 = rank(decay_linear(delta(self.open, 1), 15))
+        inner = correlation(ind_neutralize(self.volume, self.sector), self.open * 0.634196 + self.open * (1 - 0.634196), 17)
+        p2 = ts_rank(decay_linear(inner, 7), 13)
+        return np.minimum(p1, p2) * -1
+
+    # Alpha#83	 ((rank(delay(((high - low) / (sum(close, 5) / 5)), 2)) * rank(rank(volume))) / (((high -low) / (sum(close, 5) / 5)) / (vwap - close)))
+    def alpha083(self):
+        inner = (self.high - self.low) / (ts_sum(self.close, 5) / 5)
+        return (rank(delay(inner, 2)) * rank(rank(self.volume))) / (inner / (self.vwap - self.close))
+
+    # Alpha#84	 SignedPower(Ts_Rank((vwap - ts_max(vwap, 15.3217)), 20.7127), delta(close,4.96796))
+    def alpha084(self):
+        return np.power(ts_rank(self.vwap - ts_max(self.vwap, 15), 21), delta(self.close, 5))
+
+    # Alpha#85	 (rank(correlation(((high * 0.876703) + (close * (1 - 0.876703))), adv30,9.61331))^rank(correlation(Ts_Rank(((high + low) / 2), 3.70596), Ts_Rank(volume, 10.1595),7.11408)))
+    def alpha085(self):
+        adv30 = sma(self.volume, 30)
+        return np.power(rank(correlation((self.high * 0.876703) + (self.close * (1 - 0.876703)), adv30, 10)),
+                        rank(correlation(ts_rank((self.high + self.low) / 2, 4), ts_rank(self.volume, 10), 7)))
+
+    # Alpha#86	 ((Ts_Rank(correlation(close, sum(adv20, 14.7444), 6.00049), 20.4195) < rank(((open+ close) - (vwap + open)))) * -1)
+    def alpha086(self):
+        adv20 = sma(self.volume, 20)
+        return ((ts_rank(correlation(self.close, sma(adv20, 15), 6), 20) <
+                 rank((self.open + self.close) - (self.vwap + self.open))) * -1.0)
+
+    # Alpha#87	 (max(rank(decay_linear(delta(((close * 0.369701) + (vwap * (1 - 0.369701))),1.91233), 2.65461)), Ts_Rank(decay_linear(abs(correlation(IndNeutralize(adv81,IndClass.industry), close, 13.4132)), 4.89768), 14.4535)) * -1)
+    def alpha087(self):
+        adv81 = sma(self.volume, 81)
+        p1 = rank(decay_linear(delta(self.close * 0.369701 + self.vwap * (1 - 0.369701), 2), 3))
+        p2 = ts_rank(decay_linear(np.abs(correlation(ind_neutralize(adv81, self.industry), self.close, 13)), 5), 14)
+        return np.maximum(p1, p2) * -1
+
+    # Alpha#88	 min(rank(decay_linear(((rank(open) + rank(low)) - (rank(high) + rank(close))),8.06882)), Ts_Rank(decay_linear(correlation(Ts_Rank(close, 8.44728), Ts_Rank(adv60,20.6966), 8.01266), 6.65053), 2.61957))
+    def alpha088(self):
+        adv60 = sma(self.volume, 60)
+        p1 = rank(decay_linear((rank(self.open) + rank(self.low)) - (rank(self.high) + rank(self.close)), 8))
+        p2 = ts_rank(decay_linear(correlation(ts_rank(self.close, 8), ts_rank(adv60, 21), 8), 7), 3)
+        return np.minimum(p1, p2)
+
+    # Alpha#89	 (Ts_Rank(decay_linear(correlation(((low * 0.967285) + (low * (1 - 0.967285))), adv10,6.94279), 5.51607), 3.79744) - Ts_Rank(decay_linear(delta(IndNeutralize(vwap,IndClass.industry), 3.48158), 10.1466), 15.3012))
+    def alpha089(self):
+        adv10 = sma(self.volume, 10)
+        p1 = ts_rank(decay_linear(correlation(self.low * 0.967285 + self.low * (1 - 0.967285), adv10, 7), 6), 4)
+        p2 = ts_rank(decay_linear(delta(ind_neutralize(self.vwap, self.industry), 3), 10), 15)
+        return p1 - p2
+
+    # Alpha#90	 ((rank((close - ts_max(close, 4.66719)))^Ts_Rank(correlation(IndNeutralize(adv40,IndClass.subindustry), low, 5.38375), 3.21856)) * -1)
+    def alpha090(self):
+        adv40 = sma(self.volume, 40)
+        p2 = ts_rank(correlation(ind_neutralize(adv40, self.subindustry), self.low, 5), 3)
+        return (rank(self.close - ts_max(self.close, 5)) ** p2) * -1
+
+    # Alpha#91	 ((Ts_Rank(decay_linear(decay_linear(correlation(IndNeutralize(close,IndClass.industry), volume, 9.74928), 16.398), 3.83219), 4.8667) -rank(decay_linear(correlation(vwap, adv30, 4.01303), 2.6809))) * -1)
+    def alpha091(self):
+        adv30 = sma(self.volume, 30)
+        inner = correlation(ind_neutralize(self.close, self.industry), self.volume, 10)
+        p1 = ts_rank(decay_linear(decay_linear(inner, 16), 4), 5)
+        p2 = rank(decay_linear(correlation(self.vwap, adv30, 4), 3))
+        return (p1 - p2) * -1
+
+    # Alpha#92	 min(Ts_Rank(decay_linear(((((high + low) / 2) + close) < (low + open)), 14.7221),18.8683), Ts_Rank(decay_linear(correlation(rank(low), rank(adv30), 7.58555), 6.94024),6.80584))
+    def alpha092(self):
+        adv30 = sma(self.volume, 30)
+        inner = ((((self.high + self.low) / 2) + self.close) < (self.low + self.open)).astype(np.float64)
+        p1 = ts_rank(decay_linear(inner, 15), 19)
+        p2 = ts_rank(decay_linear(correlation(rank(self.low), rank(adv30), 8), 7), 7)
+        return np.minimum(p1, p2)
+
+    # Alpha#93	 (Ts_Rank(decay_linear(correlation(IndNeutralize(vwap, IndClass.industry), adv81,17.4193), 19.848), 7.54455) / rank(decay_linear(delta(((close * 0.524434) + (vwap * (1 -0.524434))), 2.77377), 16.2664)))
+    def alpha093(self):
+        adv81 = sma(self.volume, 81)
+        p1 = ts_rank(decay_linear(correlation(ind_neutralize(self.vwap, self.industry), adv81, 17), 20), 8)
+        p2 = rank(decay_linear(delta(self.close * 0.524434 + self.vwap * (1 - 0.524434), 3), 16))
+        return p1 / p2
+
+    # Alpha#94	 ((rank((vwap - ts_min(vwap, 11.5783)))^Ts_Rank(correlation(Ts_Rank(vwap,19.6462), Ts_Rank(adv60, 4.02992), 18.0926), 2.70756)) * -1)
+    def alpha094(self):
+        adv60 = sma(self.volume, 60)
+        return np.power(rank(self.vwap - ts_min(self.vwap, 12)),
+                        ts_rank(correlation(ts_rank(self.vwap, 20), ts_rank(adv60, 4), 18), 3)) * -1
+
+    # Alpha#95	 (rank((open - ts_min(open, 12.4105))) < Ts_Rank((rank(correlation(sum(((high + low)/ 2), 19.1351), sum(adv40, 19.1351), 12.8742))^5), 11.7584))
+    def alpha095(self):
+        adv40 = sma(self.volume, 40)
+        inner = rank(correlation(sma((self.high + self.low) / 2, 19), sma(adv40, 19), 13)) ** 5
+        return (rank(self.open - ts_min(self.open, 12)) < ts_rank(inner, 12)).astype(np.float64)
+
+    # Alpha#96	 (max(Ts_Rank(decay_linear(correlation(rank(vwap), rank(volume), 3.83878),4.16783), 8.38151), Ts_Rank(decay_linear(Ts_ArgMax(correlation(Ts_Rank(close, 7.45404),Ts_Rank(adv60, 4.13242), 3.65459), 12.6556), 14.0365), 13.4143)) * -1)
+    def alpha096(self):
+        adv60 = sma(self.volume, 60)
+        p1 = ts_rank(decay_linear(correlation(rank(self.vwap), rank(self.volume), 4), 4), 8)
+        p2 = ts_rank(decay_linear(ts_argmax(correlation(ts_rank(self.close, 7), ts_rank(adv60, 4), 4), 13), 14), 13)
+        return -1 * np.maximum(p1, p2)
+
+    # Alpha#97	 ((rank(decay_linear(delta(IndNeutralize(((low * 0.721001) + (vwap * (1 - 0.721001))),IndClass.industry), 3.3705), 20.4523)) - Ts_Rank(decay_linear(Ts_Rank(correlation(Ts_Rank(low,7.87871), Ts_Rank(adv60, 17.255), 4.97547), 18.5925), 15.7152), 6.71659)) * -1)
+    def alpha097(self):
+        adv60 = sma(self.volume, 60)
+        p1 = rank(decay_linear(delta(ind_neutralize(self.low * 0.721001 + self.vwap * (1 - 0.721001), self.industry), 3), 20))
+        p2 = ts_rank(decay_linear(ts_rank(correlation(ts_rank(self.low, 8), ts_rank(adv60, 17), 5), 19), 16), 7)
+        return (p1 - p2) * -1
+
+    # Alpha#98	 (rank(decay_linear(correlation(vwap, sum(adv5, 26.4719), 4.58418), 7.18088)) -rank(decay_linear(Ts_Rank(Ts_ArgMin(correlation(rank(open), rank(adv15), 20.8187), 8.62571),6.95668), 8.07206)))
+    def alpha098(self):
+        adv5 = sma(self.volume, 5)
+        adv15 = sma(self.volume, 15)
+        return (rank(decay_linear(correlation(self.vwap, sma(adv5, 26), 5), 7)) -
+                rank(decay_linear(ts_rank(ts_argmin(correlation(rank(self.open), rank(adv15), 21), 9), 7), 8)))
+
+    # Alpha#99	 ((rank(correlation(sum(((high + low) / 2), 19.8975), sum(adv60, 19.8975), 8.8136)) <rank(correlation(low, volume, 6.28259))) * -1)
+    def alpha099(self):
+        adv60 = sma(self.volume, 60)
+        return ((rank(correlation(ts_sum((self.high + self.low) / 2, 20), ts_sum(adv60, 20), 9)) <
+                 rank(correlation(self.low, self.volume, 6))) * -1.0)
+
+    # Alpha#100	 (0 - (1 * (((1.5 * scale(indneutralize(indneutralize(rank(((((close - low) - (high -close)) / (high - low)) * volume)), IndClass.subindustry), IndClass.subindustry))) -scale(indneutralize((correlation(close, rank(adv20), 5) - rank(ts_argmin(close, 30))),IndClass.subindustry))) * (volume / adv20))))
+    def alpha100(self):
+        adv20 = sma(self.volume, 20)
+        inner = rank(((self.close - self.low) - (self.high - self.close)) / (self.high - self.low) * self.volume)
+        p1 = 1.5 * scale(ind_neutralize(ind_neutralize(inner, self.subindustry), self.subindustry))
+        p2 = scale(ind_neutralize(correlation(self.close, rank(adv20), 5) - rank(ts_argmin(self.close, 30)), self.subindustry))
+        return 0 - (1 * ((p1 - p2) * (self.volume / adv20)))
+
+    # Alpha#101	 ((close - open) / ((high - low) + .001))
+    def alpha101(self):
+        return (self.close - self.open) / ((self.high - self.low) + 0.001)
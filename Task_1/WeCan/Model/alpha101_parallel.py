@@ -0,0 +1,85 @@
+"""
+Process-parallel Alpha101 computation over shared memory.
+
+The INPUTS arrays of a PanelAlphas are copied once into a shared-memory block
+that every worker maps read-only. The alphas are spread over a process pool,
+and each worker writes its result into its own slice of a preallocated shared
+[n_alphas, T, N] output block, so nothing but alpha indices crosses process
+boundaries. Work is split by alpha rather than by ticker because the
+cross-sectional operators (rank, scale) need every ticker of a date.
+"""
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import alpha101_panel
+from alpha101_panel import GROUP_LEVELS, INPUTS, PanelAlphas, known_alphas, select_alphas
+
+# Per-process state set up by _init_worker.
+_worker = {}
+
+
+def _view(shm, shape):
+    return np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _attach(name, shape):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, _view(shm, shape)
+
+
+def _init_worker(inputs_name, outputs_name, shape, alphas, groups):
+    inputs_shm, inputs = _attach(inputs_name, (len(INPUTS),) + shape)
+    outputs_shm, outputs = _attach(outputs_name, (len(alphas),) + shape)
+    # An alpha mutating its inputs would corrupt every other worker's view
+    inputs.flags.writeable = False
+    _worker['shm'] = (inputs_shm, outputs_shm)
+    _worker['stock'] = PanelAlphas.from_inputs(dict(zip(INPUTS, inputs), **groups))
+    _worker['outputs'] = outputs
+    _worker['alphas'] = alphas
+
+
+def _compute(i):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _worker['outputs'][i] = getattr(_worker['stock'], _worker['alphas'][i])()
+    return i
+
+
+def get_alpha(df, alphas=None, n_jobs=None, industries=None):
+    """
+    Process-parallel counterpart of alpha101_panel.get_alpha.
+    :param df: a long-format FinRL DataFrame with date, tic and OHLCV columns.
+    :param alphas: names of the alphas to compute, all of known_alphas(industries) by default.
+    :param n_jobs: number of worker processes, os.cpu_count() by default.
+    :param industries: an industry classification as returned by
+        alpha101_panel.load_industries, needed for the alphas in INDUSTRY_ALPHA_NAMES.
+    :return: df with one column per requested alpha.
+    """
+    alphas = select_alphas(alphas, known_alphas(industries))
+    n_jobs = min(n_jobs or os.cpu_count(), len(alphas))
+    if n_jobs <= 1:
+        return alpha101_panel.get_alpha(df, alphas, industries=industries)
+    stock = PanelAlphas(df, industries)
+    # The Groups are small and go to the workers pickled
+    groups = dict((level, value) for level, value in stock.inputs().items() if level in GROUP_LEVELS)
+    shape = stock.panel.shape
+    nbytes = int(np.prod(shape)) * 8
+    inputs_shm = shared_memory.SharedMemory(create=True, size=max(len(INPUTS) * nbytes, 1))
+    outputs_shm = shared_memory.SharedMemory(create=True, size=max(len(alphas) * nbytes, 1))
+    try:
+        # Views are kept temporary so the blocks can always be closed
+        for i, name in enumerate(INPUTS):
+            _view(inputs_shm, (len(INPUTS),) + shape)[i] = getattr(stock, name)
+        with mp.Pool(n_jobs, _init_worker, (inputs_shm.name, outputs_shm.name, shape, alphas, groups)) as pool:
+            for _ in pool.imap_unordered(_compute, range(len(alphas))):
+                pass
+        for i, name in enumerate(alphas):
+            df[name] = stock.panel.melt(_view(outputs_shm, (len(alphas),) + shape)[i])
+    finally:
+        inputs_shm.close()
+        inputs_shm.unlink()
+        outputs_shm.close()
+        outputs_shm.unlink()
+    return df
@@ -0,0 +1,245 @@
+"""
+Incremental daily evaluation of the compiled Alpha101 formulas.
+
+An AlphaStream keeps, for every node of the compiled DAG, the last rows that
+the roots can still reach through windows and delays: a node read by a
+window-w operator whose own rows are kept S deep keeps S + w - 1 rows. A new day
+runs each operator of alpha101_panel on the last few rows of its arguments and
+keeps the newest row. An update therefore costs time proportional to the window
+sizes, not to the length of the history.
+
+All operators compute a row from its own window only, the same way for any
+history length, with two exceptions:
+- the cumulative sums behind VWAP, which the stream carries;
+- the fill in front of decay_linear. The forward fill is carried per column.
+  The back fill makes rows before a column's first valid value depend on that
+  value, so when it arrives, the decay node and everything downstream of it
+  are recomputed over their kept rows. A decay_linear that reads another one
+  (alpha091) keeps enough of the inner rows to rebuild its own fill from them.
+This makes every emitted row equal, bit for bit, to the last row of
+alpha101_panel.get_alpha run on the history up to that day, since the compiled
+formulas are those of PanelAlphas.
+"""
+import numpy as np
+import pandas as pd
+
+from alpha101_compiler import ALPHA_FORMULAS, apply, compile_alphas, lookback
+from alpha101_panel import GROUP_LEVELS, Groups, PanelAlphas, _fillna, decay_linear, known_alphas, select_alphas
+
+# Raw columns of one day, as update expects them.
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _lookback(op, params, nested=False):
+    # Rows of each argument op reads to produce its newest row. decay_linear
+    # reads one row because it keeps its own forward-filled window, unless it
+    # reads another decay_linear, whose rows rebuild that window.
+    if op == 'decay_linear':
+        return dict(params)['period'] if nested else 1
+    return lookback(op, params)
+
+
+def _nested_decays(program):
+    # The decay_linear nodes that read a decay_linear result: (those reading
+    # it directly, those reading it through other operators). Creation order
+    # is an evaluation order.
+    decayed, direct, indirect = set(), set(), set()
+    for node_id, (op, args, _) in enumerate(program.nodes):
+        below = any(child in decayed for child in args)
+        if op == 'decay_linear' and below:
+            (direct if program.nodes[args[0]][0] == 'decay_linear' else indirect).add(node_id)
+        if op == 'decay_linear' or below:
+            decayed.add(node_id)
+    return direct, indirect
+
+
+class _Window(object):
+    """
+    The last rows of a [T, N] series, kept contiguous.
+    :param size: the number of rows kept.
+    :param n: the number of tickers.
+    """
+    def __init__(self, size, n):
+        self.size = size
+        self.count = 0
+        # Twice the rows, so a push only shifts the buffer once every size days
+        self._rows = np.full((2 * size, n), np.nan)
+        self._end = size
+
+    def push(self, row):
+        if self._end == len(self._rows):
+            self._rows[:self.size - 1] = self._rows[self._end - self.size + 1:]
+            self._end = self.size - 1
+        self._rows[self._end] = row
+        self._end += 1
+        self.count += 1
+
+    def seed(self, values):
+        """Fill the window from the full [T, N] history of the series."""
+        self._rows[:] = np.nan
+        self._end = self.size
+        self.count = len(values)
+        self.overwrite(values)
+
+    def overwrite(self, values):
+        """Replace the kept rows by the matching last rows of values."""
+        kept = self.last(len(values))
+        kept[:] = values[len(values) - len(kept):]
+
+    def last(self, k):
+        """The last k rows, or fewer while the history or the window is shorter."""
+        return self._rows[self._end - min(k, self.count, self.size):self._end]
+
+
+class AlphaStream(object):
+    """
+    Day-by-day evaluation of compiled alphas for a fixed list of tickers.
+    :param tickers: the ticker of each column of the rows given to update.
+    :param alphas: names of the alphas to emit, all of known_alphas(industries) by default.
+    :param industries: an industry classification as returned by
+        alpha101_panel.load_industries, needed for the alphas in INDUSTRY_ALPHA_NAMES.
+    """
+    def __init__(self, tickers, alphas=None, industries=None):
+        self.tickers = list(tickers)
+        self.alphas = select_alphas(alphas, known_alphas(industries))
+        self.program = compile_alphas(dict((name, ALPHA_FORMULAS[name]) for name in self.alphas))
+        self._nested, indirect = _nested_decays(self.program)
+        if indirect:
+            raise ValueError('AlphaStream does not support decay_linear of a decay_linear result '
+                             'through other operators')
+        nodes = self.program.nodes
+        # Constants and classification groups do not change from day to day
+        self._static = {}
+        for node_id in self.program.required(self.alphas):
+            op, _, params = nodes[node_id]
+            if op == 'const':
+                self._static[node_id] = params[0]
+            elif op == 'input' and params[0] in GROUP_LEVELS:
+                self._static[node_id] = Groups(industries[params[0]].reindex(self.tickers))
+        self.order = [node_id for node_id in self.program.required(self.alphas) if node_id not in self._static]
+        size = dict.fromkeys(self.order, 1)
+        for node_id in reversed(self.order):
+            op, args, params = nodes[node_id]
+            for child in args:
+                if child in size:
+                    size[child] = max(size[child], size[node_id] + _lookback(op, params, node_id in self._nested) - 1)
+        n = len(self.tickers)
+        self._windows = dict((node_id, _Window(size[node_id], n)) for node_id in self.order)
+        # decay_linear nodes: forward-filled argument rows and the last non-NaN value of each column
+        self._filled = {}
+        for node_id in self.order:
+            op, _, params = nodes[node_id]
+            if op == 'decay_linear':
+                self._filled[node_id] = (_Window(size[node_id] + dict(params)['period'] - 1, n), np.full(n, np.nan))
+        # State behind returns and the cumulative typical-price VWAP of PanelAlphas
+        self._prev_close = np.full(n, np.nan)
+        self._cum_pv = np.zeros(n)
+        self._cum_v = np.zeros(n)
+        self.days = 0
+
+    @classmethod
+    def from_history(cls, df, alphas=None, industries=None):
+        """
+        Build a stream positioned after the last date of a long-format frame.
+        The node windows are seeded from one full evaluation of the history.
+        :param df: a long-format FinRL DataFrame with date, tic and OHLCV columns.
+        :param alphas: names of the alphas to emit, all of known_alphas(industries) by default.
+        :param industries: an industry classification, as for AlphaStream.
+        :return: an AlphaStream over the tickers of df.
+        """
+        stock = PanelAlphas(df, industries)
+        stream = cls(stock.panel.tickers, alphas, industries)
+        stream.program.evaluate(stock.inputs(), stream.alphas, observe=stream._seed)
+        pivot = stock.panel.pivot
+        high, low, close, volume = pivot(df['high']), pivot(df['low']), pivot(df['close']), pivot(df['volume'])
+        typical_price = (high + low + close) / 3
+        stream._prev_close = close[-1].copy()
+        stream._cum_pv = np.nancumsum(typical_price * volume, axis=0)[-1]
+        stream._cum_v = np.nancumsum(volume, axis=0)[-1]
+        stream.days = stock.panel.shape[0]
+        return stream
+
+    def _seed(self, node_id, value):
+        if node_id not in self._windows:
+            return
+        self._windows[node_id].seed(value)
+        for parent, (filled, last_valid) in self._filled.items():
+            if self.program.nodes[parent][1][0] == node_id:
+                ffilled = pd.DataFrame(value).ffill().to_numpy()
+                filled.seed(ffilled)
+                last_valid[:] = ffilled[-1]
+
+    def _inputs(self, row):
+        # One day of PanelAlphas.__init__, with np.nancumsum carried as running sums
+        raw = dict((name, np.asarray(row[name], dtype=np.float64)) for name in COLUMNS)
+        close = raw['close']
+        volume = raw['volume']
+        typical_price = (raw['high'] + raw['low'] + close) / 3
+        self._cum_pv = self._cum_pv + _fillna(typical_price * volume, 0)
+        self._cum_v = self._cum_v + _fillna(volume, 0)
+        vwap = self._cum_pv / self._cum_v
+        returns = close / self._prev_close - 1
+        self._prev_close = close.copy()
+        return {
+            'open': raw['open'],
+            'high': raw['high'],
+            'low': raw['low'],
+            'close': close,
+            'volume': volume * 100,
+            'returns': returns,
+            'vwap': (vwap * 1000) / (volume * 100 + 1),
+        }
+
+    def _apply(self, op, args, params, k):
+        # op over the last k rows of each argument
+        argv = [self._static[a] if a in self._static else self._windows[a].last(k) for a in args]
+        return np.asarray(apply(op, argv, params))
+
+    def update(self, row):
+        """
+        Append one trading day and emit its alphas.
+        :param row: a mapping of each name in COLUMNS to an [N] array in ticker
+            order, NaN for tickers without a bar that day.
+        :return: a dict mapping each alpha name to an [N] numpy array.
+        """
+        nodes = self.program.nodes
+        dirty = set()
+        with np.errstate(all='ignore'):
+            inputs = self._inputs(row)
+            for node_id in self.order:
+                op, args, params = nodes[node_id]
+                window = self._windows[node_id]
+                if op == 'input':
+                    window.push(inputs[params[0]])
+                    continue
+                if op == 'decay_linear':
+                    filled, last_valid = self._filled[node_id]
+                    period = dict(params)['period']
+                    if args[0] in dirty:
+                        # An inner decay_linear rewrote its kept rows, the fill is rebuilt from them
+                        rows = pd.DataFrame(self._windows[args[0]].last(filled.size)).ffill().to_numpy()
+                        filled.push(rows[-1])
+                        filled.overwrite(rows)
+                        np.copyto(last_valid, rows[-1], where=~np.isnan(rows[-1]))
+                        first_valid = True
+                    else:
+                        x = self._windows[args[0]].last(1)[0]
+                        first_valid = (np.isnan(last_valid) & ~np.isnan(x)).any()
+                        np.copyto(last_valid, x, where=~np.isnan(x))
+                        filled.push(last_valid)
+                    if first_valid:
+                        # The back fill now reaches the earlier rows
+                        dirty.add(node_id)
+                        values = decay_linear(filled.last(filled.size), period)
+                    else:
+                        values = decay_linear(filled.last(period), period)
+                elif any(child in dirty for child in args):
+                    dirty.add(node_id)
+                    values = self._apply(op, args, params, window.size + _lookback(op, params) - 1)
+                else:
+                    values = self._apply(op, args, params, _lookback(op, params))
+                window.push(values[-1])
+                if node_id in dirty:
+                    window.overwrite(values)
+        self.days += 1
+        return dict((name, self._windows[self.program.roots[name]].last(1)[0].copy()) for name in self.alphas)
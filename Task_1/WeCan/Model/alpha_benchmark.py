@@ -0,0 +1,246 @@
+"""
+Per-alpha runtime and memory benchmark on a synthetic OHLCV panel.
+
+The panel is a deterministic random walk shaped like the contest data: 29
+tickers over the business days from Jul 1, 2010 to Oct 24, 2023, with larger
+variants for scaling up. Every alpha method and every operator is timed (best
+of a few runs) and its peak allocation is measured with tracemalloc, for the
+long-format Alphas of Alpha101_code_1 and for PanelAlphas. The report is a
+json file; given the report of an earlier run on the same machine, the
+benchmark exits with status 1 if any entry got slower or larger beyond a
+threshold.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import Alpha101_code_1
+import alpha101_panel
+from alpha101_panel import GROUP_LEVELS, PanelAlphas
+
+# name -> (tickers, first date, last date) of the synthetic panels.
+VARIANTS = {
+    'contest': (29, '2010-07-01', '2023-10-24'),
+    'wide': (290, '2010-07-01', '2023-10-24'),
+    'long': (29, '1970-01-01', '2023-10-24'),
+}
+
+ENGINES = ('pandas', 'panel')
+
+# Operator name -> arguments after the input series; binary operators take close and volume.
+OPERATORS = (
+    ('ts_sum', (10,)), ('sma', (10,)), ('stddev', (20,)), ('correlation', (10,)), ('covariance', (10,)),
+    ('ts_rank', (10,)), ('product', (10,)), ('ts_min', (10,)), ('ts_max', (10,)), ('ts_argmax', (10,)),
+    ('ts_argmin', (10,)), ('delta', (1,)), ('delay', (1,)), ('rank', ()), ('scale', ()),
+    ('decay_linear', (10,)),
+)
+BINARY_OPERATORS = ('correlation', 'covariance')
+
+
+def synthetic_panel(n_tickers=29, start='2010-07-01', end='2023-10-24', seed=0):
+    """
+    Deterministic long-format OHLCV frame shaped like the contest data.
+    :param n_tickers: the number of tickers.
+    :param start: the first date.
+    :param end: the last date.
+    :param seed: the random seed.
+    :return: a DataFrame with date, tic and OHLCV columns, sorted by date then tic.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end).strftime('%Y-%m-%d')
+    tickers = ['S%03d' % i for i in range(n_tickers)]
+    shape = (len(dates), n_tickers)
+    close = rng.uniform(20, 200, n_tickers) * np.exp(np.cumsum(rng.normal(0, 0.015, shape), axis=0))
+    open_ = close * np.exp(rng.normal(0, 0.008, shape))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.008, shape)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.008, shape)))
+    volume = rng.lognormal(15, 0.6, shape).round()
+    return pd.DataFrame({'date': np.repeat(dates, n_tickers), 'tic': np.tile(tickers, len(dates)),
+                         'open': open_.ravel(), 'high': high.ravel(), 'low': low.ravel(),
+                         'close': close.ravel(), 'volume': volume.ravel()})
+
+
+def synthetic_industries(tickers):
+    """
+    Nested classification of the tickers, as alpha101_panel.load_industries returns.
+    :param tickers: the ticker names.
+    :return: a DataFrame indexed by ticker with the GROUP_LEVELS columns.
+    """
+    codes = np.arange(len(tickers))
+    industries = pd.DataFrame({'sector': codes % 11, 'industry': codes % 22, 'subindustry': codes % 44},
+                              index=pd.Index(tickers, name='tic'))
+    return industries.astype(str)[list(GROUP_LEVELS)]
+
+
+def measure(setup, run, repeat=5):
+    """
+    :param setup: a callable returning the argument of run, left out of the measurement.
+    :param run: the callable to measure.
+    :param repeat: the number of timed runs.
+    :return: a dict with the best wall time in 'seconds' and the peak bytes
+        allocated by one run, traced separately, in 'peak_bytes'. If run
+        raises, both are None and 'error' holds the exception.
+    """
+    seconds = []
+    try:
+        for _ in range(repeat):
+            argument = setup()
+            started = time.perf_counter()
+            run(argument)
+            seconds.append(time.perf_counter() - started)
+        argument = setup()
+        tracemalloc.start()
+        try:
+            run(argument)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        return {'seconds': None, 'peak_bytes': None, 'error': '%s: %s' % (type(e).__name__, e)}
+    return {'seconds': min(seconds), 'peak_bytes': peak}
+
+
+def reference_seconds(repeat=5):
+    """
+    :return: the best time of a fixed NumPy workload, the unit that times of
+        different runs are compared in, so that a uniformly slower machine is
+        not taken for a regression.
+    """
+    x = np.random.default_rng(0).normal(size=(1000, 1000))
+    return measure(lambda: x, lambda x: np.sort(np.cumsum(x, axis=0), axis=1), repeat)['seconds']
+
+
+def benchmark(df, engine, repeat=5, industries=None, names=None):
+    """
+    Measure every alpha and operator of one engine.
+    :param df: a long-format frame with date, tic and OHLCV columns, as synthetic_panel returns.
+    :param engine: 'pandas' for Alpha101_code_1.Alphas or 'panel' for PanelAlphas.
+    :param repeat: the number of timed runs of each entry.
+    :param industries: a classification for the industry alphas of the panel engine.
+    :param names: the alpha and operator names to measure, all by default.
+    :return: a list of dicts with engine, kind ('alpha' or 'operator'), name, seconds and peak_bytes.
+    """
+    if engine == 'pandas':
+        module = Alpha101_code_1
+        alphas = alpha101_panel.ALPHA_NAMES
+        # Alphas writes into its frame and some methods into its input series, so each run gets its own
+        setup = lambda: Alpha101_code_1.Alphas(df.copy())
+        close, volume = df['close'], df['volume']
+    else:
+        module = alpha101_panel
+        alphas = alpha101_panel.known_alphas(industries)
+        stock = PanelAlphas(df, industries)
+        setup = lambda: stock
+        close, volume = stock.close, stock.volume
+    entries = [('alpha', name, setup, lambda s, name=name: getattr(s, name)()) for name in alphas]
+    for name, params in OPERATORS:
+        inputs = (close, volume) if name in BINARY_OPERATORS else (close,)
+        entries.append(('operator', name, lambda inputs=inputs: inputs,
+                        lambda x, f=getattr(module, name), params=params: f(*(x + params))))
+    if engine == 'panel' and industries is not None:
+        entries.append(('operator', 'ind_neutralize', lambda: close,
+                        lambda x: alpha101_panel.ind_neutralize(x, stock.industry)))
+    results = []
+    with np.errstate(all='ignore'):
+        for kind, name, setup, run in entries:
+            if names is None or name in names:
+                results.append(dict(engine=engine, kind=kind, name=name, **measure(setup, run, repeat)))
+    return results
+
+
+def regressions(report, baseline, threshold=0.25, memory_threshold=0.1, min_seconds=0.005):
+    """
+    Entries of a report that got slower or larger than in a baseline report.
+    :param report: a report as the benchmark writes it.
+    :param baseline: an earlier report of the same variant on the same machine.
+    :param threshold: the largest relative increase of the time tolerated,
+        times being taken relative to the reference_seconds of their report.
+    :param memory_threshold: the largest relative increase of the peak memory tolerated.
+    :param min_seconds: increases of the time below this are taken as noise.
+    :return: a list of dicts with engine, name, metric, baseline (times scaled
+        to the reference of the report) and current, one per regression. An
+        entry that fails but did not before is a regression of the metric 'error'.
+    """
+    before = dict(((r['engine'], r['name']), r) for r in baseline['results'])
+    # Baseline times in the unit of the report
+    speed = report['reference_seconds'] / baseline['reference_seconds']
+    found = []
+    for r in report['results']:
+        old = before.get((r['engine'], r['name']))
+        if old is None or old['seconds'] is None:
+            continue
+        if r['seconds'] is None:
+            found.append(dict(engine=r['engine'], name=r['name'], metric='error',
+                              baseline=None, current=r['error']))
+            continue
+        expected = old['seconds'] * speed
+        if r['seconds'] > expected * (1 + threshold) and r['seconds'] - expected > min_seconds:
+            found.append(dict(engine=r['engine'], name=r['name'], metric='seconds',
+                              baseline=expected, current=r['seconds']))
+        if r['peak_bytes'] > old['peak_bytes'] * (1 + memory_threshold):
+            found.append(dict(engine=r['engine'], name=r['name'], metric='peak_bytes',
+                              baseline=old['peak_bytes'], current=r['peak_bytes']))
+    return found
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the Alpha101 methods and operators')
+    parser.add_argument('--variant', default='contest', choices=sorted(VARIANTS), help='synthetic panel size')
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=ENGINES, help='engines to measure')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per entry, the best is kept')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the synthetic panel')
+    parser.add_argument('--output', default='alpha_benchmark.json', help='where to write the report')
+    parser.add_argument('--baseline', default=None, help='earlier report to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='largest relative slowdown tolerated')
+    parser.add_argument('--memory_threshold', type=float, default=0.1, help='largest relative memory growth tolerated')
+    args = parser.parse_args()
+
+    n_tickers, start, end = VARIANTS[args.variant]
+    df = synthetic_panel(n_tickers, start, end, args.seed)
+    industries = synthetic_industries(df['tic'].unique())
+    results = []
+    reference = reference_seconds(args.repeat)
+    for engine in args.engines:
+        results += benchmark(df, engine, args.repeat, industries if engine == 'panel' else None)
+    report = {
+        'variant': args.variant, 'tickers': n_tickers, 'dates': int(df['date'].nunique()), 'seed': args.seed,
+        'repeat': args.repeat, 'python': platform.python_version(), 'numpy': np.__version__,
+        'pandas': pd.__version__, 'machine': platform.machine(),
+        'reference_seconds': min(reference, reference_seconds(args.repeat)), 'results': results,
+    }
+    table = pd.DataFrame(results).sort_values('seconds', ascending=False, na_position='first')
+    print(table.to_string(index=False, float_format='%.4f'))
+
+    found = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['variant'], baseline['seed']) != (args.variant, args.seed):
+            parser.error('%s is a report of another panel' % args.baseline)
+        found = regressions(report, baseline, args.threshold, args.memory_threshold)
+        # A slowdown may be noise of the machine: the slow entries are measured
+        # again, more times, and only those still slow are reported
+        for engine in args.engines:
+            slow = set(r['name'] for r in found if r['engine'] == engine and r['metric'] == 'seconds')
+            if slow:
+                again = benchmark(df, engine, 3 * args.repeat, industries if engine == 'panel' else None, slow)
+                best = dict((r['name'], r['seconds']) for r in again)
+                for r in results:
+                    if r['engine'] == engine and r['name'] in slow:
+                        r['seconds'] = min(r['seconds'], best[r['name']])
+        if found:
+            found = regressions(report, baseline, args.threshold, args.memory_threshold)
+        report['baseline'] = args.baseline
+        report['regressions'] = found
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print('%d entries written to %s' % (len(results), args.output))
+    for r in found:
+        print('regression: %s %s %s %s -> %s' % (r['engine'], r['name'], r['metric'], r['baseline'], r['current']))
+    sys.exit(1 if found else 0)
@@ -0,0 +1,177 @@
+"""
+Information-coefficient screening of the Alpha101 columns.
+
+Every extra column in tech_indicator_list adds N entries to the PPO state, so
+only alphas that carry signal and are not near copies of each other are worth
+observing. For each date the alphas and the forward returns are ranked across
+tickers, and the rank-IC (the cross-sectional Spearman correlation) of every
+alpha with every horizon comes out of one batched matrix product over the
+[T, N] panels. The inter-alpha rank correlations come from the same product,
+averaged over blocks of dates so the [T, F, F] array is never built.
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+import alpha101_panel
+from alpha101_panel import Panel, _missing_as_nan, rank
+
+# Forward-return horizons in trading days.
+HORIZONS = (1, 5, 10, 20)
+
+
+def forward_returns(close, horizons=HORIZONS):
+    """
+    :param close: a [T, N] numpy array of close prices.
+    :param horizons: the horizons in trading days.
+    :return: a [H, T, N] numpy array with close[t + h] / close[t] - 1, NaN past the last date.
+    """
+    out = np.full((len(horizons),) + close.shape, np.nan)
+    for i, h in enumerate(horizons):
+        if h < len(close):
+            out[i, :len(close) - h] = close[h:] / close[:len(close) - h] - 1
+    return out
+
+
+def _nanmean(x):
+    # Mean over the dates (axis 0), without nanmean's warning for all-NaN entries
+    valid = np.isfinite(x)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, x, 0).sum(axis=0) / valid.sum(axis=0)
+
+
+def _moments(a, b):
+    # Sums over the tickers of each date for every pair of an [F, T, N] and a
+    # [G, T, N] stack, over the entries valid in both, as [T, F, G] arrays
+    valid_a = np.isfinite(a)
+    valid_b = np.isfinite(b)
+    a = np.where(valid_a, a, 0).transpose(1, 0, 2)
+    b = np.where(valid_b, b, 0).transpose(1, 2, 0)
+    ma = valid_a.transpose(1, 0, 2).astype(np.float64)
+    mb = valid_b.transpose(1, 2, 0).astype(np.float64)
+    return (ma @ mb, a @ mb, ma @ b, (a * a) @ mb, ma @ (b * b), a @ b)
+
+
+def cross_correlations(a, b, tolerance=1e-9):
+    """
+    Cross-sectional correlation of every pair of series, date by date.
+    :param a: an [F, T, N] numpy array of ranks.
+    :param b: a [G, T, N] numpy array of ranks.
+    :param tolerance: sums of squared deviations up to this are taken as a
+        constant cross-section. Ranks lie in [0, 1], so anything that small is
+        rounding error from the one-pass sums.
+    :return: a [T, F, G] numpy array, NaN where fewer than 3 tickers are valid
+        in both or either side is constant.
+    """
+    n, sa, sb, saa, sbb, sab = _moments(a, b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_a = saa - sa * sa / n
+        var_b = sbb - sb * sb / n
+        corr = (sab - sa * sb / n) / np.sqrt(var_a * var_b)
+    return np.where((n >= 3) & (var_a > tolerance) & (var_b > tolerance), corr, np.nan)
+
+
+def mean_cross_correlation(a, b, chunk_days=128, tolerance=1e-9):
+    """
+    Mean over the dates of cross_correlations(a, b), accumulated one block of
+    dates at a time, so only [chunk_days, F, G] arrays are held, never [T, F, G].
+    :param a: an [F, T, N] numpy array of ranks.
+    :param b: a [G, T, N] numpy array of ranks.
+    :param chunk_days: dates per block.
+    :param tolerance: as for cross_correlations.
+    :return: an [F, G] numpy array, NaN for pairs without a correlation on any date.
+    """
+    total = np.zeros((len(a), len(b)))
+    count = np.zeros((len(a), len(b)))
+    for start in range(0, a.shape[1], chunk_days):
+        block = slice(start, start + chunk_days)
+        corr = cross_correlations(a[:, block], b[:, block], tolerance)
+        valid = np.isfinite(corr)
+        total += np.where(valid, corr, 0).sum(axis=0)
+        count += valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return total / count
+
+
+def rank_ic(df, alphas, horizons=HORIZONS):
+    """
+    Daily rank-IC of alpha columns against forward returns.
+    :param df: a long-format frame with date, tic, close and the alpha columns, as get_alpha returns.
+    :param alphas: the alpha column names.
+    :param horizons: the forward-return horizons in trading days.
+    :return: a tuple (ic, ranks): the [T, F, H] rank-ICs and the [F, T, N] alpha ranks.
+    """
+    panel = Panel(df)
+    ranks = np.stack([rank(_missing_as_nan(panel.pivot(df[name]))) for name in alphas])
+    returns = forward_returns(panel.pivot(df['close']), horizons)
+    return cross_correlations(ranks, np.stack([rank(r) for r in returns])), ranks
+
+
+def ic_decay(ic, alphas, horizons=HORIZONS):
+    """
+    :param ic: a [T, F, H] numpy array from rank_ic.
+    :return: a DataFrame indexed by alpha with the mean rank-IC ('ic', h) and
+        its mean over standard deviation ('icir', h) at each horizon h.
+    """
+    mean = _nanmean(ic)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        icir = mean / np.sqrt(_nanmean((ic - mean) ** 2))
+    columns = pd.MultiIndex.from_product([['ic', 'icir'], list(horizons)])
+    return pd.DataFrame(np.hstack([mean, icir]), index=list(alphas), columns=columns)
+
+
+def screen_alphas(df, alphas=None, horizon=HORIZONS[0], horizons=HORIZONS, min_ic=0.02, max_correlation=0.7,
+                  max_count=None):
+    """
+    Choose the alpha columns worth observing.
+    Alphas are taken by decreasing |mean rank-IC| at the horizon, skipping any
+    whose mean cross-sectional rank correlation with an alpha already taken
+    exceeds max_correlation in absolute value.
+    :param df: a long-format frame with date, tic, close and the alpha columns, as get_alpha returns.
+    :param alphas: the candidate alpha columns, by default every column of df
+        named in ALPHA_NAMES or INDUSTRY_ALPHA_NAMES.
+    :param horizon: the horizon the alphas are ranked on, one of horizons.
+    :param horizons: the horizons of the IC decay table.
+    :param min_ic: the smallest |mean rank-IC| kept.
+    :param max_correlation: the largest |inter-alpha correlation| tolerated.
+    :param max_count: the largest number of alphas kept, unlimited by default.
+    :return: a tuple (chosen, table): the chosen column names for tech_indicator_list,
+        best first, and the ic_decay table of every candidate.
+    """
+    if alphas is None:
+        names = alpha101_panel.ALPHA_NAMES + alpha101_panel.INDUSTRY_ALPHA_NAMES
+        alphas = [name for name in names if name in df.columns]
+    ic, ranks = rank_ic(df, alphas, horizons)
+    table = ic_decay(ic, alphas, horizons)
+    redundancy = np.abs(mean_cross_correlation(ranks, ranks))
+    strength = table[('ic', horizon)].abs().to_numpy()
+    chosen = []
+    for i in np.argsort(-np.nan_to_num(strength, nan=-1), kind='stable'):
+        if not strength[i] >= min_ic or (max_count is not None and len(chosen) == max_count):
+            break
+        if all(not redundancy[i, j] > max_correlation for j in chosen):
+            chosen.append(i)
+    return [alphas[i] for i in chosen], table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Screen the Alpha101 columns by rank-IC')
+    parser.add_argument('--data_file', required=True, help='long-format csv with date, tic and OHLCV columns')
+    parser.add_argument('--industry_file', default=None, help='ticker classification csv for the industry alphas')
+    parser.add_argument('--horizon', type=int, default=HORIZONS[0], choices=HORIZONS, help='horizon to rank on')
+    parser.add_argument('--min_ic', type=float, default=0.02, help='smallest |mean rank-IC| kept')
+    parser.add_argument('--max_correlation', type=float, default=0.7, help='largest inter-alpha |correlation|')
+    parser.add_argument('--max_count', type=int, default=None, help='largest number of alphas kept')
+    parser.add_argument('--output', default='screened_alphas.json', help='where to write the chosen columns')
+    args = parser.parse_args()
+
+    industries = None if args.industry_file is None else alpha101_panel.load_industries(args.industry_file)
+    data = alpha101_panel.get_alpha(pd.read_csv(args.data_file), industries=industries)
+    chosen, table = screen_alphas(data, horizon=args.horizon, min_ic=args.min_ic,
+                                  max_correlation=args.max_correlation, max_count=args.max_count)
+    print(table.sort_values(('ic', args.horizon), key=np.abs, ascending=False).to_string(float_format='%.4f'))
+    with open(args.output, 'w') as f:
+        json.dump(chosen, f)
+    print('%d alphas written to %s: %s' % (len(chosen), args.output, ', '.join(chosen)))
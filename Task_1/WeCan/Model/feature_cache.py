@@ -0,0 +1,157 @@
+"""
+Content-addressed on-disk cache for FeatureEngineer output and alpha columns.
+
+Every column is stored as its own .npy file, named after a hash of what it was
+computed from: the input rows and the code and configuration of the
+computation. Cached columns are memory-mapped on load and the frames are
+built over the maps without copying them, except for the string columns,
+which become object columns again. A repeated run reads them from the page
+cache, and editing one alpha method only invalidates that alpha's file.
+"""
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import alpha101_panel
+from alpha101_panel import INDUSTRY_ALPHA_NAMES, PanelAlphas, align_panel, known_alphas, select_alphas
+
+# Columns the alphas are computed from.
+OHLCV = ['date', 'tic', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _digest(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update(part if isinstance(part, bytes) else repr(part).encode())
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def frame_digest(df, columns=None):
+    """
+    Hash of the values of a frame, independent of its index.
+    :param df: a pandas DataFrame.
+    :param columns: the columns to hash, all by default.
+    :return: a hex digest string.
+    """
+    df = df if columns is None else df[columns]
+    return _digest(list(df.columns), pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+
+def _operators_source():
+    # Everything an alpha method builds on: the operators and the input panels
+    module = alpha101_panel.__name__
+    functions = [f for _, f in inspect.getmembers(alpha101_panel, inspect.isfunction) if f.__module__ == module]
+    sources = [inspect.getsource(f) for f in functions]
+    definitions = [alpha101_panel.Panel, alpha101_panel.Groups, PanelAlphas.__init__]
+    return ''.join(sources) + ''.join(inspect.getsource(d) for d in definitions)
+
+
+def alpha_definition(name):
+    """
+    :param name: an alpha name from ALPHA_NAMES or INDUSTRY_ALPHA_NAMES.
+    :return: the source of the PanelAlphas method computing it.
+    """
+    return inspect.getsource(getattr(PanelAlphas, name))
+
+
+def observation_frame(df):
+    """
+    The frame the trading environments read their observations from: every
+    ticker on every date, with the missing cells set to 0 by align_panel.
+    train.py and test.py both build their frames with it, so the backtest
+    observes the features the way the agent saw them in training.
+    :param df: a long-format frame with date, tic and feature columns, such as get_alpha returns.
+    :return: a tuple (aligned, missing) as align_panel returns it.
+    """
+    return align_panel(df, fill_value=0)
+
+
+class FeatureCache(object):
+    """
+    Cache of computed feature columns under one directory.
+    :param root: the cache directory, created if missing.
+    """
+    def __init__(self, root='./feature_cache'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key, suffix='.npy'):
+        return os.path.join(self.root, key + suffix)
+
+    def _load(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r', allow_pickle=False)
+
+    def _save(self, key, values):
+        # Written under a temporary name first, so readers never see a partial file
+        path = self._path(key)
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as f:
+            np.save(f, values, allow_pickle=False)
+        os.replace(tmp, path)
+
+    def preprocess(self, fe, data):
+        """
+        Cached fe.preprocess_data(data).
+        :param fe: a FinRL FeatureEngineer.
+        :param data: the raw long-format frame.
+        :return: the processed DataFrame. On a cache hit its numeric columns are
+            read-only memory maps of the cached files.
+        """
+        key = _digest('preprocess', inspect.getsource(type(fe)), sorted(vars(fe).items()), frame_digest(data))
+        manifest = self._path(key, '.json')
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                dtypes = json.load(f)
+            columns = dict((name, self._load(_digest(key, name))) for name in dtypes)
+            processed = pd.DataFrame(columns, index=self._load(_digest(key, '__index__')), copy=False)
+            return processed.astype(dict((name, dtype) for name, dtype in dtypes.items() if dtype == 'object'))
+        processed = fe.preprocess_data(data)
+        for name in processed.columns:
+            values = processed[name].to_numpy()
+            self._save(_digest(key, name), values.astype(str) if values.dtype == object else values)
+        self._save(_digest(key, '__index__'), processed.index.to_numpy())
+        # The manifest goes last: its presence marks a complete entry
+        tmp = '%s.%d.tmp' % (manifest, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(dict((name, str(dtype)) for name, dtype in processed.dtypes.items()), f)
+        os.replace(tmp, manifest)
+        return processed
+
+    def get_alpha(self, df, alphas=None, industries=None):
+        """
+        Cached alpha101_panel.get_alpha: only alphas whose inputs or definition
+        changed since they were cached are computed.
+        :param df: a long-format FinRL DataFrame with date, tic and OHLCV columns.
+        :param alphas: names of the alphas to add, all of known_alphas(industries) by default.
+        :param industries: an industry classification as returned by
+            alpha101_panel.load_industries, needed for the alphas in INDUSTRY_ALPHA_NAMES.
+        :return: a new DataFrame, the columns of df and one column per requested
+            alpha; df itself is left unchanged.
+        """
+        alphas = select_alphas(alphas, known_alphas(industries))
+        if not alphas:
+            return df.copy()
+        data = frame_digest(df, OHLCV)
+        operators = _operators_source()
+        # Only the industry alphas depend on the classification
+        classification = None if industries is None else frame_digest(industries.reset_index())
+        keys = dict((name, _digest('alpha', data, operators, alpha_definition(name),
+                                   classification if name in INDUSTRY_ALPHA_NAMES else None)) for name in alphas)
+        columns = dict((name, self._load(keys[name])) for name in alphas)
+        missing = [name for name in alphas if columns[name] is None]
+        if missing:
+            computed = alpha101_panel.get_alpha(df[OHLCV].copy(), missing, industries=industries)
+            for name in missing:
+                columns[name] = computed[name].to_numpy()
+                self._save(keys[name], columns[name])
+        # The alpha columns are the cached maps themselves, not copies of them
+        matrix = pd.DataFrame(dict((name, columns[name]) for name in alphas), index=df.index, copy=False)
+        return pd.concat([df.drop(columns=[name for name in alphas if name in df.columns]), matrix], axis=1)
@@ -1,17 +1,23 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import argparse
+import json
+import os
+import sys
 
-from finrl.meta.preprocessor.preprocessors import data_split,FeatureEngineer
-from Alpha101_code_1 import get_alpha
+from finrl.meta.preprocessor.preprocessors import FeatureEngineer
+from alpha101_panel import ALPHA_NAMES
+from feature_cache import FeatureCache, observation_frame
 from finrl.config import INDICATORS
-from finrl.meta.env_stock_trading.env_stocktrading import StockTradingEnv
 from finrl.agents.stablebaselines3.models import DRLAgent
 from stable_baselines3 import PPO
 from finrl.main import check_and_make_directories
 from finrl.config import INDICATORS, TRAINED_MODEL_DIR
 from finrl.config import INDICATORS
 from finrl.plot import backtest_stats
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import DatePanel, load_data
+from array_trading_env import ArrayStockTradingEnv
 
 # Contestants are welcome to split the data in their own way for model tuning
 TRADE_START_DATE = '2020-07-01'
@@ -36,35 +42,46 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Description of program')
     parser.add_argument('--start_date', default=TRADE_START_DATE, help='Trade start date (default: {})'.format(TRADE_START_DATE))
     parser.add_argument('--end_date', default=TRADE_END_DATE, help='Trade end date (default: {})'.format(TRADE_END_DATE))
-    parser.add_argument('--data_file', default=FILE_PATH, help='Trade data file')
+    parser.add_argument('--data_file', default=FILE_PATH, help='Trade data file, a csv or a columnar_data store')
     parser.add_argument('--model_path', default='/2023-11-10 00:43:24.379253/trained_ppo_alpha', help='Trade data file')
 
     args = parser.parse_args()
     TRADE_START_DATE = args.start_date
     TRADE_END_DATE = args.end_date
+    # The columns the model was trained on, written next to it by train.py
+    tech_indicators = INDICATORS_processed
+    columns_file = os.path.join(os.path.dirname(TRAINED_MODEL_DIR + args.model_path), 'tech_indicator_list.json')
+    if os.path.exists(columns_file):
+        with open(columns_file) as f:
+            tech_indicators = json.load(f)
+    # Only the alpha columns the environment observes are computed
+    alphas = [name for name in tech_indicators if name in ALPHA_NAMES]
     
-    data = pd.read_csv(args.data_file)
+    # The whole history is read: the indicators and alphas look back before the trade dates
+    data = load_data(args.data_file)
     fe = FeatureEngineer(use_technical_indicator=True,
                 tech_indicator_list = INDICATORS,
                 use_vix=False,
                 use_turbulence=True,
                 user_defined_feature = False)
-    processed = fe.preprocess_data(data)
-    alpha = get_alpha(processed)
+    # Features are reused from ./feature_cache when the data and definitions are unchanged
+    cache = FeatureCache()
+    processed = cache.preprocess(fe, data)
+    alpha = cache.get_alpha(processed, alphas=alphas)
     print(alpha.head)
     # list_ticker = processed["tic"].unique().tolist()
     # list_date = list(pd.date_range(processed['date'].min(),processed['date'].max()).astype(str))
     # combination = list(itertools.product(list_date,list_ticker))
     # processed_full = pd.DataFrame(combination,columns=["date","tic"]).merge(processed,on=["date","tic"],how="left")
-    processed_full = alpha
-    processed_full = processed_full[processed_full['date'].isin(processed['date'])]
-    processed_full = processed_full.sort_values(['date','tic'])
     # processed_full = processed_full.fillna(0)
     # import ipdb; ipdb.set_trace()
-    trade = data_split(processed_full, TRADE_START_DATE, TRADE_END_DATE)
+    # Filled like the training frame, every ticker on every date with missing cells set to 0
+    processed_full, _ = observation_frame(alpha)
+    # A view of the panel sorted by date and tic, indexed by day like data_split returns
+    trade = DatePanel(processed_full).split(TRADE_START_DATE, TRADE_END_DATE)
     
     stock_dimension = len(trade.tic.unique())
-    state_space = 1 + 2*stock_dimension + len(INDICATORS_processed)*stock_dimension
+    state_space = 1 + 2*stock_dimension + len(tech_indicators)*stock_dimension
     print(f"Stock Dimension: {stock_dimension}, State Space: {state_space}")
 
     buy_cost_list = sell_cost_list = [0.001] * stock_dimension
@@ -79,7 +96,7 @@ if __name__ == '__main__':
         "sell_cost_pct": sell_cost_list,
         "state_space": state_space,
         "stock_dim": stock_dimension,
-        "tech_indicator_list": INDICATORS_processed,
+        "tech_indicator_list": tech_indicators,
         "action_space": stock_dimension,
         "reward_scaling": 1e-4
     }
@@ -87,7 +104,7 @@ if __name__ == '__main__':
     check_and_make_directories([TRAINED_MODEL_DIR])
 
     # Environment
-    e_trade_gym = StockTradingEnv(df = trade, **env_kwargs)
+    e_trade_gym = ArrayStockTradingEnv(df = trade, **env_kwargs)
     
     # PPO agent
     agent = DRLAgent(env = e_trade_gym)
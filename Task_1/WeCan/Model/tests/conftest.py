@@ -0,0 +1,41 @@
+"""
+Shared fixtures: a small synthetic panel with a flat stretch, a gap and a
+late listing, and the PanelAlphas values of every alpha on it, which the
+other engines are checked against.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The engines are modules of the Model directory, imported as the scripts import them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from alpha_benchmark import synthetic_industries, synthetic_panel
+from alpha101_panel import PanelAlphas, known_alphas
+
+
+@pytest.fixture(scope='session')
+def frame():
+    df = synthetic_panel(12, '2014-01-01', '2016-12-31', seed=3)
+    # Constant prices give zero-variance windows, missing rows give NaN cells
+    df.loc[(df['tic'] == 'S001') & (df['date'] < '2014-03-01'), ['open', 'high', 'low', 'close']] = 50.0
+    gap = (df['tic'] == 'S002') & (df['date'] > '2015-05-01') & (df['date'] < '2015-05-20')
+    # A ticker listed after the first date
+    unlisted = (df['tic'] == 'S011') & (df['date'] < '2014-04-01')
+    return df[~(gap | unlisted)].reset_index(drop=True)
+
+
+@pytest.fixture(scope='session')
+def industries(frame):
+    return synthetic_industries(sorted(frame['tic'].unique()))
+
+
+@pytest.fixture(scope='session')
+def panel_alphas(frame, industries):
+    """
+    :return: a dict mapping every alpha name to its PanelAlphas [T, N] array.
+    """
+    with np.errstate(all='ignore'):
+        stock = PanelAlphas(frame, industries)
+        return dict((name, np.asarray(getattr(stock, name)(), dtype=np.float64)) for name in known_alphas(industries))
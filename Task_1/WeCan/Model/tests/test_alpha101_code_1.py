@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Alpha101_code_1 import Alphas, correlation, covariance
+
+
+def _series(seed, n=60):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.normal(100, 5, n), index=pd.RangeIndex(n))
+
+
+def test_correlation_matches_pandas_rolling_corr():
+    x, y = _series(0), _series(1)
+    # Flat stretches longer than the window in each input
+    x[10:25] = 100.0
+    y[35:50] = 42.0
+    expected = x.rolling(10).corr(y).to_numpy()
+    actual = correlation(x, y, 10).to_numpy()
+    defined = np.isfinite(expected)
+    np.testing.assert_allclose(actual[defined], expected[defined], rtol=1e-9)
+    # pandas gives +-inf on some zero-variance windows, from rounding noise; correlation gives NaN
+    assert np.isinf(expected).any()
+    assert np.isnan(actual[~defined]).all()
+
+
+def test_correlation_zero_variance_windows():
+    x, y = _series(0), _series(1)
+    x[10:25] = 100.0
+    flat = np.zeros(len(x), dtype=bool)
+    flat[19:25] = True
+    actual = correlation(x, y, 10)
+    # NaN, not +-inf, where x is constant over the window
+    assert np.isnan(actual[flat]).all()
+    assert np.isfinite(actual[9:][~flat[9:]]).all()
+    np.testing.assert_array_equal(correlation(x, y, 10, zero_variance=0)[flat], 0)
+
+
+def test_alpha040_zero_variance_windows():
+    n = 60
+    df = pd.DataFrame({'open': _series(2, n), 'high': _series(3, n) + 10, 'low': _series(4, n) - 10,
+                       'close': _series(5, n), 'volume': _series(6, n) * 1000})
+    df.loc[20:35, 'high'] = 120.0
+    values = Alphas(df.copy()).alpha040().to_numpy()
+    assert not np.isinf(values).any()
+    assert np.isnan(values[29:36]).all()
+
+
+def test_covariance_matches_pandas_rolling_cov():
+    x, y = _series(7), _series(8)
+    x[20:23] = np.nan
+    np.testing.assert_allclose(covariance(x, y, 10).to_numpy(), x.rolling(10).cov(y).to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_moments_reject_misaligned_indexes():
+    # pandas aligned x and y by label, the kernel pairs rows by position
+    x, y = _series(0), _series(1)
+    shifted = pd.Series(y.to_numpy(), index=y.index + 1)
+    with pytest.raises(ValueError):
+        correlation(x, shifted, 10)
+    with pytest.raises(ValueError):
+        covariance(x, shifted, 10)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+import alpha101_panel
+from alpha101_compiler import ALPHA_FORMULAS, compile_alphas, get_alpha
+from alpha101_panel import ALPHA_NAMES, INDUSTRY_ALPHA_NAMES, PanelAlphas
+
+
+def test_formulas_cover_the_panel_alphas():
+    assert set(ALPHA_FORMULAS) == set(ALPHA_NAMES + INDUSTRY_ALPHA_NAMES)
+
+
+@pytest.fixture(scope='module')
+def compiled(frame, industries):
+    with np.errstate(all='ignore'):
+        stock = PanelAlphas(frame, industries)
+    return compile_alphas().evaluate(stock.inputs())
+
+
+@pytest.mark.parametrize('name', ALPHA_NAMES + INDUSTRY_ALPHA_NAMES)
+def test_compiled_alpha_equals_panel(name, compiled, panel_alphas):
+    np.testing.assert_array_equal(compiled[name], panel_alphas[name])
+
+
+def test_get_alpha_equals_panel_get_alpha(frame):
+    names = ['alpha001', 'alpha027', 'alpha064', 'alpha101']
+    expected = alpha101_panel.get_alpha(frame.copy(), names)
+    np.testing.assert_array_equal(get_alpha(frame.copy(), names)[names].to_numpy(), expected[names].to_numpy())
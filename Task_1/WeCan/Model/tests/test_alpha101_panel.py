@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import rankdata
+
+import Alpha101_code_1
+import alpha101_panel
+from alpha101_panel import Groups, decay_linear, ind_neutralize, product, ts_argmax, ts_argmin, ts_max, ts_min, ts_rank
+
+
+def _panel(seed, shape=(150, 5), ties=False, missing=0.03):
+    # Normal values, rounded to one decimal for ties, with a share of NaN cells
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0, 1, shape)
+    if ties:
+        x = np.round(x, 1)
+    x[rng.random(shape) < missing] = np.nan
+    return x
+
+
+def _root(a):
+    # The array a numpy view was ultimately taken from
+    while a.base is not None:
+        a = a.base
+    return a
+
+
+@pytest.mark.parametrize('window', [1, 2, 5, 10, 200])
+def test_ts_rank_matches_rankdata(window):
+    x = _panel(0, ties=True)
+    # The baseline rolling_rank: the rankdata rank of the last value of each full window
+    expected = pd.DataFrame(x).rolling(window).apply(lambda a: rankdata(a)[-1], raw=True).to_numpy()
+    np.testing.assert_array_equal(ts_rank(x, window), expected)
+    np.testing.assert_array_equal(Alpha101_code_1.ts_rank(pd.DataFrame(x), window).to_numpy(), expected)
+
+
+@pytest.mark.parametrize('window', [1, 3, 10, 149, 150, 200])
+def test_rolling_extremum_matches_pandas(window):
+    x = _panel(1, ties=True)
+    rolling = pd.DataFrame(x).rolling(window)
+    np.testing.assert_array_equal(ts_max(x, window), rolling.max().to_numpy())
+    np.testing.assert_array_equal(ts_min(x, window), rolling.min().to_numpy())
+    # Ties go to the oldest day, as with the baseline np.argmax/np.argmin
+    np.testing.assert_array_equal(ts_argmax(x, window), rolling.apply(np.argmax, raw=True).to_numpy() + 1)
+    np.testing.assert_array_equal(ts_argmin(x, window), rolling.apply(np.argmin, raw=True).to_numpy() + 1)
+    frame = pd.DataFrame(x)
+    np.testing.assert_array_equal(Alpha101_code_1.ts_argmax(frame, window).to_numpy(), ts_argmax(x, window))
+    np.testing.assert_array_equal(Alpha101_code_1.ts_min(frame, window).to_numpy(), ts_min(x, window))
+
+
+def _baseline_decay_linear(x, period):
+    # The baseline loop: fill, then one dot product per row
+    df = pd.DataFrame(x).ffill().bfill().fillna(0)
+    na_lwma = df.to_numpy().copy()
+    na_series = df.to_numpy()
+    divisor = period * (period + 1) / 2
+    y = (np.arange(period) + 1) * 1.0 / divisor
+    for row in range(period - 1, df.shape[0]):
+        na_lwma[row, :] = np.dot(na_series[row - period + 1: row + 1, :].T, y)
+    return na_lwma
+
+
+@pytest.mark.parametrize('period', [1, 2, 10, 150, 200])
+def test_decay_linear_matches_baseline(period):
+    x = _panel(2, missing=0.1)
+    x[:12, 0] = np.nan
+    before = x.copy()
+    np.testing.assert_allclose(decay_linear(x, period), _baseline_decay_linear(x, period), rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(x, before)
+
+
+def test_decay_linear_keeps_labels():
+    frame = pd.DataFrame(_panel(3), index=pd.date_range('2020-01-01', periods=150), columns=list('abcde'))
+    result = Alpha101_code_1.decay_linear(frame, 5)
+    pd.testing.assert_index_equal(result.index, frame.index)
+    pd.testing.assert_index_equal(result.columns, frame.columns)
+    series = Alpha101_code_1.decay_linear(frame['b'], 5)
+    assert isinstance(series, pd.Series) and series.name == 'b'
+    np.testing.assert_array_equal(series.to_numpy(), result['b'].to_numpy())
+
+
+def test_get_alpha_computes_only_requested(frame, panel_alphas):
+    df = frame.copy()
+    result = alpha101_panel.get_alpha(df, ['alpha101', 'alpha012'])
+    assert list(result.columns) == list(frame.columns) + ['alpha101', 'alpha012']
+    panel = alpha101_panel.Panel(frame)
+    for name in ('alpha101', 'alpha012'):
+        np.testing.assert_array_equal(result[name].to_numpy(), panel.melt(panel_alphas[name]))
+    with pytest.raises(KeyError):
+        alpha101_panel.get_alpha(frame.copy(), ['alpha012', 'alpha999'])
+    # The industry alphas need a classification
+    with pytest.raises(KeyError):
+        alpha101_panel.get_alpha(frame.copy(), ['alpha048'])
+
+
+def test_lazy_alphas_compute_on_read(frame, industries, panel_alphas):
+    df = frame.copy()
+    lazy = alpha101_panel.get_alpha(df, ['alpha012', 'alpha048'], lazy=True, industries=industries)
+    assert list(df.columns) == list(frame.columns)
+    assert list(lazy) == ['alpha012', 'alpha048'] and len(lazy) == 2
+    assert not lazy._columns
+    column = lazy['alpha048']
+    assert list(lazy._columns) == ['alpha048'] and lazy['alpha048'] is column
+    pd.testing.assert_index_equal(column.index, frame.index)
+    np.testing.assert_array_equal(column.to_numpy(), lazy.panel.melt(panel_alphas['alpha048']))
+    with pytest.raises(KeyError):
+        lazy['alpha001']
+    out = lazy.to_frame(df)
+    assert list(out.columns) == list(frame.columns) + ['alpha012', 'alpha048']
+
+
+def test_alpha_matrix_matches_get_alpha(frame, industries, panel_alphas):
+    names = ['alpha001', 'alpha012', 'alpha048', 'alpha101']
+    matrix = alpha101_panel.get_alpha_matrix(frame, names, industries=industries)
+    assert list(matrix.columns) == ['date', 'tic'] + names
+    assert 'alpha001' not in frame.columns
+    pd.testing.assert_index_equal(matrix.index, frame.index)
+    panel = alpha101_panel.Panel(frame)
+    values = [matrix[name].to_numpy() for name in names]
+    for name, column in zip(names, values):
+        assert column.dtype == np.float32
+        expected = panel.melt(panel_alphas[name])
+        with np.errstate(over='ignore'):
+            np.testing.assert_array_equal(column, expected.astype(np.float32), err_msg=name)
+    # Every alpha column is a view of the one array
+    assert len(set(id(_root(column)) for column in values)) == 1
+    exact = alpha101_panel.get_alpha_matrix(frame, names, dtype=np.float64, industries=industries)
+    for name in names:
+        np.testing.assert_array_equal(exact[name].to_numpy(), panel.melt(panel_alphas[name]), err_msg=name)
+
+
+@pytest.mark.parametrize('window', [1, 3, 10, 200])
+def test_product_with_zero_and_negative_values(window):
+    x = _panel(4)
+    # Exact zeros and runs of negative factors, odd and even in number
+    x[::7, 0] = 0.0
+    x[30:40, 1] = -np.abs(x[30:40, 1])
+    x[50:52, 2] = 0.0
+    expected = pd.DataFrame(x).rolling(window).apply(np.prod, raw=True).to_numpy()
+    result = product(x, window)
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+    # A zero factor gives exactly 0, and the sign follows the negative factors
+    assert (result[expected == 0] == 0).all()
+    np.testing.assert_array_equal(np.sign(result), np.sign(expected))
+    np.testing.assert_array_equal(Alpha101_code_1.product(pd.DataFrame(x), window).to_numpy(), result)
+
+
+def test_ind_neutralize_matches_groupby_demean():
+    x = _panel(5, shape=(40, 8), missing=0.1)
+    x[3, 2] = np.inf
+    # Interleaved groups, a singleton and two unlabelled tickers, each a group of its own
+    labels = np.array(['b', 'a', 'b', np.nan, 'a', 'c', 'b', np.nan], dtype=object)
+    long = pd.DataFrame(np.where(np.isinf(x), np.nan, x)).stack(future_stack=True).rename('x').reset_index()
+    long['group'] = np.where(pd.isna(labels[long['level_1']]), 'own' + long['level_1'].astype(str),
+                             labels[long['level_1']])
+    means = long.groupby(['level_0', 'group'])['x'].transform('mean')
+    expected = (long['x'] - means).to_numpy().reshape(x.shape)
+    np.testing.assert_allclose(ind_neutralize(x, Groups(labels)), expected, rtol=1e-12, atol=1e-15)
+
+
+def test_align_panel_fills_absent_rows_nan_and_inf():
+    df = pd.DataFrame({
+        'date': ['2020-01-02', '2020-01-02', '2020-01-03', '2020-01-06', '2020-01-06'],
+        'tic': ['A', 'B', 'B', 'A', 'B'],
+        'close': [1.0, np.nan, 3.0, 4.0, np.inf],
+        'alpha': [-np.inf, 2.0, 3.0, 4.0, 5.0],
+        'sector': ['x', None, 'y', 'x', 'y'],
+    })
+    aligned, missing = alpha101_panel.align_panel(df, fill_value=0)
+    # (2020-01-03, A) is absent: every column of that row is filled
+    assert list(aligned['date']) == ['2020-01-02', '2020-01-02', '2020-01-03', '2020-01-03', '2020-01-06', '2020-01-06']
+    assert list(aligned['tic']) == ['A', 'B'] * 3
+    assert list(aligned.columns) == list(df.columns)
+    np.testing.assert_array_equal(aligned['close'].to_numpy(), [1.0, 0.0, 0.0, 3.0, 4.0, 0.0])
+    np.testing.assert_array_equal(aligned['alpha'].to_numpy(), [0.0, 2.0, 0.0, 3.0, 4.0, 5.0])
+    assert list(aligned['sector']) == ['x', 0, 0, 'y', 'x', 'y']
+    assert list(missing['close']) == [False, True, True, False, False, True]
+    assert list(missing['alpha']) == [True, False, True, False, False, False]
+    assert list(missing['sector']) == [False, True, True, False, False, False]
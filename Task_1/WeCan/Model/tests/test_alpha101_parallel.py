@@ -0,0 +1,17 @@
+import numpy as np
+
+import alpha101_parallel
+from alpha101_panel import Panel
+
+
+def test_parallel_alphas_equal_panel(frame, industries, panel_alphas):
+    names = ['alpha001', 'alpha012', 'alpha048', 'alpha101']
+    result = alpha101_parallel.get_alpha(frame.copy(), names, n_jobs=2, industries=industries)
+    panel = Panel(frame)
+    for name in names:
+        np.testing.assert_array_equal(result[name].to_numpy(), panel.melt(panel_alphas[name]), err_msg=name)
+
+
+def test_single_job_runs_in_process(frame, panel_alphas):
+    result = alpha101_parallel.get_alpha(frame.copy(), ['alpha012'], n_jobs=1)
+    np.testing.assert_array_equal(result['alpha012'].to_numpy(), Panel(frame).melt(panel_alphas['alpha012']))
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from alpha101_panel import PanelAlphas, known_alphas
+from alpha101_stream import COLUMNS, AlphaStream
+
+
+def last_rows(df, industries, names):
+    # The panel alphas of the last date of df
+    with np.errstate(all='ignore'):
+        stock = PanelAlphas(df, industries)
+        return dict((name, np.asarray(getattr(stock, name)(), dtype=np.float64)[-1]) for name in names)
+
+
+def days(df, tickers):
+    # One update row per date, NaN for tickers without a bar
+    for _, day in df.groupby('date', sort=True):
+        day = day.set_index('tic').reindex(tickers)
+        yield dict((name, day[name].to_numpy(dtype=np.float64)) for name in COLUMNS)
+
+
+def test_default_alphas_include_nested_decay(industries):
+    stream = AlphaStream(industries.index, industries=industries)
+    assert stream.alphas == known_alphas(industries)
+
+
+@pytest.mark.parametrize('n_history', [400, 700])
+def test_stream_from_history_equals_panel(frame, industries, n_history):
+    dates = np.sort(frame['date'].unique())
+    stream = AlphaStream.from_history(frame[frame['date'] < dates[n_history]], industries=industries)
+    upto = frame[frame['date'] <= dates[n_history + 9]]
+    for row in days(upto[upto['date'] >= dates[n_history]], stream.tickers):
+        out = stream.update(row)
+    expected = last_rows(upto, industries, stream.alphas)
+    for name in stream.alphas:
+        np.testing.assert_array_equal(out[name], expected[name], err_msg=name)
+
+
+def test_stream_from_scratch_equals_panel(frame, industries):
+    # The late listing and the first valid values of every window go through the back fill of decay_linear
+    dates = np.sort(frame['date'].unique())
+    upto = frame[frame['date'] <= dates[80]]
+    stream = AlphaStream(sorted(frame['tic'].unique()), industries=industries)
+    for row in days(upto, stream.tickers):
+        out = stream.update(row)
+    expected = last_rows(upto, industries, stream.alphas)
+    for name in stream.alphas:
+        np.testing.assert_array_equal(out[name], expected[name], err_msg=name)
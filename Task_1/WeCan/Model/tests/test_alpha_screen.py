@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+
+from alpha_screen import _nanmean, cross_correlations, mean_cross_correlation
+
+
+@pytest.mark.parametrize('chunk_days', [1, 37, 128, 5000])
+def test_mean_cross_correlation_equals_full_mean(panel_alphas, chunk_days):
+    names = sorted(panel_alphas)[:20]
+    ranks = np.stack([panel_alphas[name] for name in names])
+    with np.errstate(all='ignore'):
+        expected = _nanmean(cross_correlations(ranks, ranks))
+        actual = mean_cross_correlation(ranks, ranks, chunk_days)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-15)
@@ -0,0 +1,116 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import alpha101_panel
+import feature_cache
+from feature_cache import FeatureCache
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from columnar_data import DatePanel
+
+
+class Engineer(object):
+    # Stands in for FinRL's FeatureEngineer: the key covers its source and its attributes
+    calls = 0
+
+    def __init__(self, factor=2.0):
+        self.factor = factor
+
+    def preprocess_data(self, df):
+        Engineer.calls += 1
+        df = df.copy()
+        df['feature'] = df['close'] * self.factor
+        return df
+
+
+class OtherEngineer(Engineer):
+    def preprocess_data(self, df):
+        df = Engineer.preprocess_data(self, df)
+        df['feature'] += 1
+        return df
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    # The alphas alpha101_panel.get_alpha is asked for, call by call
+    calls = []
+    get_alpha = alpha101_panel.get_alpha
+
+    def record(df, alphas=None, **kwargs):
+        calls.append(list(alphas))
+        return get_alpha(df, alphas, **kwargs)
+    monkeypatch.setattr(alpha101_panel, 'get_alpha', record)
+    return calls
+
+
+def test_preprocess_keys(frame, tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    Engineer.calls = 0
+    first = cache.preprocess(Engineer(), frame)
+    hit = cache.preprocess(Engineer(), frame)
+    assert Engineer.calls == 1
+    np.testing.assert_array_equal(hit['feature'].to_numpy(), first['feature'].to_numpy())
+    assert list(hit['tic']) == list(first['tic'])
+    # A parameter, the class source or the data each make a new entry
+    assert cache.preprocess(Engineer(3.0), frame)['feature'].iloc[0] == frame['close'].iloc[0] * 3.0
+    assert Engineer.calls == 2
+    cache.preprocess(OtherEngineer(), frame)
+    assert Engineer.calls == 3
+    changed = frame.copy()
+    changed.loc[0, 'close'] += 1
+    cache.preprocess(Engineer(), changed)
+    assert Engineer.calls == 4
+
+
+def test_alpha_keys(frame, industries, tmp_path, computed, monkeypatch):
+    cache = FeatureCache(str(tmp_path))
+    names = ['alpha012', 'alpha101', 'alpha048']
+    first = cache.get_alpha(frame, names, industries=industries)
+    assert computed == [names]
+    assert not set(names) & set(frame.columns)
+    # A hit reads every column back, even with other non-OHLCV columns
+    hit = cache.get_alpha(frame.assign(extra=1.0), names, industries=industries)
+    assert len(computed) == 1
+    for name in names:
+        np.testing.assert_array_equal(hit[name].to_numpy(), first[name].to_numpy())
+    # The classification only keys the industry alphas
+    other = industries.copy()
+    other['subindustry'] = 'one'
+    cache.get_alpha(frame, names, industries=other)
+    assert computed[-1] == ['alpha048']
+    # Editing one alpha method invalidates that alpha only
+    definition = feature_cache.alpha_definition
+    monkeypatch.setattr(feature_cache, 'alpha_definition',
+                        lambda name: definition(name) + ('#' if name == 'alpha101' else ''))
+    cache.get_alpha(frame, names, industries=industries)
+    assert computed[-1] == ['alpha101']
+    # Any OHLCV change invalidates everything
+    changed = frame.copy()
+    changed.loc[0, 'volume'] += 1
+    cache.get_alpha(changed, names, industries=industries)
+    assert computed[-1] == names
+
+
+def test_observation_frame(frame):
+    # Mirrors train.py and test.py: alpha columns with NaN cells, split into the train and trade ranges
+    with np.errstate(all='ignore'):
+        alpha = alpha101_panel.get_alpha(frame.copy(), alphas=['alpha001', 'alpha006', 'alpha041'])
+    # A NaN cell, besides the absent rows of the gap and the late listing
+    alpha.loc[5, 'alpha006'] = np.nan
+    assert len(alpha) < frame['date'].nunique() * frame['tic'].nunique()
+    processed_full, missing = feature_cache.observation_frame(alpha)
+    train = processed_full[processed_full['date'] < '2016-01-01']
+    trade = DatePanel(processed_full).split('2016-01-01', '2016-12-31')
+    n_tickers = frame['tic'].nunique()
+    for part in (train, trade):
+        assert list(part.columns) == list(alpha.columns)
+        assert (part.groupby('date')['tic'].count() == n_tickers).all()
+        assert np.isfinite(part[['close', 'alpha001', 'alpha006', 'alpha041']].to_numpy()).all()
+    # The cells that were present keep their values, the others are 0 in both ranges
+    merged = processed_full.merge(alpha, on=['date', 'tic'], how='left', suffixes=('', '_source'))
+    source = merged['alpha006_source'].to_numpy()
+    present = ~np.isnan(source)
+    np.testing.assert_array_equal(merged['alpha006'].to_numpy()[present], source[present])
+    assert (processed_full['alpha006'].to_numpy()[missing['alpha006'].to_numpy()] == 0).all()
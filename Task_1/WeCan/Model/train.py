@@ -1,12 +1,19 @@
-import pandas as pd
-from finrl.meta.env_stock_trading.env_stocktrading import StockTradingEnv
+import argparse
+import json
+import os
+import sys
+
 from finrl.agents.stablebaselines3.models import DRLAgent
 from stable_baselines3.common.logger import configure
 from finrl.main import check_and_make_directories
 from finrl.config import INDICATORS, TRAINED_MODEL_DIR, RESULTS_DIR
 from finrl.meta.preprocessor.preprocessors import FeatureEngineer, data_split
-from Alpha101_code_1 import get_alpha
-import itertools
+from alpha_screen import screen_alphas
+from feature_cache import FeatureCache, observation_frame
+# columnar_data lives in Task_1, shared by the teams' scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from columnar_data import load_data
+from array_trading_env import ArrayStockTradingEnv, shard_ppo_params
 INDICATORS_processed = ['macd_x', 'boll_ub_x', 'boll_lb_x', 'rsi_30_x', 'cci_30_x',
        'dx_30_x', 'close_30_sma_x', 'close_60_sma_x', 'vix', 'turbulence_x',
        'macd_y', 'boll_ub_y', 'boll_lb_y', 'rsi_30_y', 'cci_30_y', 'dx_30_y',
@@ -15,29 +22,33 @@ INDICATORS_processed = ['macd_x', 'boll_ub_x', 'boll_lb_x', 'rsi_30_x', 'cci_30_
 TRAIN_START_DATE = '2010-01-01'
 TRAIN_END_DATE = '2020-06-30'
 
-data = pd.read_csv('/home/qinshentao/code/FinRL-Contest/task-1-stock-trading-starter-kit/train_data.csv')
+# A csv or a columnar_data store
+data = load_data('/home/qinshentao/code/FinRL-Contest/task-1-stock-trading-starter-kit/train_data.csv')
 ## feature
 fe = FeatureEngineer(use_technical_indicator=True,
                 tech_indicator_list = INDICATORS,
                 use_vix=True,
                 use_turbulence=True,
                 user_defined_feature = False)
-processed = fe.preprocess_data(data)
-alpha = get_alpha(processed)
+# Features are reused from ./feature_cache when the data and definitions are unchanged
+cache = FeatureCache()
+processed = cache.preprocess(fe, data)
+alpha = cache.get_alpha(processed)
 print(alpha.head)
-list_ticker = alpha["tic"].unique().tolist()
-list_date = list(pd.date_range(processed['date'].min(),processed['date'].max()).astype(str))
-combination = list(itertools.product(list_date,list_ticker))
-processed_full = pd.DataFrame(combination,columns=["date","tic"]).merge(processed,on=["date","tic"],how="left")
-processed_full = processed_full
-processed_full = processed_full[processed_full['date'].isin(processed['date'])]
-processed_full = processed_full.sort_values(['date','tic'])
-processed_full = processed_full.fillna(0)
+# Only the alphas with signal over the training period are observed, which keeps the state small
+SCREENED_ALPHAS, ic_table = screen_alphas(data_split(alpha, TRAIN_START_DATE, TRAIN_END_DATE))
+print(ic_table)
+TECH_INDICATORS = INDICATORS_processed + SCREENED_ALPHAS
+print(f"Screened alphas: {SCREENED_ALPHAS}")
+# Every ticker gets a row on every trading day, with the missing cells set to 0
+processed_full, missing = observation_frame(alpha)
+filled = missing.sum()
+print(f"Filled {int(filled.sum())} missing cells:\n{filled[filled > 0]}")
 train = data_split(processed_full, TRAIN_START_DATE,TRAIN_END_DATE)
 
 # Environment configs
 stock_dimension = len(train.tic.unique())
-state_space = 1 + 2*stock_dimension + len(INDICATORS_processed)*stock_dimension
+state_space = 1 + 2*stock_dimension + len(TECH_INDICATORS)*stock_dimension
 print(f"Stock Dimension: {stock_dimension}, State Space: {state_space}")
 
 buy_cost_list = sell_cost_list = [0.001] * stock_dimension
@@ -51,7 +62,7 @@ env_kwargs = {
     "sell_cost_pct": sell_cost_list,
     "state_space": state_space,
     "stock_dim": stock_dimension,
-    "tech_indicator_list": INDICATORS_processed,
+    "tech_indicator_list": TECH_INDICATORS,
     "action_space": stock_dimension,
     "reward_scaling": 1e-4
 }
@@ -67,15 +78,20 @@ PPO_PARAMS = {
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the PPO agent')
+    parser.add_argument('--num_envs', type=int, default=1,
+                        help='date shards of the training period whose rollouts are collected together')
+    parser.add_argument('--subprocess', action='store_true', help='step each shard in a worker process')
+    args = parser.parse_args()
     check_and_make_directories([TRAINED_MODEL_DIR])
     # Environment
-    e_train_gym = StockTradingEnv(df = train,turbulence_threshold = 70,**env_kwargs)
-    env_train, _ = e_train_gym.get_sb_env()
+    e_train_gym = ArrayStockTradingEnv(df = train,turbulence_threshold = 70,**env_kwargs)
+    env_train, _ = e_train_gym.get_vec_env(args.num_envs, args.subprocess)
     print(type(env_train))
 
-    # PPO agent
+    # PPO agent, with about the same number of steps per update spread over the shards
     agent = DRLAgent(env = env_train)
-    model_ppo = agent.get_model("ppo",model_kwargs = PPO_PARAMS)
+    model_ppo = agent.get_model("ppo",model_kwargs = shard_ppo_params(PPO_PARAMS, args.num_envs))
     import datetime
 
     # 获取当前时间
@@ -90,3 +106,6 @@ if __name__ == '__main__':
                                 total_timesteps=80000)
     
     trained_ppo.save(TRAINED_MODEL_DIR + f'/{now}' + '/trained_ppo_alpha')
+    # test.py rebuilds the observation from the same columns
+    with open(os.path.join(TRAINED_MODEL_DIR + f'/{now}', 'tech_indicator_list.json'), 'w') as f:
+        json.dump(TECH_INDICATORS, f)
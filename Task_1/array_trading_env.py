@@ -0,0 +1,328 @@
+"""
+Array-backed counterpart of FinRL's StockTradingEnv.
+
+StockTradingEnv looks up the rows of the day with df.loc on every step and
+rebuilds the state as a list. ArrayStockTradingEnv reads the frame once into
+[T, N] close, [T, F, N] feature and [T] turbulence arrays and keeps the state
+in one preallocated float64 vector, so a step is a handful of NumPy operations
+on the rows of the day. The constructor arguments (less the plotting and csv
+dumps), the state layout [balance, close * N, holdings * N, feature 1 * N,
+..., feature F * N], the share arithmetic, the reward and the memories read
+by DRL_prediction and PPO_Switch are those of StockTradingEnv, so either env
+can be passed where the other is expected.
+
+The cash and cost totals are summed in the order StockTradingEnv trades in,
+so they come out bit for bit the same. Two differences: the state is returned
+as the env's own buffer, which the next step overwrites (the stable-baselines3
+vector envs copy it), and no state_memory is kept.
+
+For training, get_vec_env splits the days into date shards, one env each over
+views of the same arrays, stepped together in a DummyVecEnv or in forked
+SubprocVecEnv workers:
+
+    python train.py --num_envs 4 --subprocess
+"""
+import copy
+import math
+import multiprocessing as mp
+
+import gymnasium as gym
+import numpy as np
+import pandas as pd
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+
+def shard_ppo_params(ppo_params, num_envs):
+    """
+    PPO parameters for rollouts collected from num_envs shards at once: n_steps
+    is split over the shards and rounded so that the rollout, n_steps * num_envs,
+    stays a multiple of batch_size, as close to the original n_steps as that
+    allows. Otherwise stable-baselines3 warns and truncates the last minibatch.
+    :param ppo_params: the PPO parameters for one env, with n_steps and batch_size.
+    :param num_envs: the number of shards.
+    :return: a copy of ppo_params with n_steps per shard.
+    """
+    n_steps, batch_size = ppo_params['n_steps'], ppo_params['batch_size']
+    # The steps per shard must be a multiple of step
+    step = batch_size // math.gcd(batch_size, num_envs)
+    return dict(ppo_params, n_steps=max(1, int(round(n_steps / num_envs / step))) * step)
+
+
+class ArrayStockTradingEnv(gym.Env):
+    """
+    A stock trading environment for OpenAI gym over precomputed arrays.
+    :param df: a long-format frame indexed by day number from 0, as data_split
+        or columnar_data.DatePanel.split return, with the same tickers every day.
+    The other parameters are those of finrl's StockTradingEnv.
+    """
+    metadata = {'render.modes': ['human']}
+
+    def __init__(self, df, stock_dim, hmax, initial_amount, num_stock_shares, buy_cost_pct, sell_cost_pct,
+                 reward_scaling, state_space, action_space, tech_indicator_list, turbulence_threshold=None,
+                 risk_indicator_col='turbulence', print_verbosity=10, day=0, initial=True, previous_state=[]):
+        self.df = df
+        self.stock_dim = stock_dim
+        self.hmax = hmax
+        self.num_stock_shares = num_stock_shares
+        self.initial_amount = initial_amount
+        self.buy_cost_pct = np.asarray(buy_cost_pct, dtype=np.float64)
+        self.sell_cost_pct = np.asarray(sell_cost_pct, dtype=np.float64)
+        self.reward_scaling = reward_scaling
+        self.state_space = state_space
+        self.tech_indicator_list = tech_indicator_list
+        self.action_space = spaces.Box(low=-1, high=1, shape=(action_space,))
+        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(state_space,))
+        self.turbulence_threshold = turbulence_threshold
+        self.risk_indicator_col = risk_indicator_col
+        self.print_verbosity = print_verbosity
+        self.initial = initial
+        self.previous_state = previous_state
+
+        day_codes, days = pd.factorize(df.index, sort=True)
+        order = np.argsort(day_codes, kind='stable')
+        shape = (len(days), stock_dim)
+        if len(df) != shape[0] * shape[1]:
+            raise ValueError('every day needs one row per ticker: %d rows for %d days x %d tickers'
+                             % (len(df), shape[0], shape[1]))
+        if state_space != 1 + (2 + len(tech_indicator_list)) * stock_dim:
+            raise ValueError('state_space %d is not 1 + (2 + %d indicators) * %d stocks'
+                             % (state_space, len(tech_indicator_list), stock_dim))
+        column = lambda name: df[name].to_numpy()[order]
+        self.closes = column('close').astype(np.float64).reshape(shape)
+        features = [column(tech).astype(np.float64).reshape(shape) for tech in tech_indicator_list]
+        self.features = np.stack(features, axis=1) if features else np.empty((shape[0], 0, stock_dim))
+        self.dates = column('date').reshape(shape)[:, 0]
+        self.tickers = column('tic')[:stock_dim]
+        self.turbulences = None
+        if turbulence_threshold is not None:
+            self.turbulences = column(risk_indicator_col).astype(np.float64).reshape(shape)[:, 0]
+        self._days = np.asarray(days)
+        self.n_days = shape[0]
+        # StockTradingEnv keeps a single stock's initial holdings at 0
+        self._multiple = len(np.unique(self.tickers)) > 1
+        self.day = day
+        self._allocate()
+
+    def _allocate(self):
+        # The state buffer and the memories, over the arrays already in place
+        self.state = np.zeros(self.state_space)
+        self._cash = self.state[0:1]
+        self._prices = self.state[1:self.stock_dim + 1]
+        self._holdings = self.state[self.stock_dim + 1:2 * self.stock_dim + 1]
+        self._features = self.state[2 * self.stock_dim + 1:].reshape(self.features.shape[1:])
+        self._initiate_state()
+        self.reward = 0
+        self.turbulence = 0
+        self.cost = 0
+        self.trades = 0
+        self.episode = 0
+        self.asset_memory = [self.initial_amount + np.sum(np.array(self.num_stock_shares) * self._prices)]
+        self.rewards_memory = []
+        self.actions_memory = []
+        self.date_memory = [self._get_date()]
+        self._seed()
+
+    def _load_day(self):
+        self._prices[:] = self.closes[self.day]
+        self._features[:] = self.features[self.day]
+
+    def _initiate_state(self):
+        if self.initial:
+            self._cash[0] = self.initial_amount
+            self._holdings[:] = self.num_stock_shares if self._multiple else 0
+        else:
+            self._cash[0] = self.previous_state[0]
+            self._holdings[:] = self.previous_state[self.stock_dim + 1:self.stock_dim * 2 + 1]
+        self._load_day()
+
+    def _total_asset(self):
+        # Summed left to right, like the builtin sum of StockTradingEnv
+        values = self._prices * self._holdings
+        return self._cash[0] + (np.add.accumulate(values)[-1] if len(values) else 0)
+
+    def _get_date(self):
+        return self.dates[self.day]
+
+    def _sell(self, index, amounts, turbulent):
+        # The sells of the day, in the order of index; returns the shares sold and their costs
+        prices = self._prices[index]
+        holdings = self._holdings[index]
+        if turbulent:
+            shares = np.where((prices > 0) & (holdings > 0), holdings, 0)
+        else:
+            # A first indicator equal to 1 marks a stock that cannot be traded
+            able = (self._features[0, index] != 1) if len(self._features) else True
+            shares = np.where(able & (holdings > 0), np.minimum(-amounts, holdings), 0)
+        sold = shares > 0
+        prices, shares, pct = prices[sold], shares[sold], self.sell_cost_pct[index[sold]]
+        self._cash[0] = np.add.accumulate(np.r_[self._cash[0], prices * shares * (1 - pct)])[-1]
+        self._holdings[index[sold]] -= shares
+        self.trades += int(sold.sum())
+        return index[sold], shares, prices * shares * pct
+
+    def _buy(self, index, amounts):
+        # The buys of the day, in the order of index. Each is limited by the cash
+        # left after the ones before it, so the whole batch goes through as long
+        # as the running cash covers it, and the rest one by one.
+        able = (self._features[0, index] != 1) if len(self._features) else np.ones(len(index), dtype=bool)
+        # StockTradingEnv fails with ZeroDivisionError on a zero price; nothing is bought instead
+        index, amounts = index[able], amounts[able]
+        self.trades += len(index)
+        tradable = self._prices[index] > 0
+        index, amounts = index[tradable], amounts[tradable]
+        prices, pct = self._prices[index], self.buy_cost_pct[index]
+        unit = prices * (1 + pct)
+        cash = np.subtract.accumulate(np.r_[self._cash[0], prices * amounts * (1 + pct)])
+        short = np.flatnonzero(cash[:-1] // unit < amounts)
+        shares = amounts.astype(np.float64)
+        if len(short):
+            k = short[0]
+            balance = cash[k]
+            for j in range(k, len(index)):
+                shares[j] = min(balance // unit[j], amounts[j])
+                balance -= prices[j] * shares[j] * (1 + pct[j])
+            self._cash[0] = balance
+        else:
+            self._cash[0] = cash[-1]
+        self._holdings[index] += shares
+        return index, shares, prices * shares * pct
+
+    def step(self, actions):
+        self.terminal = self.day >= self.n_days - 1
+        if self.terminal:
+            end_total_asset = self._total_asset()
+            tot_reward = end_total_asset - self.asset_memory[0]
+            daily_return = pd.Series(self.asset_memory).pct_change(1)
+            if self.episode % self.print_verbosity == 0:
+                print(f"day: {self.day}, episode: {self.episode}")
+                print(f"begin_total_asset: {self.asset_memory[0]:0.2f}")
+                print(f"end_total_asset: {end_total_asset:0.2f}")
+                print(f"total_reward: {tot_reward:0.2f}")
+                print(f"total_cost: {self.cost:0.2f}")
+                print(f"total_trades: {self.trades}")
+                if daily_return.std() != 0:
+                    print(f"Sharpe: {(252 ** 0.5) * daily_return.mean() / daily_return.std():0.3f}")
+                print("=================================")
+            # A copy, as the vector envs reset the env, and so the buffer, right after
+            return self.state.copy(), self.reward, self.terminal, False, {}
+
+        actions = (np.asarray(actions) * self.hmax).astype(int)
+        turbulent = self.turbulence_threshold is not None and self.turbulence >= self.turbulence_threshold
+        if turbulent:
+            actions = np.array([-self.hmax] * self.stock_dim)
+        begin_total_asset = self._total_asset()
+
+        argsort_actions = np.argsort(actions)
+        sell_index = argsort_actions[:np.where(actions < 0)[0].shape[0]]
+        buy_index = argsort_actions[::-1][:np.where(actions > 0)[0].shape[0]]
+        executed = np.zeros(self.stock_dim, dtype=actions.dtype)
+        sold, shares, costs = self._sell(sell_index, actions[sell_index], turbulent)
+        executed[sold] = -shares
+        if not turbulent:
+            bought, shares, buy_costs = self._buy(buy_index, actions[buy_index])
+            executed[bought] = shares
+            costs = np.r_[costs, buy_costs]
+        self.cost = np.add.accumulate(np.r_[self.cost, costs])[-1]
+        self.actions_memory.append(executed)
+
+        self.day += 1
+        self._load_day()
+        if self.turbulences is not None:
+            self.turbulence = self.turbulences[self.day]
+        end_total_asset = self._total_asset()
+        self.asset_memory.append(end_total_asset)
+        self.date_memory.append(self._get_date())
+        self.reward = end_total_asset - begin_total_asset
+        self.rewards_memory.append(self.reward)
+        self.reward = self.reward * self.reward_scaling
+        return self.state, self.reward, self.terminal, False, {}
+
+    def reset(self, *, seed=None, options=None):
+        self.day = 0
+        self._initiate_state()
+        if self.initial:
+            self.asset_memory = [self.initial_amount + np.sum(np.array(self.num_stock_shares) * self._prices)]
+        else:
+            holdings = np.array(self.previous_state[self.stock_dim + 1:self.stock_dim * 2 + 1])
+            self.asset_memory = [self.previous_state[0] + np.add.accumulate(self._prices * holdings)[-1]]
+        self.turbulence = 0
+        self.cost = 0
+        self.trades = 0
+        self.terminal = False
+        self.rewards_memory = []
+        self.actions_memory = []
+        self.date_memory = [self._get_date()]
+        self.episode += 1
+        return self.state, {}
+
+    def render(self, mode='human', close=False):
+        return self.state
+
+    def save_asset_memory(self):
+        return pd.DataFrame({'date': self.date_memory, 'account_value': self.asset_memory})
+
+    def save_action_memory(self):
+        if self._multiple:
+            df_actions = pd.DataFrame(self.actions_memory, columns=self.tickers)
+            df_actions.index = pd.Index(self.date_memory[:-1], name='date')
+            return df_actions
+        return pd.DataFrame({'date': self.date_memory[:-1], 'actions': self.actions_memory})
+
+    def _seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def get_sb_env(self):
+        e = DummyVecEnv([lambda: self])
+        obs = e.reset()
+        return e, obs
+
+    def shards(self, num_envs):
+        """
+        Split the days into consecutive, nearly equal date shards, one env each.
+        The shards' arrays are views of this env's, so they take no memory of
+        their own and are shared with forked worker processes as they are.
+        :param num_envs: the number of shards.
+        :return: a list of num_envs ArrayStockTradingEnv, in date order.
+        """
+        if not 1 <= num_envs <= self.n_days // 2:
+            raise ValueError('%d days cannot be split into %d shards of 2 days or more' % (self.n_days, num_envs))
+        bounds = np.linspace(0, self.n_days, num_envs + 1).astype(int)
+        envs = []
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            env = copy.copy(self)
+            env.closes, env.features, env.dates = self.closes[first:last], self.features[first:last], self.dates[first:last]
+            if self.turbulences is not None:
+                env.turbulences = self.turbulences[first:last]
+            days = self.df.index.to_numpy()
+            env.df = self.df[(days >= self._days[first]) & (days <= self._days[last - 1])]
+            env.df.index = env.df.index - self._days[first]
+            env._days = self._days[first:last] - self._days[first]
+            env.n_days = int(last - first)
+            env.day = 0
+            env._allocate()
+            envs.append(env)
+        return envs
+
+    def get_vec_env(self, num_envs=1, subprocess=False):
+        """
+        Counterpart of get_sb_env collecting the rollouts of num_envs date shards at once.
+        :param num_envs: the number of shards, see shards; 1 gives get_sb_env.
+        :param subprocess: step every shard in a worker process of its own
+            (SubprocVecEnv) instead of in turn in this one (DummyVecEnv).
+            The workers are forked where the platform allows it, so the market
+            arrays are not copied into them.
+        :return: the vector env and its first observation.
+        """
+        if num_envs == 1 and not subprocess:
+            return self.get_sb_env()
+        env_fns = [lambda env=env: env for env in self.shards(num_envs)]
+        if subprocess:
+            start_method = 'fork' if 'fork' in mp.get_all_start_methods() else None
+            e = SubprocVecEnv(env_fns, start_method=start_method)
+        else:
+            e = DummyVecEnv(env_fns)
+        obs = e.reset()
+        return e, obs
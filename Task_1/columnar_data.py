@@ -0,0 +1,259 @@
+"""
+Typed columnar store for the Task 1 OHLCV csv files.
+
+A store is a directory holding one .npy file per column and partition, next
+to a meta.json describing them. Dates are kept as int32 indices into the
+sorted list of dates and string columns such as tic as int32 codes into their
+categories; float columns are float32 by default, except the OHLCV prices and
+volume, which stay float64 so that costs and turnover are those of the csv.
+Files are memory-mapped on
+load, so only the partitions and columns a read asks for are touched.
+Partitions are optional, by ticker, by year or by both.
+
+load_data takes a store or a csv, so a --data_file argument can name either,
+and DatePanel slices date ranges of the frame without copying it:
+
+    python columnar_data.py train_data.csv train_data.cols --partition_by tic year
+    python test.py --data_file train_data.cols
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+META = 'meta.json'
+PARTITION_KEYS = ('tic', 'year')
+# Position of each row in the source file, so a read gives the rows back in their order
+ROW = '__row__'
+# Float columns kept as float64 whatever float_dtype is: volumes above 2**24 and
+# prices with more than 7 digits are not exact in float32
+FLOAT64_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def is_store(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META))
+
+
+def _partition_dir(root, key):
+    return os.path.join(root, *['%s=%s' % item for item in key]) if key else root
+
+
+def write_store(df, root, partition_by=(), float_dtype=np.float32, float64_columns=FLOAT64_COLUMNS):
+    """
+    Write a long-format frame as a columnar store.
+    :param df: a DataFrame with a 'date' column of 'YYYY-MM-DD' strings and a 'tic' column.
+    :param root: the store directory, created if missing.
+    :param partition_by: a subset of PARTITION_KEYS, one subdirectory level each.
+    :param float_dtype: the dtype the other float columns are stored as.
+    :param float64_columns: the float columns stored as float64.
+    :return: root.
+    """
+    unknown = [key for key in partition_by if key not in PARTITION_KEYS]
+    if unknown:
+        raise ValueError('unknown partition keys: %s' % ', '.join(unknown))
+    date_codes, dates = pd.factorize(df['date'].astype(str), sort=True)
+    columns = {'date': date_codes.astype(np.int32)}
+    meta = {'columns': [], 'categories': {'date': list(dates)}, 'partition_by': list(partition_by)}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if name == 'date':
+            kind = 'date'
+        elif values.dtype.kind == 'f':
+            dtype = np.float64 if name in float64_columns else float_dtype
+            kind = np.dtype(dtype).name
+            columns[name] = values.astype(dtype)
+        elif values.dtype.kind in 'biu':
+            kind = values.dtype.name
+            columns[name] = values
+        else:
+            kind = 'category'
+            codes, categories = pd.factorize(values, sort=True)
+            columns[name] = codes.astype(np.int32)
+            meta['categories'][name] = [str(c) for c in categories]
+        meta['columns'].append([name, kind])
+    columns[ROW] = np.arange(len(df), dtype=np.int64)
+
+    keys = pd.DataFrame({'tic': df['tic'].astype(str).to_numpy(),
+                         'year': np.asarray(dates.str[:4])[date_codes]})[list(partition_by)]
+    groups = keys.groupby(list(partition_by), sort=True).indices if partition_by else {(): np.arange(len(df))}
+    meta['partitions'] = []
+    for key, rows in groups.items():
+        key = tuple(zip(partition_by, key if isinstance(key, tuple) else (key,)))
+        directory = _partition_dir(root, key)
+        os.makedirs(directory, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(directory, name + '.npy'), values[rows])
+        year_dates = dates[date_codes[rows]]
+        meta['partitions'].append({'key': [list(item) for item in key], 'rows': len(rows),
+                                   'first_date': min(year_dates), 'last_date': max(year_dates)})
+    with open(os.path.join(root, META), 'w') as f:
+        json.dump(meta, f)
+    return root
+
+
+def convert(source, root, partition_by=(), float_dtype=np.float32, float64_columns=FLOAT64_COLUMNS):
+    """
+    Convert an OHLCV csv into a columnar store.
+    :param source: the csv file.
+    :param root: the store directory.
+    :param partition_by: a subset of PARTITION_KEYS.
+    :param float_dtype: the dtype the other float columns are stored as.
+    :param float64_columns: the float columns stored as float64.
+    :return: root.
+    """
+    return write_store(pd.read_csv(source), root, partition_by, float_dtype, float64_columns)
+
+
+def read_store(root, start_date=None, end_date=None, tickers=None, columns=None):
+    """
+    Read a columnar store back into a long-format frame.
+    The filters follow data_split: rows with start_date <= date < end_date.
+    Partitions that cannot hold such rows are not opened.
+    :param root: the store directory.
+    :param start_date: the first date kept, a 'YYYY-MM-DD' string.
+    :param end_date: the first date no longer kept.
+    :param tickers: the tickers kept, all by default.
+    :param columns: the columns read, all by default; date and tic are always read.
+    :return: a DataFrame with the rows in source order on a fresh RangeIndex,
+        date as strings and the string columns as categoricals.
+    """
+    with open(os.path.join(root, META)) as f:
+        meta = json.load(f)
+    kinds = dict(meta['columns'])
+    names = [name for name, _ in meta['columns']
+             if columns is None or name in columns or name in ('date', 'tic')]
+    dates = np.asarray(meta['categories']['date'], dtype=object)
+    first = 0 if start_date is None else np.searchsorted(dates, start_date)
+    last = len(dates) if end_date is None else np.searchsorted(dates, end_date)
+    tic_codes = None
+    if tickers is not None:
+        tic_codes = np.flatnonzero(np.isin(meta['categories']['tic'], list(tickers)))
+
+    parts = []
+    for partition in meta['partitions']:
+        key = dict(partition['key'])
+        if (start_date is not None and partition['last_date'] < start_date) or \
+                (end_date is not None and partition['first_date'] >= end_date) or \
+                (tickers is not None and 'tic' in key and key['tic'] not in tickers):
+            continue
+        directory = _partition_dir(root, [tuple(item) for item in partition['key']])
+        load = lambda name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r')
+        date_codes = load('date')
+        keep = (date_codes >= first) & (date_codes < last)
+        if tic_codes is not None:
+            keep &= np.isin(load('tic'), tic_codes)
+        if keep.any():
+            parts.append(dict((name, load(name)[keep]) for name in names + [ROW]))
+    if parts:
+        data = dict((name, np.concatenate([part[name] for part in parts])) for name in names + [ROW])
+    else:
+        data = dict((name, np.empty(0, dtype=np.int32)) for name in names + [ROW])
+    order = np.argsort(data.pop(ROW), kind='stable')
+
+    out = {}
+    for name in names:
+        values = data[name][order]
+        if kinds[name] == 'date':
+            out[name] = dates[values]
+        elif kinds[name] == 'category':
+            out[name] = pd.Categorical.from_codes(values, meta['categories'][name])
+        else:
+            out[name] = values
+    return pd.DataFrame(out, columns=names)
+
+
+def load_data(path, start_date=None, end_date=None, tickers=None, columns=None):
+    """
+    Read a --data_file, a columnar store or a csv, into a long-format frame.
+    :param path: a store directory written by write_store, or a csv file.
+    :param start_date: the first date kept, all dates by default.
+    :param end_date: the first date no longer kept.
+    :param tickers: the tickers kept, all by default.
+    :param columns: the columns read, all by default.
+    :return: a DataFrame.
+    """
+    if is_store(path):
+        return read_store(path, start_date, end_date, tickers, columns)
+    usecols = None if columns is None else lambda name: name in columns or name in ('date', 'tic')
+    df = pd.read_csv(path, usecols=usecols)
+    keep = np.ones(len(df), dtype=bool)
+    if start_date is not None:
+        keep &= (df['date'] >= start_date).to_numpy()
+    if end_date is not None:
+        keep &= (df['date'] < end_date).to_numpy()
+    if tickers is not None:
+        keep &= df['tic'].isin(list(tickers)).to_numpy()
+    return df if keep.all() else df[keep].reset_index(drop=True)
+
+
+class DatePanel(object):
+    """
+    A long-format frame sorted by (date, tic) once, with the first row of
+    every date, so that a date range is found by binary search and returned
+    as a view of the sorted frame instead of being filtered and sorted again.
+    :param df: a DataFrame with 'date' and 'tic' columns.
+    """
+    def __init__(self, df):
+        date_codes, dates = pd.factorize(df['date'], sort=True)
+        tic_codes = pd.factorize(df['tic'], sort=True)[0]
+        order = np.lexsort((tic_codes, date_codes))
+        if (order != np.arange(len(df))).any():
+            df, date_codes = df.take(order), date_codes[order]
+        self.df = df.reset_index(drop=True)
+        self.dates = np.asarray(dates, dtype=object)
+        # Rows of day k are offsets[k]:offsets[k + 1]
+        self.offsets = np.searchsorted(date_codes, np.arange(len(dates) + 1))
+        self.day = date_codes
+
+    def days(self, first, last):
+        """
+        :param first: the position of the first date kept.
+        :param last: the position of the first date no longer kept.
+        :return: a view of the rows of those dates, indexed by day number from
+            0 like data_split returns, ready for StockTradingEnv.
+        """
+        rows = slice(self.offsets[first], self.offsets[last])
+        frame = self.df.iloc[rows]
+        frame.index = self.day[rows] - first
+        return frame
+
+    def split(self, start, end):
+        """
+        Counterpart of data_split: the rows with start <= date < end.
+        :param start: the first date kept, a 'YYYY-MM-DD' string.
+        :param end: the first date no longer kept.
+        :return: a view of the rows, indexed by day number from 0.
+        """
+        first, last = np.searchsorted(self.dates, [start, end])
+        return self.days(first, max(first, last))
+
+    def walk_forward(self, train_days, test_days, step_days=None):
+        """
+        Consecutive train and test windows moving forward through the dates.
+        :param train_days: the number of dates of each train window.
+        :param test_days: the number of dates of each test window, which follows its train window.
+        :param step_days: the dates between the starts of two windows, test_days by default.
+        :return: a generator of (train, test) views.
+        """
+        step_days = step_days or test_days
+        for first in range(0, len(self.dates) - train_days - test_days + 1, step_days):
+            yield (self.days(first, first + train_days),
+                   self.days(first + train_days, first + train_days + test_days))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert an OHLCV csv into a columnar store')
+    parser.add_argument('source', help='csv file with date, tic and feature columns')
+    parser.add_argument('root', help='store directory to write')
+    parser.add_argument('--partition_by', nargs='*', default=[], choices=PARTITION_KEYS,
+                        help='partition the store by ticker and/or year')
+    parser.add_argument('--float64', action='store_true', help='keep every float column as float64, not only %s' % ', '.join(FLOAT64_COLUMNS))
+    args = parser.parse_args()
+
+    convert(args.source, args.root, args.partition_by, np.float64 if args.float64 else np.float32)
+    with open(os.path.join(args.root, META)) as f:
+        meta = json.load(f)
+    print('%d rows in %d partitions written to %s' % (sum(p['rows'] for p in meta['partitions']),
+                                                      len(meta['partitions']), args.root))
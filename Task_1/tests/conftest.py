@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The shared modules of Task_1, imported as the teams' scripts import them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('stable_baselines3')
+env_stocktrading = pytest.importorskip('finrl.meta.env_stock_trading.env_stocktrading')
+from array_trading_env import ArrayStockTradingEnv, shard_ppo_params
+
+TECH_INDICATORS = ['macd', 'rsi_30']
+
+
+@pytest.fixture(scope='module')
+def trade():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2021-01-01', '2021-03-31').strftime('%Y-%m-%d')
+    tickers = ['AAPL', 'IBM', 'MSFT']
+    df = pd.DataFrame([(d, t) for d in dates for t in tickers], columns=['date', 'tic'])
+    n = len(df)
+    df['close'] = np.round(rng.uniform(20, 400, n), 2)
+    # A first indicator equal to 1 marks a stock that cannot be traded that day
+    df['macd'] = np.where(rng.random(n) < 0.1, 1.0, rng.normal(0, 1, n))
+    df['rsi_30'] = rng.uniform(0, 100, n)
+    df['turbulence'] = rng.uniform(0, 100, n)
+    df.index = df['date'].factorize()[0]
+    return df
+
+
+def _kwargs(df, **kwargs):
+    stock_dim = df['tic'].nunique()
+    return dict(dict(stock_dim=stock_dim, hmax=100, initial_amount=20000, num_stock_shares=[5] * stock_dim,
+                     buy_cost_pct=[0.001] * stock_dim, sell_cost_pct=[0.002] * stock_dim, reward_scaling=1e-4,
+                     state_space=1 + (2 + len(TECH_INDICATORS)) * stock_dim, action_space=stock_dim,
+                     tech_indicator_list=TECH_INDICATORS, print_verbosity=1000), **kwargs)
+
+
+def _run(expected, env, actions):
+    # Both envs stepped with the same actions, compared after every step
+    np.testing.assert_array_equal(env.reset()[0], np.asarray(expected.reset()[0], dtype=np.float64))
+    for k in range(len(actions)):
+        state, reward, terminal, _, _ = expected.step(actions[k])
+        array_state, array_reward, array_terminal, _, _ = env.step(actions[k])
+        np.testing.assert_array_equal(array_state, np.asarray(state, dtype=np.float64), err_msg='day %d' % k)
+        assert array_reward == reward and array_terminal == terminal
+        if terminal:
+            break
+    assert terminal
+    assert env.cost == expected.cost and env.trades == expected.trades
+    np.testing.assert_array_equal(env.asset_memory, expected.asset_memory)
+    np.testing.assert_array_equal(env.rewards_memory, expected.rewards_memory)
+    assert list(env.date_memory) == list(expected.date_memory)
+    pd.testing.assert_frame_equal(env.save_action_memory(), expected.save_action_memory(), check_dtype=False)
+
+
+@pytest.mark.parametrize('turbulence_threshold', [None, 80])
+def test_steps_match_stock_trading_env(trade, turbulence_threshold):
+    actions = np.random.default_rng(1).uniform(-1, 1, (trade.index.nunique(), trade['tic'].nunique()))
+    kwargs = _kwargs(trade, turbulence_threshold=turbulence_threshold)
+    expected = env_stocktrading.StockTradingEnv(df=trade, **kwargs)
+    env = ArrayStockTradingEnv(df=trade, **kwargs)
+    # Two episodes, the second after a reset of the memories
+    for _ in range(2):
+        _run(expected, env, actions)
+
+
+def test_previous_state_matches_stock_trading_env(trade):
+    stock_dim = trade['tic'].nunique()
+    previous_state = [15000.0] + [0.0] * stock_dim + [3.0, 0.0, 7.0] + [0.0] * len(TECH_INDICATORS) * stock_dim
+    kwargs = _kwargs(trade, initial=False, previous_state=previous_state)
+    actions = np.random.default_rng(2).uniform(-1, 1, (trade.index.nunique(), stock_dim))
+    _run(env_stocktrading.StockTradingEnv(df=trade, **kwargs), ArrayStockTradingEnv(df=trade, **kwargs), actions)
+
+
+def test_shards_cover_the_days(trade):
+    env = ArrayStockTradingEnv(df=trade, **_kwargs(trade))
+    shards = env.shards(3)
+    np.testing.assert_array_equal(np.concatenate([shard.closes for shard in shards]), env.closes)
+    assert sum(shard.n_days for shard in shards) == env.n_days
+    for shard in shards:
+        # Views of the env's arrays, with a frame indexed from day 0
+        assert np.shares_memory(shard.closes, env.closes)
+        assert shard.df.index[0] == 0 and shard.df.index.nunique() == shard.n_days
+    with pytest.raises(ValueError):
+        env.shards(env.n_days)
+
+
+@pytest.mark.parametrize('num_envs', [1, 2, 3, 4, 5, 7, 16, 64])
+def test_shard_ppo_params(num_envs):
+    params = {'n_steps': 2048, 'batch_size': 128, 'ent_coef': 0.01}
+    sharded = shard_ppo_params(params, num_envs)
+    rollout = sharded['n_steps'] * num_envs
+    # Whole minibatches, the closest such rollout to 2048 steps
+    assert rollout % 128 == 0
+    assert abs(rollout - 2048) <= 128 * num_envs / 2
+    assert sharded['ent_coef'] == 0.01 and params['n_steps'] == 2048
+    if 2048 % num_envs == 0:
+        assert rollout == 2048
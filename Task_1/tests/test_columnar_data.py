@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_data import load_data, write_store
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2019-12-20', '2020-01-10').strftime('%Y-%m-%d')
+    tickers = ['MSFT', 'AAPL', 'IBM']
+    df = pd.DataFrame([(d, t) for d in dates for t in tickers], columns=['date', 'tic'])
+    # Source order is not (date, tic) order
+    df = df.sample(frac=1, random_state=1).reset_index(drop=True)
+    n = len(df)
+    df['open'] = rng.uniform(10, 5000, n)
+    df['close'] = np.round(rng.uniform(10, 5000, n), 6)
+    # Volumes above 2**24 are not exact in float32
+    df['volume'] = rng.integers(2 ** 24, 2 ** 40, n).astype(np.float64) + 1
+    df['vix'] = rng.uniform(10, 40, n)
+    df['day'] = rng.integers(0, 5, n)
+    return df
+
+
+@pytest.mark.parametrize('partition_by', [(), ('tic',), ('tic', 'year')])
+def test_round_trip(ohlcv, tmp_path, partition_by):
+    root = write_store(ohlcv, str(tmp_path / 'store'), partition_by)
+    df = load_data(root)
+    assert list(df.columns) == list(ohlcv.columns)
+    assert list(df['date']) == list(ohlcv['date'])
+    assert list(df['tic'].astype(str)) == list(ohlcv['tic'])
+    # Prices and volume come back as the csv has them, the other floats as float32
+    for name in ('open', 'close', 'volume'):
+        assert df[name].dtype == np.float64
+        np.testing.assert_array_equal(df[name].to_numpy(), ohlcv[name].to_numpy())
+    assert df['vix'].dtype == np.float32
+    np.testing.assert_array_equal(df['vix'].to_numpy(), ohlcv['vix'].to_numpy().astype(np.float32))
+    np.testing.assert_array_equal(df['day'].to_numpy(), ohlcv['day'].to_numpy())
+
+
+def test_float64_columns_opt_out(ohlcv, tmp_path):
+    root = write_store(ohlcv, str(tmp_path / 'store'), float64_columns=())
+    assert load_data(root)['volume'].dtype == np.float32
+    root = write_store(ohlcv, str(tmp_path / 'wide'), float_dtype=np.float64)
+    np.testing.assert_array_equal(load_data(root)['vix'].to_numpy(), ohlcv['vix'].to_numpy())
+
+
+def test_filters_match_csv(ohlcv, tmp_path):
+    path = str(tmp_path / 'data.csv')
+    ohlcv.to_csv(path, index=False)
+    root = write_store(pd.read_csv(path), str(tmp_path / 'store'), ('tic', 'year'))
+    kwargs = dict(start_date='2019-12-30', end_date='2020-01-07', tickers=['IBM', 'MSFT'], columns=['close', 'volume'])
+    from_csv = load_data(path, **kwargs)
+    from_store = load_data(root, **kwargs)
+    assert list(from_store.columns) == list(from_csv.columns) == ['date', 'tic', 'close', 'volume']
+    assert list(from_store['date']) == list(from_csv['date'])
+    assert list(from_store['tic'].astype(str)) == list(from_csv['tic'])
+    for name in ('close', 'volume'):
+        np.testing.assert_array_equal(from_store[name].to_numpy(), from_csv[name].to_numpy())
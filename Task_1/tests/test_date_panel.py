@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_data import DatePanel
+
+
+def _data_split(df, start, end):
+    # finrl.meta.preprocessor.preprocessors.data_split
+    data = df[(df['date'] >= start) & (df['date'] < end)]
+    data = data.sort_values(['date', 'tic'], ignore_index=True)
+    data.index = data['date'].factorize()[0]
+    return data
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2020-01-01', '2020-03-31').strftime('%Y-%m-%d')
+    df = pd.DataFrame([(d, t) for d in dates for t in ['MSFT', 'AAPL', 'IBM']], columns=['date', 'tic'])
+    df['close'] = rng.uniform(10, 100, len(df))
+    # Shuffled, with a ticker missing on some days
+    df = df.sample(frac=1, random_state=1)
+    return df[~((df['tic'] == 'IBM') & (df['date'] > '2020-02-10') & (df['date'] < '2020-02-20'))]
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2020-01-01', '2020-04-01'),
+    ('2020-01-15', '2020-02-15'),
+    # Bounds that are not trading days, inside the IBM gap
+    ('2020-01-04', '2020-02-15'),
+    ('2019-06-01', '2020-01-03'),
+    ('2020-03-31', '2021-01-01'),
+    # Empty ranges
+    ('2021-01-01', '2021-06-01'),
+    ('2020-02-01', '2020-02-01'),
+    ('2020-03-01', '2020-02-01'),
+])
+def test_split_matches_data_split(frame, start, end):
+    expected = _data_split(frame, start, end)
+    pd.testing.assert_frame_equal(DatePanel(frame).split(start, end), expected, check_index_type=False)
+
+
+def test_data_split_reference(frame):
+    finrl = pytest.importorskip('finrl.meta.preprocessor.preprocessors')
+    pd.testing.assert_frame_equal(_data_split(frame, '2020-01-15', '2020-02-15'),
+                                  finrl.data_split(frame, '2020-01-15', '2020-02-15'))
+
+
+def test_walk_forward(frame):
+    panel = DatePanel(frame)
+    # Past the last date, the end of the last test window
+    dates = list(np.sort(frame['date'].unique())) + ['9999-12-31']
+    windows = list(panel.walk_forward(20, 5))
+    assert len(windows) == (len(dates) - 1 - 25) // 5 + 1
+    for k, (train, test) in enumerate(windows):
+        first = 5 * k
+        pd.testing.assert_frame_equal(train, _data_split(frame, dates[first], dates[first + 20]),
+                                      check_index_type=False)
+        pd.testing.assert_frame_equal(test, _data_split(frame, dates[first + 20], dates[first + 25]),
+                                      check_index_type=False)